@@ -1,2 +1,2 @@
 from .lab import SpecimenProcessor, AliquotType, RequisitionPanel
-from .lab import ProcessingProfile, Specimen, LabProfile
+from .lab import ProcessingProfile, Specimen, SpecimenBatch, LabProfile
@@ -13,3 +13,4 @@ from .manifest_admin import ManifestAdmin
 from .manifest_item_admin import ManifestItemAdmin
 from .modeladmin_mixins import RequisitionAdminMixin
 from .shipper_admin import ShipperAdmin
+from .storage_admin import FreezerAdmin, RackAdmin, ShelfAdmin
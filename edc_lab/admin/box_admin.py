@@ -24,6 +24,8 @@ class BoxAdmin(BaseModelAdmin, admin.ModelAdmin):
                 'category',
                 'category_other',
                 'accept_primary',
+                'rack',
+                'rack_position',
                 'comment')}),
         audit_fieldset_tuple)
 
@@ -0,0 +1,64 @@
+from django.contrib import admin
+
+from edc_base.modeladmin_mixins import (
+    audit_fieldset_tuple, audit_fields)
+
+from ..admin_site import edc_lab_admin
+from ..models import Freezer, Rack, Shelf
+from .base_model_admin import BaseModelAdmin
+
+
+@admin.register(Freezer, site=edc_lab_admin)
+class FreezerAdmin(BaseModelAdmin, admin.ModelAdmin):
+
+    fieldsets = (
+        (None, {
+            'fields': (
+                'name',
+                'description',
+                'location',
+            )}),
+        audit_fieldset_tuple)
+
+    def get_readonly_fields(self, request, obj=None):
+        return super().get_readonly_fields(request, obj=obj) + audit_fields
+
+    list_display = ('name', 'description', 'location')
+
+
+@admin.register(Shelf, site=edc_lab_admin)
+class ShelfAdmin(BaseModelAdmin, admin.ModelAdmin):
+
+    fieldsets = (
+        (None, {
+            'fields': (
+                'freezer',
+                'name',
+                'position',
+            )}),
+        audit_fieldset_tuple)
+
+    def get_readonly_fields(self, request, obj=None):
+        return super().get_readonly_fields(request, obj=obj) + audit_fields
+
+    list_display = ('name', 'freezer', 'position')
+    list_filter = ('freezer', )
+
+
+@admin.register(Rack, site=edc_lab_admin)
+class RackAdmin(BaseModelAdmin, admin.ModelAdmin):
+
+    fieldsets = (
+        (None, {
+            'fields': (
+                'shelf',
+                'name',
+                'position',
+            )}),
+        audit_fieldset_tuple)
+
+    def get_readonly_fields(self, request, obj=None):
+        return super().get_readonly_fields(request, obj=obj) + audit_fields
+
+    list_display = ('name', 'shelf', 'position')
+    list_select_related = ('shelf__freezer', )
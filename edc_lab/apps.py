@@ -26,6 +26,17 @@ class AppConfig(DjangoAppConfig):
     site_code = None
     site_name = None
 
+    # import `labs` modules on first access to site_labs instead of
+    # in ready(); optionally report the discovery cost of each app.
+    lazy_labs = False
+    labs_timing = False
+    labs_verbose = True
+    # path to a registry snapshot written by `manage.py freeze_site_labs`
+    try:
+        labs_snapshot = settings.EDC_LAB_SITE_LABS_SNAPSHOT
+    except AttributeError:
+        labs_snapshot = None
+
     aliquot_model = 'edc_lab.aliquot'
     box_model = 'edc_lab.box'
     box_item_model = 'edc_lab.boxitem'
@@ -68,9 +79,23 @@ class AppConfig(DjangoAppConfig):
     def ready(self):
         from .models.signals import manifest_item_on_post_delete
         sys.stdout.write(f'Loading {self.verbose_name} ...\n')
-        site_labs.autodiscover()
+        if not self.load_labs_snapshot():
+            site_labs.autodiscover(
+                lazy=self.lazy_labs, verbose=self.labs_verbose, timing=self.labs_timing)
         if not self.site_code:
             sys.stdout.write(style.NOTICE(f' * site code not defined. See AppConfig.\n'))
         if not self.site_name:
             sys.stdout.write(style.NOTICE(f' * site name not defined. See AppConfig.\n'))
         sys.stdout.write(f' Done loading {self.verbose_name}.\n')
+
+    def load_labs_snapshot(self):
+        """Returns True if site_labs was loaded from the snapshot.
+        """
+        if self.labs_snapshot:
+            site_labs.verbose = self.labs_verbose
+            if site_labs.load_snapshot(self.labs_snapshot):
+                return True
+            sys.stdout.write(style.NOTICE(
+                ' * labs snapshot is missing or out of date, '
+                'autodiscovering labs. See freeze_site_labs.\n'))
+        return False
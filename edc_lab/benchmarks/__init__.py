@@ -0,0 +1,16 @@
+from .autodiscover import run as autodiscover
+from .lab_profile import run as lab_profile
+from .manifest_report import run as manifest_report
+from .panel_object import run as panel_object
+from .primary_aliquot import run as primary_aliquot
+from .processing_plan import run as processing_plan
+from .timer import Timer
+
+benchmarks = {
+    'autodiscover': autodiscover,
+    'lab_profile': lab_profile,
+    'manifest_report': manifest_report,
+    'panel_object': panel_object,
+    'primary_aliquot': primary_aliquot,
+    'processing_plan': processing_plan,
+}
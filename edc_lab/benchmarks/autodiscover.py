@@ -0,0 +1,49 @@
+import sys
+
+from ..site_labs import site_labs
+from .timer import Timer
+
+
+def run(size=None, number=None, stdout=None):
+    """Times eager and lazy `site_labs.autodiscover`, the cost
+    paid by each worker at boot.
+
+    `labs` modules are removed from sys.modules before each run
+    and the registry is restored when done. Does not touch the
+    database.
+    """
+    number = number or 10
+    stdout = stdout or sys.stdout
+    registry, loaded = site_labs._registry, site_labs.loaded
+    lab_modules = site_labs.find_modules('labs')
+    modules = {name: sys.modules.get(name) for _, name in lab_modules}
+    stdout.write(f' * found {len(lab_modules)} labs modules\n')
+
+    def autodiscover(lazy=None, access=None):
+        site_labs._registry = {}
+        site_labs.loaded = False
+        for name in modules:
+            sys.modules.pop(name, None)
+        site_labs.autodiscover(lazy=lazy, verbose=False)
+        if access:
+            site_labs.import_pending()
+
+    try:
+        Timer(name='eager autodiscover', number=number, stdout=stdout)(
+            autodiscover)
+        Timer(name='lazy autodiscover', number=number, stdout=stdout)(
+            autodiscover, True)
+        Timer(name='lazy autodiscover, first access', number=number, stdout=stdout)(
+            autodiscover, True, True)
+        autodiscover(lazy=True)
+        site_labs.timing = True
+        site_labs.verbose = True
+        site_labs.import_pending()
+    finally:
+        sys.modules.update({k: v for k, v in modules.items() if v})
+        site_labs._registry = registry
+        site_labs.loaded = loaded
+        site_labs._pending = []
+        site_labs.timing = False
+        if loaded:
+            site_labs.build_panel_cache()
@@ -0,0 +1,75 @@
+import random
+import sys
+import tracemalloc
+
+from django.apps import apps as django_apps
+
+from ..lab import AliquotType, LabProfile, Process, ProcessingProfile, RequisitionPanel
+from .timer import Timer
+
+
+def alpha(index=None):
+    return ''.join(chr(65 + int(n)) for n in str(index))
+
+
+def build(size=None, requisition_model=None):
+    """Returns a lab profile of `size` panels, each with its own
+    aliquot type and processing profile.
+    """
+    lab_profile = LabProfile(
+        name='benchmark', requisition_model=requisition_model)
+    for index in range(0, size):
+        aliquot_type = AliquotType(
+            name=f'aliquot_type_{index}', alpha_code=f'A{alpha(index)}',
+            numeric_code=f'{index:04d}')
+        derivative = AliquotType(
+            name=f'derivative_{index}', alpha_code=f'D{alpha(index)}',
+            numeric_code=f'9{index:04d}')
+        aliquot_type.add_derivatives(derivative)
+        processing_profile = ProcessingProfile(
+            name=f'processing_profile_{index}', aliquot_type=aliquot_type)
+        processing_profile.add_processes(
+            Process(aliquot_type=derivative, aliquot_count=2))
+        lab_profile.add_panel(RequisitionPanel(
+            name=f'panel_{index}',
+            model=requisition_model,
+            aliquot_type=aliquot_type,
+            processing_profile=processing_profile))
+    return lab_profile
+
+
+def run(size=None, number=None, stdout=None):
+    """Reports the memory used by a lab profile of `size` panels
+    and times panel lookups and derivative membership checks.
+
+    Does not touch the database.
+    """
+    size = size or 500
+    number = number or 100000
+    stdout = stdout or sys.stdout
+    requisition_model = django_apps.get_app_config('edc_lab').requisition_model
+    tracemalloc.start()
+    lab_profile = build(size=size, requisition_model=requisition_model)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    stdout.write(
+        f' * lab profile, {size} panels: {current / 1024:.1f}KiB '
+        f'({current / size:.0f} bytes per panel, peak {peak / 1024:.1f}KiB)\n')
+    names = [f'panel_{random.randrange(0, size)}' for _ in range(0, number)]
+    panel_names = iter(names)
+    Timer(name=f'panel lookup, {size} panels', number=number, stdout=stdout)(
+        lambda: lab_profile.panels[next(panel_names)])
+    panels = list(lab_profile.panels.values())
+    processes = [
+        list(panel.processing_profile.processes.values())[0] for panel in panels]
+    indexes = iter([random.randrange(0, size) for _ in range(0, number)])
+
+    def is_derivative():
+        index = next(indexes)
+        return panels[index].aliquot_type.is_derivative(processes[index].aliquot_type)
+
+    Timer(name=f'derivative membership, {size} panels', number=number, stdout=stdout)(
+        is_derivative)
+    panel_set = set(panels)
+    Timer(name=f'panel set membership, {size} panels', number=number, stdout=stdout)(
+        lambda: panels[random.randrange(0, size)] in panel_set)
@@ -0,0 +1,103 @@
+import sys
+import tracemalloc
+
+from collections import namedtuple
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+
+from edc_base.utils import get_utcnow
+
+from ..models import Box, BoxItem, BoxType, Consignee, Manifest, Shipper
+from ..reports import ManifestReport
+from ..reports import ManifestReportData, barcode_cache
+from ..reports.manifest_report_data import ManifestReportBox, ManifestReportItem
+from .timer import Timer
+
+Panel = namedtuple('Panel', 'abbreviation')
+
+
+def get_boxes(box_count=None, box_type=None):
+    """Returns a list of full report boxes built in memory.
+    """
+    app_config = django_apps.get_app_config('edc_lab')
+    aliquot_model = django_apps.get_model(*app_config.aliquot_model.split('.'))
+    panel = Panel('WB')
+    boxes = []
+    for index in range(0, box_count):
+        box = Box(
+            box_identifier=f'{index:012d}',
+            box_type=box_type,
+            specimen_types='02',
+            item_count=box_type.total)
+        items = []
+        for position in range(1, box_type.total + 1):
+            identifier = f'{index:010d}{position:04d}0201'
+            items.append(ManifestReportItem(
+                BoxItem(box=box, identifier=identifier, position=position),
+                aliquot_model(
+                    aliquot_identifier=identifier,
+                    subject_identifier=f'{index:010d}',
+                    aliquot_type='whole_blood',
+                    numeric_code='02',
+                    aliquot_datetime=get_utcnow()),
+                None,
+                panel))
+        boxes.append(ManifestReportBox(None, box, items))
+    return boxes
+
+
+def measure(report=None, spooled=None):
+    """Returns the peak memory traced while rendering the report
+    and reading the response as a client would.
+    """
+    tracemalloc.start()
+    response = report.render(spooled=spooled)
+    for _ in response:
+        pass
+    response.close()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def run(size=None, number=None, stdout=None):
+    """Times rendering the manifest PDF for manifests of full
+    9 x 9 boxes, 1, 10 and 50 boxes or `size` boxes, and compares
+    the peak memory of in-memory and spooled rendering and the
+    render time with and without cached barcodes.
+
+    Report data is built in memory so only the PDF is timed.
+    """
+    stdout = stdout or sys.stdout
+    number = number or 1
+    box_type = BoxType(name='9 x 9', across=9, down=9, total=81)
+    manifest = Manifest(
+        consignee=Consignee(name='consignee', country='Botswana'),
+        shipper=Shipper(name='shipper', country='Botswana'),
+        site_code='10',
+        site_name='site_name')
+    user = get_user_model()(first_name='Noam', last_name='Chomsky')
+    for box_count in ([size] if size else [1, 10, 50]):
+        report = ManifestReport(
+            manifest=manifest, user=user,
+            data=ManifestReportData(
+                manifest=manifest,
+                boxes=get_boxes(box_count=box_count, box_type=box_type)))
+        barcode_cache.clear()
+        report.render().close()
+        cold = report.render_stats
+        report.render().close()
+        warm = report.render_stats
+        stdout.write(
+            f' * render, {box_count} full boxes: cold {cold["seconds"] * 1000:.2f}ms, '
+            f'cached {warm["seconds"] * 1000:.2f}ms, '
+            f'delta {(cold["seconds"] - warm["seconds"]) * 1000:.2f}ms, '
+            f'barcode hit rate {warm["barcode_hit_rate"]:.0%} ({len(barcode_cache)} cached)\n')
+        Timer(name=f'render, {box_count} full boxes', number=number, stdout=stdout)(
+            lambda: report.render().close())
+        in_memory = measure(report, spooled=False)
+        spooled = measure(report, spooled=True)
+        stdout.write(
+            f' * peak memory, {box_count} full boxes: in memory {in_memory / 1024:.1f}KiB, '
+            f'spooled {spooled / 1024:.1f}KiB, '
+            f'difference {(in_memory - spooled) / 1024:.1f}KiB\n')
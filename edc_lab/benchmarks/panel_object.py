@@ -0,0 +1,36 @@
+from django.apps import apps as django_apps
+
+from ..site_labs import site_labs
+from .timer import Timer
+
+
+def run(size=None, number=None, stdout=None):
+    """Times `panel_object` for `size` unsaved requisitions, first
+    access and cached access, against the registry lookup it replaces.
+
+    Does not touch the database.
+    """
+    size = size or 100000
+    number = number or 1
+    app_config = django_apps.get_app_config('edc_lab')
+    requisition_model = django_apps.get_model(app_config.requisition_model)
+    label_lower = requisition_model._meta.label_lower
+    panel_names = list(site_labs.get(label_lower).panels)
+    requisitions = [
+        requisition_model(panel_name=panel_names[index % len(panel_names)])
+        for index in range(0, size)]
+
+    def registry_lookup():
+        for requisition in requisitions:
+            site_labs.get(label_lower).panels[requisition.panel_name]
+
+    def panel_object():
+        for requisition in requisitions:
+            requisition.panel_object
+
+    Timer(name=f'registry lookup, {size} requisitions', number=number, stdout=stdout)(
+        registry_lookup)
+    Timer(name=f'panel_object first access, {size} requisitions',
+          number=1, stdout=stdout)(panel_object)
+    Timer(name=f'panel_object cached, {size} requisitions', number=number, stdout=stdout)(
+        panel_object)
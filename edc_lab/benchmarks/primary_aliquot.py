@@ -0,0 +1,54 @@
+import random
+
+from django.apps import apps as django_apps
+from django.db import transaction
+
+from ..identifiers import AliquotIdentifier
+from ..lab import AliquotCreator, AliquotType, PrimaryAliquot
+from .timer import Timer
+
+
+def run(size=None, number=None, stdout=None):
+    """Times PrimaryAliquot lookups against an aliquot table of
+    `size` primary aliquots.
+
+    Rows are inserted in a transaction that is rolled back when done.
+    """
+    size = size or 1000000
+    number = number or 1000
+    app_config = django_apps.get_app_config('edc_lab')
+    aliquot_model = django_apps.get_model(*app_config.aliquot_model.split('.'))
+    aliquot_type = AliquotType(
+        name='whole_blood', alpha_code='WB', numeric_code='02')
+    options = dict(
+        aliquot_creator_cls=AliquotCreator,
+        aliquot_identifier_cls=AliquotIdentifier,
+        aliquot_model=aliquot_model,
+        aliquot_type=aliquot_type,
+        count_padding=2,
+        identifier_length=18)
+    with transaction.atomic():
+        for start in range(0, size, 10000):
+            aliquot_model.objects.bulk_create([
+                aliquot_model(
+                    aliquot_identifier=f'{index:010d}0000{aliquot_type.numeric_code}01',
+                    aliquot_type=aliquot_type.name,
+                    alpha_code=aliquot_type.alpha_code,
+                    numeric_code=aliquot_type.numeric_code,
+                    count=1,
+                    identifier_prefix=f'{index:010d}',
+                    is_primary=True,
+                    parent_identifier=f'{index:010d}0000{aliquot_type.numeric_code}01',
+                    requisition_identifier=f'R{index:09d}')
+                for index in range(start, min(start + 10000, size))])
+        indexes = [random.randrange(0, size) for _ in range(0, number)]
+        by_prefix = iter(indexes)
+        by_requisition_identifier = iter(indexes)
+        Timer(name=f'by identifier prefix, {size} rows', number=number, stdout=stdout)(
+            lambda: PrimaryAliquot(
+                identifier_prefix=f'{next(by_prefix):010d}', **options))
+        Timer(name=f'by requisition identifier, {size} rows', number=number, stdout=stdout)(
+            lambda: PrimaryAliquot(
+                requisition_identifier=f'R{next(by_requisition_identifier):09d}',
+                **options))
+        transaction.set_rollback(True)
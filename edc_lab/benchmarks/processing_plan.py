@@ -0,0 +1,51 @@
+from ..lab import AliquotType, Process, ProcessingProfile
+from .timer import Timer
+
+
+def loop(processing_profile=None, count_padding=None):
+    """Returns aliquot identifier suffixes by walking the
+    processes as `SpecimenProcessor.create` did before plans.
+    """
+    suffixes = []
+    count = 1
+    for process in processing_profile.processes.values():
+        for _ in range(1, process.aliquot_count + 1):
+            count += 1
+            suffixes.append(
+                f'{process.aliquot_type.numeric_code}{str(count).zfill(count_padding)}')
+    return suffixes
+
+
+def plan(processing_profile=None, count_padding=None):
+    """Returns aliquot identifier suffixes from the compiled plan.
+    """
+    return [item.suffix for item in processing_profile.get_plan(
+        count_padding=count_padding)]
+
+
+def run(size=None, number=None, stdout=None):
+    """Times walking the processes of a processing profile of
+    `size` processes against iterating its compiled plan.
+
+    Does not touch the database.
+    """
+    size = size or 10
+    number = number or 100000
+    aliquot_type = AliquotType(
+        name='whole_blood', alpha_code='WB', numeric_code='02')
+    processing_profile = ProcessingProfile(
+        name='benchmark', aliquot_type=aliquot_type)
+    for index in range(0, size):
+        derivative = AliquotType(
+            name=f'derivative_{index}',
+            alpha_code='D' + ''.join(chr(65 + int(n)) for n in str(index)),
+            numeric_code=f'{index + 10:02d}')
+        aliquot_type.add_derivatives(derivative)
+        processing_profile.add_processes(
+            Process(aliquot_type=derivative, aliquot_count=2))
+    processing_profile.compile()
+    assert loop(processing_profile, 2) == plan(processing_profile, 2)
+    Timer(name=f'process loop, {size} processes', number=number, stdout=stdout)(
+        loop, processing_profile, 2)
+    Timer(name=f'compiled plan, {size} processes', number=number, stdout=stdout)(
+        plan, processing_profile, 2)
@@ -0,0 +1,33 @@
+import sys
+
+from time import perf_counter
+
+
+class Timer:
+
+    """A class to time repeated calls of a callable and write
+    the result to a stream.
+    """
+
+    def __init__(self, name=None, number=None, stdout=None):
+        self.name = name
+        self.number = number or 1
+        self.stdout = stdout or sys.stdout
+        self.seconds = None
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}({self.name}, number={self.number})'
+
+    def __call__(self, func, *args, **kwargs):
+        start = perf_counter()
+        for _ in range(0, self.number):
+            func(*args, **kwargs)
+        self.seconds = perf_counter() - start
+        self.stdout.write(
+            f' * {self.name}: {self.seconds * 1000:.2f}ms total, '
+            f'{self.per_call * 1000000:.2f}us per call (n={self.number})\n')
+        return self.seconds
+
+    @property
+    def per_call(self):
+        return self.seconds / self.number
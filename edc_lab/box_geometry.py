@@ -0,0 +1,125 @@
+class BoxGeometryError(Exception):
+    pass
+
+
+class BoxGeometry:
+
+    """An immutable layout of a box type with precomputed lookup
+    tables between positions, (row, column) coordinates and
+    zero-based slots in fill order.
+
+    Positions are numbered across rows starting at 1. Rows and
+    columns start at 1.
+    """
+
+    __slots__ = ('across', 'down', 'total', 'fill_order',
+                 'slot_positions', 'position_slots', 'position_coordinates',
+                 'rows')
+
+    def __init__(self, across=None, down=None, total=None, fill_order=None):
+        self.across = across
+        self.down = down
+        self.total = total
+        self.fill_order = fill_order or 'across'
+        if self.fill_order == 'down':
+            slot_positions = [
+                row * across + column + 1
+                for column in range(0, across) for row in range(0, down)]
+        else:
+            slot_positions = list(range(1, across * down + 1))
+        # index 0 is unused so positions index the tables directly
+        position_slots = [None] * (across * down + 1)
+        for slot, position in enumerate(slot_positions):
+            position_slots[position] = slot
+        self.slot_positions = tuple(slot_positions[:total])
+        self.position_slots = tuple(position_slots)
+        self.position_coordinates = (None, ) + tuple(
+            (row, column) for row in range(1, down + 1)
+            for column in range(1, across + 1))
+        self.rows = tuple(
+            tuple(range((row - 1) * across + 1, row * across + 1))
+            for row in range(1, down + 1))
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(across={self.across}, down={self.down}, '
+                f'total={self.total}, fill_order={self.fill_order})')
+
+    @classmethod
+    def from_box_type(cls, box_type=None):
+        return cls(across=box_type.across, down=box_type.down,
+                   total=box_type.total, fill_order=box_type.fill_order)
+
+    @property
+    def headers(self):
+        return list(range(1, self.across + 1))
+
+    def slot_to_position(self, slot=None):
+        """Returns the position of the zero-based slot, where slots
+        are numbered in fill order and positions across rows.
+        """
+        try:
+            return self.slot_positions[slot]
+        except IndexError:
+            raise BoxGeometryError(
+                f'Invalid slot for box of {self.total}. Got {slot}.')
+
+    def position_to_slot(self, position=None):
+        """Returns the zero-based slot in fill order of a position.
+        """
+        try:
+            return self.position_slots[position]
+        except (IndexError, TypeError):
+            raise BoxGeometryError(
+                f'Invalid position for box of {self.total}. Got {position}.')
+
+    def coordinates(self, position=None):
+        """Returns the (row, column) of a position.
+        """
+        try:
+            return self.position_coordinates[position]
+        except (IndexError, TypeError):
+            raise BoxGeometryError(
+                f'Invalid position for box of {self.total}. Got {position}.')
+
+    def position(self, row=None, column=None):
+        """Returns the position at (row, column).
+        """
+        if not (1 <= row <= self.down and 1 <= column <= self.across):
+            raise BoxGeometryError(
+                f'Invalid coordinates for box of {self.across} x {self.down}. '
+                f'Got ({row}, {column}).')
+        return (row - 1) * self.across + column
+
+
+class BoxGeometries:
+
+    """An in-process cache of box geometries by layout.
+
+    Geometries are shared by all box types with the same layout.
+    A geometry is keyed on the layout values themselves, so a
+    box type whose layout changes simply maps to another entry
+    and no entry can go stale.
+    """
+
+    geometry_cls = BoxGeometry
+
+    def __init__(self):
+        self._layouts = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    def get_layout(self, across=None, down=None, total=None, fill_order=None):
+        """Returns the geometry for the layout.
+        """
+        key = (across, down, total, fill_order)
+        try:
+            return self._layouts[key]
+        except KeyError:
+            geometry = self.geometry_cls(
+                across=across, down=down, total=total, fill_order=fill_order)
+            self._layouts[key] = geometry
+            return geometry
+
+
+box_geometries = BoxGeometries()
@@ -0,0 +1,81 @@
+from django.db.models import Case, Value, When
+
+from edc_base.utils import get_utcnow
+
+
+def update_search_slug(obj):
+    """Sets the search slug on a model instance that will not
+    pass through `save`, e.g. if created by `bulk_create`.
+    """
+    updater_cls = getattr(obj, 'search_slug_updater_cls', None)
+    if updater_cls:
+        updater = updater_cls(
+            fields=obj.get_search_slug_fields(), model_obj=obj)
+        obj.search_slug_warning = updater.warning
+        obj.slug = updater.slug
+    return obj
+
+
+def bulk_create_history(model=None, objs=None, history_type=None, using=None):
+    """Bulk creates historical records for model instances written
+    without the post_save signal, e.g. by `bulk_create`.
+
+    Does nothing if the model does not declare `history`.
+    """
+    try:
+        history_model = model.history.model
+    except AttributeError:
+        return []
+    history_date = get_utcnow()
+    history_fields = [
+        field.attname for field in history_model._meta.fields]
+    attnames = [
+        field.attname for field in model._meta.fields
+        if field.attname in history_fields]
+    history_objs = []
+    for obj in objs:
+        history_objs.append(history_model(
+            history_date=history_date,
+            history_type=history_type or '+',
+            **{attname: getattr(obj, attname) for attname in attnames}))
+    return history_model._default_manager.using(using).bulk_create(history_objs)
+
+
+def bulk_create_with_history(model=None, objs=None, using=None, batch_size=None):
+    """Returns a list of model instances created with one
+    `bulk_create` plus one `bulk_create` for their historical records.
+
+    `bulk_create` bypasses `save` and the post_save signal so the
+    search slug and historical records are written here instead.
+    """
+    objs = [update_search_slug(obj) for obj in objs]
+    if not objs:
+        return []
+    created = model._default_manager.using(using).bulk_create(
+        objs, batch_size=batch_size)
+    bulk_create_history(model=model, objs=created, using=using)
+    return created
+
+
+def bulk_update(model=None, objs=None, fields=None, using=None, batch_size=None):
+    """Updates `fields` on model instances with one UPDATE statement
+    per batch and returns the number of rows updated.
+
+    Each column is set with a CASE WHEN on the primary key.
+    """
+    objs = list(objs)
+    batch_size = batch_size or 100
+    updated = 0
+    for start in range(0, len(objs), batch_size):
+        batch = objs[start:start + batch_size]
+        updates = {}
+        for field_name in fields:
+            field = model._meta.get_field(field_name)
+            updates.update({field.attname: Case(
+                *[When(pk=obj.pk, then=Value(
+                    getattr(obj, field.attname), output_field=field))
+                  for obj in batch],
+                output_field=field)})
+        updated += model._default_manager.using(using).filter(
+            pk__in=[obj.pk for obj in batch]).update(**updates)
+    return updated
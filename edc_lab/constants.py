@@ -1,4 +1,7 @@
 CONDITION_OK = 'OK'
+FLAG_MISMATCH = -1
+FLAG_UNVERIFIED = 0
+FLAG_VERIFIED = 1
 PACKED = 'packed'
 SHIPPED = 'shipped'
 STORAGE = 'storage'
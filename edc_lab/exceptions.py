@@ -6,5 +6,13 @@ class BoxItemError(Exception):
     pass
 
 
+class BoxItemDuplicateError(BoxItemError):
+    pass
+
+
 class SpecimenError(Exception):
     pass
+
+
+class StorageLocationError(Exception):
+    pass
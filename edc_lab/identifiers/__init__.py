@@ -1,5 +1,6 @@
 from .aliquot_identifier import AliquotIdentifier
 from .aliquot_identifier import AliquotIdentifierCountError, AliquotIdentifierLengthError
+from .aliquot_identifier_batch import AliquotIdentifierBatch, AliquotIdentifierItem
 from .box_identifier import BoxIdentifier
 from .manifest_identifier import ManifestIdentifier
 from .requisition_identifier import RequisitionIdentifier
@@ -0,0 +1,59 @@
+from collections import namedtuple
+
+from .aliquot_identifier import AliquotIdentifierCountError, AliquotIdentifierLengthError
+
+AliquotIdentifierItem = namedtuple(
+    'AliquotIdentifierItem', 'identifier count numeric_code aliquot_type')
+
+
+class AliquotIdentifierBatch:
+
+    """A class to generate the child aliquot identifiers of all
+    processes in a processing profile in one pass.
+
+    Identifiers are the same as those generated one at a time by
+    `AliquotIdentifier`. Identifiers are read from the processing
+    profile's compiled plan and length is validated once per
+    suffix length instead of once per identifier.
+
+    Keyword args:
+        * identifier_prefix: a prefix as string
+        * parent_segment: 4 digit segment of the parent aliquot.
+        * processing_profile: a ProcessingProfile instance.
+        * identifier_length: overall length of each identifier
+        * count_padding: zfill padding.
+        * start: count of the first child aliquot (Default: 2).
+    """
+
+    def __init__(self, identifier_prefix=None, parent_segment=None,
+                 processing_profile=None, identifier_length=None,
+                 count_padding=None, start=None, **kwargs):
+        count = start or 2
+        if not parent_segment or count <= 1:
+            raise AliquotIdentifierCountError(
+                f'Unknown aliquot number/count. Expected a number '
+                f'greater than 1 and a parent segment. Got {count}, '
+                f'parent_segment={parent_segment}.')
+        head = f'{identifier_prefix or ""}{parent_segment}'
+        plan = processing_profile.get_plan(count_padding=count_padding, start=count)
+        for suffix_length in plan.suffix_lengths:
+            if len(head) + suffix_length != identifier_length:
+                identifier = [f'{head}{item.suffix}' for item in plan
+                              if len(item.suffix) == suffix_length][0]
+                raise AliquotIdentifierLengthError(
+                    f'Invalid length. Expected {identifier_length}. '
+                    f'Got len({identifier})=={len(identifier)}.')
+        self.items = [
+            AliquotIdentifierItem(
+                f'{head}{item.suffix}', item.count, item.numeric_code, item)
+            for item in plan]
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def identifiers(self):
+        return [item.identifier for item in self.items]
@@ -1,12 +1,17 @@
 from .aliquot_creator import AliquotCreator, AliquotCreatorError
 from .aliquot_type import AliquotType, AliquotTypeNumericCodeError, AliquotTypeAlphaCodeError
+from .box_packer import BoxPacker, BoxPackerResult
+from .box_verification import BoxVerification, BoxVerificationError
 from .get_model_cls import GetModelCls, GetModelError
 from .lab_profile import LabProfile
 from .lab_profile import PanelAlreadyRegistered, LabProfileRequisitionModelError
 from .manifest import Manifest
 from .primary_aliquot import PrimaryAliquot
 from .processing_profile import Process, ProcessingProfile, ProcessingProfileInvalidDerivative
-from .processing_profile import ProcessingProfileAlreadyAdded
+from .processing_profile import ProcessingProfileAlreadyAdded, ProcessingPlan
 from .requisition_panel import RequisitionPanel, RequisitionPanelError, InvalidProcessingProfile
 from .specimen import Specimen, SpecimenNotDrawnError
+from .specimen_batch import SpecimenBatch
 from .specimen_processor import SpecimenProcessor, SpecimenProcessorError
+from .specimen_processor import SpecimenProcessorResult
+from .storage_locator import StorageLocator, StorageLocation
@@ -19,7 +19,7 @@ class AliquotCreator:
         self.aliquot_identifier_cls = aliquot_identifier_cls
         self.aliquot_model = aliquot_model
 
-        self.parent_identifier = parent_identifier,
+        self.parent_identifier = parent_identifier
         self.is_primary = True if is_primary else False
         if not self.is_primary and not parent_identifier:
             raise AliquotCreatorError(
@@ -42,19 +42,23 @@ class AliquotCreator:
             subject_identifier=subject_identifier,
         )
 
-    def create(self, count=None, aliquot_type=None):
-        """Returns a created aliquot model instance.
+    def build(self, count=None, aliquot_type=None, aliquot_identifier=None):
+        """Returns an unsaved aliquot model instance.
+
+        If not provided, the aliquot identifier is generated by
+        `aliquot_identifier_cls`.
         """
         count = 1 if self.is_primary else count
-        aliquot_identifier_obj = self.aliquot_identifier_cls(
-            count=count,
-            numeric_code=aliquot_type.numeric_code,
-            **self.identifier_defaults,
-        )
+        if not aliquot_identifier:
+            aliquot_identifier = self.aliquot_identifier_cls(
+                count=count,
+                numeric_code=aliquot_type.numeric_code,
+                **self.identifier_defaults,
+            ).identifier
         parent_identifier = (
-            aliquot_identifier_obj.identifier if self.is_primary else self.parent_identifier)
-        aliquot = self.aliquot_model.objects.create(
-            aliquot_identifier=aliquot_identifier_obj.identifier,
+            aliquot_identifier if self.is_primary else self.parent_identifier)
+        return self.aliquot_model(
+            aliquot_identifier=aliquot_identifier,
             aliquot_type=aliquot_type.name,
             alpha_code=aliquot_type.alpha_code,
             count=count,
@@ -62,4 +66,10 @@ class AliquotCreator:
             parent_identifier=parent_identifier,
             ** self.model_defaults,
         )
+
+    def create(self, count=None, aliquot_type=None):
+        """Returns a created aliquot model instance.
+        """
+        aliquot = self.build(count=count, aliquot_type=aliquot_type)
+        aliquot.save(force_insert=True)
         return aliquot
@@ -14,32 +14,113 @@ class AliquotType:
     """A class to represent an aliquot type by an alpha and
     numeric code.
 
-    An aliquot type manages a list of valid derivatives for the
-    aliquot type, e.g. WB->Plasma, WB->Buffy Coat.
+    An aliquot type manages an ordered set of valid derivatives for
+    the aliquot type, e.g. WB->Plasma, WB->Buffy Coat.
+
+    Derivatives of derivatives are "transitive" derivatives, e.g.
+    WB->Plasma->Plasma Aliquot. These are resolved from a cached
+    derivation graph that is rebuilt only after any aliquot type
+    adds derivatives.
+
+    Aliquot types are value objects; two instances with the
+    same name and codes are equal and hash the same.
     """
 
+    # incremented whenever any aliquot type adds derivatives
+    graph_version = 0
+
+    __slots__ = ('_name', '_alpha_code', '_numeric_code', '_derivatives',
+                 '_closure', '_closure_version')
+
     def __init__(self, name=None, alpha_code=None, numeric_code=None):
-        self.derivatives = []
-        self.name = name
+        self._derivatives = {}
+        self._closure = None
+        self._closure_version = None
+        self._name = name
         if not alpha_code or not re.match('^[A-Z]+$', alpha_code, re.ASCII):
             raise AliquotTypeAlphaCodeError(f'Invalid alpha code. Got {alpha_code}.')
         else:
-            self.alpha_code = alpha_code
+            self._alpha_code = alpha_code
         if not numeric_code or not re.match('^\d+$', numeric_code, re.ASCII):
             raise AliquotTypeNumericCodeError(f'Invalid numeric code. Got {numeric_code}.')
         else:
-            self.numeric_code = numeric_code
+            self._numeric_code = numeric_code
 
     def __repr__(self):
-        return '{self.__class__.__name__}({self.name}, {self.alpha_code}, {self.numeric_code})'
+        return f'{self.__class__.__name__}({self.name}, {self.alpha_code}, {self.numeric_code})'
 
     def __str__(self):
         alpha_code = self.alpha_code or '?alpha_code'
         numeric_code = self.numeric_code or '?numeric_code'
         return f'{self.name.title()} ({alpha_code}:{numeric_code})'
 
+    def __eq__(self, other):
+        if not isinstance(other, AliquotType):
+            return NotImplemented
+        return self.natural_key() == other.natural_key()
+
+    def __hash__(self):
+        return hash(self.natural_key())
+
+    def natural_key(self):
+        return (self._name, self._alpha_code, self._numeric_code)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def alpha_code(self):
+        return self._alpha_code
+
+    @property
+    def numeric_code(self):
+        return self._numeric_code
+
+    @property
+    def derivatives(self):
+        """Returns a tuple of the direct derivatives in the order added.
+        """
+        return tuple(self._derivatives)
+
+    @property
+    def all_derivatives(self):
+        """Returns a dictionary, used as an ordered set, of the
+        direct and transitive derivatives of self.
+        """
+        if self._closure_version != AliquotType.graph_version:
+            closure = {}
+            pending = list(self._derivatives)
+            while pending:
+                aliquot_type = pending.pop(0)
+                if aliquot_type not in closure:
+                    closure.update({aliquot_type: None})
+                    pending.extend(aliquot_type._derivatives)
+            self._closure = closure
+            self._closure_version = AliquotType.graph_version
+        return self._closure
+
     def add_derivatives(self, *aliquot_type):
         """Adds an aliquot instance that is a valid
         derivative of self.
         """
-        self.derivatives.extend(aliquot_type)
+        self._derivatives.update({obj: None for obj in aliquot_type})
+        AliquotType.graph_version += 1
+
+    def is_derivative(self, aliquot_type=None):
+        """Returns True if aliquot_type is a direct derivative of self.
+        """
+        return aliquot_type in self._derivatives
+
+    def can_derive(self, aliquot_type=None, through=None):
+        """Returns True if aliquot_type is a direct or transitive
+        derivative of self.
+
+        If `through` is specified, aliquot_type must be derived
+        from self by way of `through`, e.g.
+        `wb.can_derive(plasma_aliquot, through=plasma)`.
+        """
+        if through:
+            return (through in self.all_derivatives
+                    and aliquot_type in through.all_derivatives)
+        return aliquot_type in self.all_derivatives
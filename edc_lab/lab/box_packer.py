@@ -0,0 +1,166 @@
+from django.apps import apps as django_apps
+from django.db import transaction
+
+from edc_constants.constants import OPEN
+
+from ..constants import VERIFIED
+
+ACCEPTED = 'accepted'
+ALREADY_BOXED = 'already_boxed'
+ALREADY_IN_BOX = 'already_in_box'
+BOX_FULL = 'box_full'
+BOX_NOT_OPEN = 'box_not_open'
+DOES_NOT_EXIST = 'does_not_exist'
+INVALID_SPECIMEN_TYPE = 'invalid_specimen_type'
+PRIMARY_NOT_ACCEPTED = 'primary_not_accepted'
+
+
+class BoxPackerResult:
+
+    """A class that reports the box items created, the reason
+    each scanned identifier was accepted or rejected and any
+    identifiers scanned more than once.
+    """
+
+    def __init__(self, box_items=None, reasons=None, duplicates=None):
+        self.box_items = box_items or []
+        self.reasons = reasons or {}
+        self.duplicates = duplicates or []
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(accepted={len(self.accepted)}, '
+                f'rejected={len(self.rejected)})')
+
+    @property
+    def accepted(self):
+        return [k for k, v in self.reasons.items() if v == ACCEPTED]
+
+    @property
+    def rejected(self):
+        return {k: v for k, v in self.reasons.items() if v != ACCEPTED}
+
+
+class BoxPacker:
+
+    """A class to pack a list of scanned aliquot identifiers
+    into a box.
+
+    Identifiers are validated against the aliquot and box item
+    tables with a constant number of queries. Accepted aliquots are placed in
+    the first free positions with one `bulk_create` and the box
+    status is updated once.
+    """
+
+    result_cls = BoxPackerResult
+
+    def __init__(self, box=None, aliquot_model=None, box_item_model=None):
+        app_config = django_apps.get_app_config('edc_lab')
+        self.box = box
+        self.aliquot_model = aliquot_model or django_apps.get_model(
+            *app_config.aliquot_model.split('.'))
+        self.box_item_model = box_item_model or django_apps.get_model(
+            *app_config.box_item_model.split('.'))
+        self.specimen_types = [
+            code.strip() for code in (box.specimen_types or '').split(',')
+            if code.strip()]
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(box={self.box})'
+
+    def get_aliquots(self, identifiers=None, lock=None):
+        """Returns a dictionary of {identifier: (numeric_code, is_primary)}
+        for the identifiers that are aliquots, optionally locking
+        the aliquot rows in identifier order.
+        """
+        aliquots = self.aliquot_model.objects.filter(
+            aliquot_identifier__in=identifiers).order_by('aliquot_identifier')
+        if lock:
+            aliquots = aliquots.select_for_update()
+        return {
+            obj[0]: obj[1:] for obj in aliquots.values_list(
+                'aliquot_identifier', 'numeric_code', 'is_primary')}
+
+    def get_boxed(self, identifiers=None, box=None, lock=None):
+        """Returns a dictionary of {identifier: box_id} for the
+        identifiers in boxes that have not been shipped, preferring
+        `box`, optionally locking the box item rows.
+        """
+        box_items = self.box_item_model.objects.filter(
+            identifier__in=identifiers).order_by('pk')
+        if lock:
+            list(box_items.select_for_update().values_list('pk', flat=True))
+        boxed = {}
+        for identifier, box_id in box_items.in_open_boxes().values_list(
+                'identifier', 'box_id'):
+            if box_id == box.pk or identifier not in boxed:
+                boxed.update({identifier: box_id})
+        return boxed
+
+    def validate(self, identifiers=None, box=None):
+        """Returns a dictionary of {identifier: reason} where the
+        reason is ACCEPTED or the reason for rejecting it.
+
+        `box`, if given, is the locked row of `self.box`. If called
+        in a transaction, the aliquot and box item rows read are
+        locked, aliquots first as in `Box.place`, so no other box
+        can take an accepted aliquot before it is placed.
+
+        Only items in boxes that have not been shipped count as
+        boxed, as in `BoxItem.check_duplicates`.
+        """
+        box = box or self.box
+        reasons = {identifier: None for identifier in identifiers}
+        lock = transaction.get_connection().in_atomic_block
+        aliquots = self.get_aliquots(reasons, lock=lock)
+        boxed = self.get_boxed(reasons, box=box, lock=lock)
+        for identifier in reasons:
+            if box.status not in [OPEN, VERIFIED]:
+                reason = BOX_NOT_OPEN
+            elif identifier not in aliquots:
+                reason = DOES_NOT_EXIST
+            elif identifier in boxed:
+                reason = (ALREADY_IN_BOX if boxed.get(identifier) == box.pk
+                          else ALREADY_BOXED)
+            elif aliquots.get(identifier)[0] not in self.specimen_types:
+                reason = INVALID_SPECIMEN_TYPE
+            elif aliquots.get(identifier)[1] and not box.accept_primary:
+                reason = PRIMARY_NOT_ACCEPTED
+            else:
+                reason = ACCEPTED
+            reasons.update({identifier: reason})
+        return reasons
+
+    def pack(self, identifiers=None):
+        """Returns a result after placing the valid identifiers in
+        the box and updating the box status.
+
+        Identifiers are validated and placed in one transaction
+        after locking the box row, so the box status and free
+        positions checked cannot change before the items are created.
+
+        Identifiers scanned more than once are packed once and
+        listed in `duplicates`. Identifiers that do not fit in the
+        box are rejected with BOX_FULL.
+        """
+        identifiers = [
+            identifier.strip() for identifier in identifiers if identifier.strip()]
+        seen = set()
+        duplicates = []
+        for identifier in identifiers:
+            if identifier in seen and identifier not in duplicates:
+                duplicates.append(identifier)
+            seen.add(identifier)
+        box_items = []
+        with transaction.atomic():
+            box = self.box.lock()
+            reasons = self.validate(identifiers, box=box)
+            accepted = [k for k, v in reasons.items() if v == ACCEPTED]
+            if accepted:
+                free_count = box.free_count
+                for identifier in accepted[free_count:]:
+                    reasons.update({identifier: BOX_FULL})
+                box_items = self.box.place(accepted[:free_count])
+            if box_items:
+                self.box.save()
+        return self.result_cls(
+            box_items=box_items, reasons=reasons, duplicates=duplicates)
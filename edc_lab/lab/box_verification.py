@@ -0,0 +1,125 @@
+from django.db import transaction
+
+from edc_base.utils import get_utcnow
+
+from ..bulk import bulk_create_history, bulk_update
+from ..constants import FLAG_MISMATCH, FLAG_UNVERIFIED, FLAG_VERIFIED
+
+
+class BoxVerificationError(Exception):
+    pass
+
+
+class BoxVerification:
+
+    """A class to verify the items of a box against a stream of
+    (position, scanned identifier) pairs.
+
+    The expected contents are read with one query. Scans are
+    compared in memory and written by `commit` with one
+    `bulk_update` and one update of the box status.
+
+    For example:
+        verification = BoxVerification(box=box)
+        verification.scan_many(scanner_stream)
+        verification.mismatches
+        verification.commit()
+    """
+
+    def __init__(self, box=None):
+        self.box = box
+        self.expected = {obj.position: obj for obj in box.boxitem_set.all()}
+        self.scanned = {}
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(box={self.box}, scanned={len(self.scanned)})'
+
+    def scan(self, position=None, identifier=None):
+        """Records a scanned identifier for a position and returns
+        FLAG_VERIFIED, FLAG_MISMATCH or raises if the position is empty.
+
+        Scanning a position again replaces the previous scan.
+        """
+        position = int(position)
+        box_item = self.expected.get(position)
+        if not box_item:
+            raise BoxVerificationError(
+                f'Position {position} is empty in box {self.box}. Got {identifier}.')
+        self.scanned.update({position: (identifier or '').strip()})
+        return self.get_flag(position)
+
+    def scan_many(self, scans=None):
+        """Records an iterable of (position, identifier) pairs.
+        """
+        for position, identifier in scans:
+            self.scan(position=position, identifier=identifier)
+
+    def get_flag(self, position=None):
+        """Returns the verified flag for a position.
+        """
+        if position not in self.scanned:
+            return FLAG_UNVERIFIED
+        elif self.scanned.get(position) == self.expected.get(position).identifier:
+            return FLAG_VERIFIED
+        return FLAG_MISMATCH
+
+    @property
+    def mismatches(self):
+        """Returns a dictionary of {position: (expected, scanned)}.
+        """
+        return {position: (self.expected.get(position).identifier, identifier)
+                for position, identifier in self.scanned.items()
+                if self.get_flag(position) == FLAG_MISMATCH}
+
+    @property
+    def unscanned(self):
+        """Returns a list of positions with items not yet scanned.
+        """
+        return [position for position in sorted(self.expected)
+                if position not in self.scanned]
+
+    def commit(self):
+        """Writes the verified flag of scanned items that changed
+        and updates the box counters and status once.
+
+        The box row is locked and its items read again before the
+        flags are compared, so concurrent sessions on the same box
+        never count an item twice. Scans of positions emptied since
+        are ignored.
+
+        Only items flagged FLAG_VERIFIED count as verified; a box
+        with mismatches is not verified.
+
+        Returns the list of box items updated.
+        """
+        verified_datetime = get_utcnow()
+        changed = []
+        verified_count = 0
+        with transaction.atomic():
+            self.box.lock()
+            self.expected = {obj.position: obj for obj in self.box.boxitem_set.all()}
+            for position in self.scanned:
+                box_item = self.expected.get(position)
+                if not box_item:
+                    continue
+                flag = self.get_flag(position)
+                if box_item.verified != flag:
+                    verified_count += (
+                        (1 if flag == FLAG_VERIFIED else 0)
+                        - (1 if box_item.verified == FLAG_VERIFIED else 0))
+                    box_item.verified = flag
+                    box_item.verified_datetime = verified_datetime
+                    box_item.modified = verified_datetime
+                    # keep BoxItem.save counter updates correct for this instance
+                    box_item._loaded_values.update(verified=flag)
+                    changed.append(box_item)
+            if changed:
+                box_item_model = self.box.boxitem_set.model
+                bulk_update(
+                    model=box_item_model, objs=changed,
+                    fields=['verified', 'verified_datetime', 'modified'])
+                bulk_create_history(
+                    model=box_item_model, objs=changed, history_type='~')
+                self.box.add_to_counters(verified_count=verified_count)
+                self.box.save()
+        return changed
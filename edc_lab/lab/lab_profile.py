@@ -14,13 +14,18 @@ class LabProfile:
     """A container class for panels.
 
     Added panels must have a matching requisition_model.
+
+    Lab profiles are equal if their names are equal.
     """
     model_cls = GetModelCls
 
+    __slots__ = ('_get_requisition_model', '_name', 'aliquot_types',
+                 'processing_profiles', 'panels')
+
     def __init__(self, name=None, requisition_model=None):
         self._get_requisition_model = self.model_cls(
             model=requisition_model).get_model
-        self.name = name
+        self._name = name
         self.aliquot_types = {}
         self.processing_profiles = {}
         self.panels = {}
@@ -31,6 +36,18 @@ class LabProfile:
     def __str__(self):
         return self.name
 
+    def __eq__(self, other):
+        if not isinstance(other, LabProfile):
+            return NotImplemented
+        return self.name == other.name
+
+    def __hash__(self):
+        return hash(self.name)
+
+    @property
+    def name(self):
+        return self._name
+
     @property
     def requisition_model(self):
         try:
@@ -1,5 +1,7 @@
 from django.db.models import Q
 
+from ..identifiers import AliquotIdentifierLengthError
+
 
 class PrimaryAliquotError(Exception):
     pass
@@ -12,6 +14,11 @@ class PrimaryAliquotPrefixError(Exception):
 class PrimaryAliquot:
 
     """A class that gets or creates the primary aliquot.
+
+    The primary aliquot is first looked up by its aliquot
+    identifier, which is determined by the identifier prefix and
+    aliquot type, and only then by the identifier prefix or
+    requisition identifier.
     """
 
     def __init__(self, subject_identifier=None, requisition_identifier=None,
@@ -25,27 +32,50 @@ class PrimaryAliquot:
         self.identifier_prefix = identifier_prefix
         self.subject_identifier = subject_identifier
 
-        try:
-            model_obj = self.aliquot_model.objects.get(
-                Q(identifier_prefix=self.identifier_prefix) |
-                Q(requisition_identifier=self.requisition_identifier),
-                is_primary=True)
-            self.identifier = model_obj.aliquot_identifier
-        except self.aliquot_model.DoesNotExist:
-            options = dict(
-                aliquot_identifier_cls=aliquot_identifier_cls,
-                aliquot_model=aliquot_model,
-                identifier_prefix=self.identifier_prefix,
-                is_primary=True,
-                requisition_identifier=self.requisition_identifier,
-                subject_identifier=self.subject_identifier,
-                **kwargs)
-            aliquot_creator = aliquot_creator_cls(**options)
-            model_obj = aliquot_creator.create(aliquot_type=self.aliquot_type)
-            self.identifier = model_obj.aliquot_identifier
+        model_obj = self.get_by_aliquot_identifier(
+            aliquot_identifier_cls=aliquot_identifier_cls, **kwargs)
+        if not model_obj:
+            try:
+                model_obj = self.aliquot_model.objects.get(
+                    Q(identifier_prefix=self.identifier_prefix)
+                    | Q(requisition_identifier=self.requisition_identifier),
+                    is_primary=True)
+            except self.aliquot_model.DoesNotExist:
+                options = dict(
+                    aliquot_identifier_cls=aliquot_identifier_cls,
+                    aliquot_model=aliquot_model,
+                    identifier_prefix=self.identifier_prefix,
+                    is_primary=True,
+                    requisition_identifier=self.requisition_identifier,
+                    subject_identifier=self.subject_identifier,
+                    **kwargs)
+                aliquot_creator = aliquot_creator_cls(**options)
+                model_obj = aliquot_creator.create(aliquot_type=self.aliquot_type)
         self.object = model_obj
 
         self.identifier = self.object.aliquot_identifier
 
     def __str__(self):
         return self.object.aliquot_identifier
+
+    def get_by_aliquot_identifier(self, aliquot_identifier_cls=None,
+                                  count_padding=None, identifier_length=None,
+                                  **kwargs):
+        """Returns the primary aliquot model instance looked up by
+        its expected aliquot identifier or None.
+
+        Returns None without a query if the expected identifier
+        cannot be determined.
+        """
+        if not (self.identifier_prefix and self.aliquot_type and aliquot_identifier_cls):
+            return None
+        try:
+            aliquot_identifier = aliquot_identifier_cls(
+                count_padding=count_padding,
+                identifier_length=identifier_length,
+                identifier_prefix=self.identifier_prefix,
+                numeric_code=self.aliquot_type.numeric_code).identifier
+        except AliquotIdentifierLengthError:
+            return None
+        return self.aliquot_model.objects.filter(
+            aliquot_identifier=aliquot_identifier, is_primary=True).first()
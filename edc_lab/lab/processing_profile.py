@@ -1,3 +1,6 @@
+from collections import namedtuple
+
+
 class ProcessingProfileInvalidDerivative(Exception):
     pass
 
@@ -6,16 +9,61 @@ class ProcessingProfileAlreadyAdded(Exception):
     pass
 
 
+ProcessingPlanItem = namedtuple(
+    'ProcessingPlanItem', 'count name alpha_code numeric_code suffix')
+
+
+class ProcessingPlan:
+
+    """An immutable, ordered sequence of the aliquots to be
+    created by a processing profile.
+
+    Each item has the aliquot count, the aliquot type name and
+    codes, and the identifier suffix (numeric code + padded count).
+    Items can stand in for an aliquot type when creating aliquots.
+    """
+
+    __slots__ = ('items', 'start', 'count_padding', 'suffix_lengths')
+
+    def __init__(self, processes=None, count_padding=None, start=None):
+        count = start or 2
+        items = []
+        for process in processes:
+            aliquot_type = process.aliquot_type
+            for n in range(count, count + process.aliquot_count):
+                items.append(ProcessingPlanItem(
+                    n, aliquot_type.name, aliquot_type.alpha_code,
+                    aliquot_type.numeric_code,
+                    f'{aliquot_type.numeric_code or ""}'
+                    f'{str(n).zfill(count_padding or 0)}'))
+            count += process.aliquot_count
+        self.items = tuple(items)
+        self.start = start or 2
+        self.count_padding = count_padding
+        self.suffix_lengths = frozenset(len(item.suffix) for item in self.items)
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(items={len(self.items)})'
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+
 class Process:
 
     """A class to represent the resulting aliquot type and number of
     aliquots from the processing of a source aliquot.
     """
 
+    __slots__ = ('_aliquot_type', '_aliquot_count', '_name')
+
     def __init__(self, aliquot_type=None, aliquot_count=None, **kwargs):
-        self.aliquot_type = aliquot_type
-        self.aliquot_count = aliquot_count
-        self.name = f'{self.aliquot_type.name} x {self.aliquot_count}'
+        self._aliquot_type = aliquot_type
+        self._aliquot_count = aliquot_count
+        self._name = f'{self.aliquot_type.name} x {self.aliquot_count}'
 
     def __repr__(self):
         return f'{self.__class__.__name__}({self.aliquot_type}, {self.aliquot_count})'
@@ -23,6 +71,29 @@ class Process:
     def __str__(self):
         return f'Process {self.name}'
 
+    def __eq__(self, other):
+        if not isinstance(other, Process):
+            return NotImplemented
+        return self.natural_key() == other.natural_key()
+
+    def __hash__(self):
+        return hash(self.natural_key())
+
+    def natural_key(self):
+        return (self._aliquot_type, self._aliquot_count)
+
+    @property
+    def aliquot_type(self):
+        return self._aliquot_type
+
+    @property
+    def aliquot_count(self):
+        return self._aliquot_count
+
+    @property
+    def name(self):
+        return self._name
+
 
 class ProcessingProfile:
 
@@ -31,17 +102,31 @@ class ProcessingProfile:
     Given a source aliquot, all processes in the profile will be "performed"
     to result in new aliquots of types and counts as per the processes.
 
-    Only processes that produce aliquot types that match a `derivative`
-    of the profiles aliquot type are accepted.
+    Only processes that produce aliquot types that match a direct
+    `derivative` of the profiles aliquot type are accepted. Each
+    aliquot is created as a child of the source aliquot, so a
+    transitive derivative, e.g. WB->Plasma->Plasma Aliquot, needs
+    its own profile on the intermediate aliquot type.
+
+    Profiles are equal if their name and aliquot type are equal.
+
+    The profile compiles its processes into a `ProcessingPlan` once,
+    when registered with site_labs, and recompiles if processes
+    are added afterwards.
     """
 
     process_cls = Process
+    plan_cls = ProcessingPlan
+    count_padding = 2
+
+    __slots__ = ('_aliquot_type', '_name', 'processes', 'verbose_name', '_plans')
 
     def __init__(self, name=None, aliquot_type=None, verbose_name=None, **kwargs):
-        self.aliquot_type = aliquot_type
-        self.name = name
+        self._aliquot_type = aliquot_type
+        self._name = name
         self.processes = {}
         self.verbose_name = verbose_name or ' '.join(name.split('_')).title()
+        self._plans = {}
 
     def __repr__(self):
         return f'{self.__class__.__name__}({self.name}, {self.aliquot_type})'
@@ -49,17 +134,70 @@ class ProcessingProfile:
     def __str__(self):
         return f'Processing profile {self.verbose_name}'
 
+    def __eq__(self, other):
+        if not isinstance(other, ProcessingProfile):
+            return NotImplemented
+        return self.natural_key() == other.natural_key()
+
+    def __hash__(self):
+        return hash(self.natural_key())
+
+    def natural_key(self):
+        return (self._name, self._aliquot_type)
+
+    @property
+    def aliquot_type(self):
+        return self._aliquot_type
+
+    @property
+    def name(self):
+        return self._name
+
     def add_processes(self, *processes):
         """Adds processes to the processing profile or raises.
         """
         for process in processes:
-            if process.aliquot_type not in self.aliquot_type.derivatives:
-                raise ProcessingProfileInvalidDerivative(
-                    f'Invalid process for profile. Got \'{process}\'. '
-                    f'\'{process.aliquot_type}\' cannot be derived '
-                    f'from \'{self.aliquot_type}\'.')
+            self.validate_process(process)
             if process.name in self.processes:
                 raise ProcessingProfileAlreadyAdded(
                     f'Process {process.name} has already been added '
                     f'to this procesing profile.')
             self.processes.update({process.name: process})
+        self._plans = {}
+
+    def validate_process(self, process=None):
+        """Raises if the process's aliquot type is not a direct
+        derivative of the profile's aliquot type.
+        """
+        if not self.aliquot_type.is_derivative(process.aliquot_type):
+            raise ProcessingProfileInvalidDerivative(
+                f'Invalid process for profile. Got \'{process}\'. '
+                f'\'{process.aliquot_type}\' cannot be derived '
+                f'from \'{self.aliquot_type}\'.')
+
+    def validate(self):
+        """Validates all processes in the profile or raises.
+        """
+        for process in self.processes.values():
+            self.validate_process(process)
+
+    def compile(self, count_padding=None, start=None):
+        """Returns the processing plan after compiling and caching it.
+        """
+        count_padding = self.count_padding if count_padding is None else count_padding
+        plan = self.plan_cls(
+            processes=self.processes.values(),
+            count_padding=count_padding,
+            start=start)
+        self._plans.update({(count_padding, plan.start): plan})
+        return plan
+
+    def get_plan(self, count_padding=None, start=None):
+        """Returns the cached processing plan, compiling it if
+        not yet compiled.
+        """
+        count_padding = self.count_padding if count_padding is None else count_padding
+        try:
+            return self._plans[(count_padding, start or 2)]
+        except KeyError:
+            return self.compile(count_padding=count_padding, start=start)
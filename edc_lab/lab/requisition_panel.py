@@ -11,6 +11,8 @@ class InvalidProcessingProfile(Exception):
 
 class Names:
 
+    __slots__ = ('abbreviation', 'verbose_name')
+
     def __init__(self, name=None, alpha_code=None):
         self.abbreviation = f'{name[0:2]}{name[-1:]}'.upper()
         title = ' '.join(name.split('_')).title()
@@ -21,18 +23,26 @@ class Names:
 class RequisitionPanel:
 
     """A container class of processing profile instances.
+
+    Panels are equal if their name and requisition model
+    are equal.
     """
 
     names_cls = Names
     model_cls = GetModelCls
 
+    __slots__ = ('_get_model', '_model_name', '_name', '_aliquot_type',
+                 '_processing_profile', 'verbose_name', 'abbreviation')
+
     def __init__(self, name=None, model=None, aliquot_type=None,
                  processing_profile=None,
                  verbose_name=None, abbreviation=None, **kwargs):
-        self._get_model = self.model_cls(model=model).get_model
-        self.aliquot_type = aliquot_type
+        model_getter = self.model_cls(model=model)
+        self._get_model = model_getter.get_model
+        self._model_name = model_getter.model_name
+        self._aliquot_type = aliquot_type
         self.verbose_name = None
-        self.name = name
+        self._name = name
         try:
             names = self.names_cls(
                 name=name, alpha_code=self.aliquot_type.alpha_code, **kwargs)
@@ -40,7 +50,7 @@ class RequisitionPanel:
             raise RequisitionPanelError(f'{self}. Got {e}.')
         self.abbreviation = abbreviation or names.abbreviation
         self.verbose_name = verbose_name or names.verbose_name
-        self.processing_profile = processing_profile
+        self._processing_profile = processing_profile
         if self.processing_profile:
             if self.aliquot_type != self.processing_profile.aliquot_type:
                 raise InvalidProcessingProfile(
@@ -53,6 +63,29 @@ class RequisitionPanel:
     def __str__(self):
         return self.verbose_name or self.name
 
+    def __eq__(self, other):
+        if not isinstance(other, RequisitionPanel):
+            return NotImplemented
+        return self.natural_key() == other.natural_key()
+
+    def __hash__(self):
+        return hash(self.natural_key())
+
+    def natural_key(self):
+        return (self._name, self._model_name)
+
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def aliquot_type(self):
+        return self._aliquot_type
+
+    @property
+    def processing_profile(self):
+        return self._processing_profile
+
     @property
     def model(self):
         return self._get_model()
@@ -52,7 +52,10 @@ class Specimen:
             raise SpecimenNotDrawnError(
                 f'Specimen not drawn. Got \'{requisition}\'')
 
-        self.aliquot_type = self.requisition.panel_object.aliquot_type
+        self._identifier_prefix = None
+        self._primary_aliquot = None
+        self.panel_object = self.requisition.panel_object
+        self.aliquot_type = self.panel_object.aliquot_type
 
         if not self.requisition.identifier_prefix:
             self.requisition.identifier_prefix = self.primary_aliquot.identifier_prefix
@@ -63,20 +66,37 @@ class Specimen:
     def primary_aliquot(self):
         """Returns a primary aliquot model instance after
         getting or creating one.
+
+        The instance is resolved once and cached. See `refresh`.
         """
-        options = dict(
-            aliquot_identifier_cls=self.aliquot_identifier_cls,
-            aliquot_creator_cls=self.aliquot_creator_cls,
-            aliquot_model=self.aliquot_model,
-            aliquot_type=self.aliquot_type,
-            count_padding=self.count_padding,
-            identifier_prefix=self.identifier_prefix,
-            identifier_length=self.identifier_length,
-            requisition_identifier=self.requisition.requisition_identifier)
-        primary_aliquot_obj = self.primary_aliquot_cls(**options)
-        return primary_aliquot_obj.object
+        if not self._primary_aliquot:
+            options = dict(
+                aliquot_identifier_cls=self.aliquot_identifier_cls,
+                aliquot_creator_cls=self.aliquot_creator_cls,
+                aliquot_model=self.aliquot_model,
+                aliquot_type=self.aliquot_type,
+                count_padding=self.count_padding,
+                identifier_prefix=self.identifier_prefix,
+                identifier_length=self.identifier_length,
+                requisition_identifier=self.requisition.requisition_identifier)
+            primary_aliquot_obj = self.primary_aliquot_cls(**options)
+            self._primary_aliquot = primary_aliquot_obj.object
+        return self._primary_aliquot
+
+    def refresh(self):
+        """Clears the cached primary aliquot and identifier prefix
+        so that both are resolved again on next access.
+        """
+        self._identifier_prefix = None
+        self._primary_aliquot = None
+
+    def process(self, bulk=None):
+        """Creates the aliquots in the panel's processing profile.
 
-    def process(self):
+        If `bulk` is True, aliquots are created in one transaction
+        and a `SpecimenProcessorResult` is returned instead of the
+        list of created aliquots.
+        """
         specimen_processor = self.specimen_processor_cls(
             aliquot_identifier_cls=self.aliquot_identifier_cls,
             aliquot_creator_cls=self.aliquot_creator_cls,
@@ -84,8 +104,10 @@ class Specimen:
             identifier_length=self.identifier_length,
             identifier_prefix=self.identifier_prefix,
             model_obj=self.primary_aliquot,
-            processing_profile=self.requisition.panel_object.processing_profile,
+            processing_profile=self.panel_object.processing_profile,
         )
+        if bulk:
+            return specimen_processor.create_bulk()
         return specimen_processor.create()
 
     @property
@@ -98,10 +120,12 @@ class Specimen:
         """Returns an identifier prefix string based on the
         requisition_identifier.
         """
-        prefix_obj = self.prefix_cls(
-            length=self.prefix_length,
-            protocol_number=self.requisition.protocol_number,
-            requisition_identifier=self.requisition.requisition_identifier,
-            template=self.prefix_template,
-        )
-        return str(prefix_obj)
+        if not self._identifier_prefix:
+            prefix_obj = self.prefix_cls(
+                length=self.prefix_length,
+                protocol_number=self.requisition.protocol_number,
+                requisition_identifier=self.requisition.requisition_identifier,
+                template=self.prefix_template,
+            )
+            self._identifier_prefix = str(prefix_obj)
+        return self._identifier_prefix
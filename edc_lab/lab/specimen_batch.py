@@ -0,0 +1,205 @@
+from django.apps import apps as django_apps
+from django.db import transaction
+from django.db.models import Q
+
+from edc_base.utils import get_utcnow
+from edc_constants.constants import YES
+
+from ..bulk import bulk_create_history, bulk_create_with_history, bulk_update
+from .specimen import Specimen, SpecimenNotDrawnError
+
+
+class SpecimenBatch:
+
+    """A class that represents the collected specimens of many
+    requisitions, e.g. a rack of tubes, and their aliquots.
+
+    Primary aliquots are resolved with one query and those that
+    do not already exist are created in bulk, either on first
+    access to `primary_aliquots` or, with the aliquots of the
+    processing profiles, in the one transaction of `process`.
+
+    Configuration (identifier length, prefix template, etc) is
+    taken from `specimen_cls`.
+    """
+
+    specimen_cls = Specimen
+
+    def __init__(self, requisitions=None, requisition_pks=None,
+                 requisition_identifiers=None, aliquot_model=None,
+                 requisition_model=None, **kwargs):
+
+        app_config = django_apps.get_app_config('edc_lab')
+        self.aliquot_model = (aliquot_model or django_apps.get_model(
+            *app_config.aliquot_model.split('.')))
+
+        if requisitions is None:
+            requisition_model = requisition_model or django_apps.get_model(
+                *app_config.requisition_model.split('.'))
+            if requisition_pks is not None:
+                requisitions = requisition_model.objects.filter(
+                    pk__in=requisition_pks)
+            else:
+                requisitions = requisition_model.objects.filter(
+                    requisition_identifier__in=requisition_identifiers or [])
+        self.requisitions = list(requisitions)
+
+        not_drawn = [obj for obj in self.requisitions if obj.is_drawn != YES]
+        if not_drawn:
+            raise SpecimenNotDrawnError(
+                f'Specimen not drawn. Got {[str(obj) for obj in not_drawn]}')
+
+        self.identifier_prefixes = {
+            obj.pk: self.get_identifier_prefix(obj) for obj in self.requisitions}
+        self._primary_aliquots = None
+        self.stamped_requisitions = []
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(requisitions={len(self.requisitions)})'
+
+    def get_identifier_prefix(self, requisition=None):
+        """Returns an identifier prefix string based on the
+        requisition_identifier.
+        """
+        prefix_obj = self.specimen_cls.prefix_cls(
+            length=self.specimen_cls.prefix_length,
+            protocol_number=requisition.protocol_number,
+            requisition_identifier=requisition.requisition_identifier,
+            template=self.specimen_cls.prefix_template,
+        )
+        return str(prefix_obj)
+
+    @property
+    def primary_aliquots(self):
+        """Returns a dictionary of primary aliquot model instances
+        by requisition pk, creating any that do not exist.
+        """
+        if self._primary_aliquots is None:
+            self._primary_aliquots = self.get_or_create_primary_aliquots()
+        return self._primary_aliquots
+
+    def get_or_create_primary_aliquots(self):
+        """Returns a dictionary of primary aliquot model instances
+        by requisition pk after getting or creating them.
+
+        Requisitions are updated with their identifier prefix
+        and primary aliquot identifier. Their previous values are
+        kept in `stamped_requisitions` and restored if the
+        transaction rolls back.
+        """
+        primary_aliquots = {}
+        by_prefix = {}
+        by_requisition_identifier = {}
+        for obj in self.aliquot_model.objects.filter(
+                Q(identifier_prefix__in=self.identifier_prefixes.values())
+                | Q(requisition_identifier__in=[
+                    obj.requisition_identifier for obj in self.requisitions]),
+                is_primary=True):
+            by_prefix.update({obj.identifier_prefix: obj})
+            by_requisition_identifier.update({obj.requisition_identifier: obj})
+        missing = {}
+        for requisition in self.requisitions:
+            identifier_prefix = self.identifier_prefixes.get(requisition.pk)
+            aliquot = (by_prefix.get(identifier_prefix)
+                       or by_requisition_identifier.get(requisition.requisition_identifier))
+            if aliquot:
+                primary_aliquots.update({requisition.pk: aliquot})
+            else:
+                missing.update({requisition.pk: self.build_primary_aliquot(
+                    requisition=requisition, identifier_prefix=identifier_prefix)})
+        updated_requisitions = []
+        self.stamped_requisitions = []
+        try:
+            with transaction.atomic():
+                bulk_create_with_history(
+                    model=self.aliquot_model, objs=missing.values())
+                primary_aliquots.update(missing)
+                modified = get_utcnow()
+                for requisition in self.requisitions:
+                    if not requisition.identifier_prefix:
+                        self.stamped_requisitions.append((
+                            requisition, requisition.identifier_prefix,
+                            requisition.primary_aliquot_identifier, requisition.modified))
+                        aliquot = primary_aliquots.get(requisition.pk)
+                        requisition.identifier_prefix = aliquot.identifier_prefix
+                        requisition.primary_aliquot_identifier = aliquot.aliquot_identifier
+                        requisition.modified = modified
+                        updated_requisitions.append(requisition)
+                if updated_requisitions:
+                    requisition_model = updated_requisitions[0].__class__
+                    bulk_update(
+                        model=requisition_model,
+                        objs=updated_requisitions,
+                        fields=['identifier_prefix', 'primary_aliquot_identifier', 'modified'])
+                    bulk_create_history(
+                        model=requisition_model, objs=updated_requisitions, history_type='~')
+        except Exception:
+            self.restore_requisitions()
+            raise
+        return primary_aliquots
+
+    def restore_requisitions(self):
+        """Restores the values of the requisitions stamped by
+        `get_or_create_primary_aliquots` after a rollback.
+        """
+        for requisition, identifier_prefix, primary_aliquot_identifier, modified in (
+                self.stamped_requisitions):
+            requisition.identifier_prefix = identifier_prefix
+            requisition.primary_aliquot_identifier = primary_aliquot_identifier
+            requisition.modified = modified
+        self.stamped_requisitions = []
+
+    def build_primary_aliquot(self, requisition=None, identifier_prefix=None):
+        """Returns an unsaved primary aliquot model instance.
+        """
+        aliquot_creator = self.specimen_cls.aliquot_creator_cls(
+            aliquot_identifier_cls=self.specimen_cls.aliquot_identifier_cls,
+            aliquot_model=self.aliquot_model,
+            count_padding=self.specimen_cls.count_padding,
+            identifier_length=self.specimen_cls.identifier_length,
+            identifier_prefix=identifier_prefix,
+            is_primary=True,
+            requisition_identifier=requisition.requisition_identifier)
+        return aliquot_creator.build(
+            aliquot_type=requisition.panel_object.aliquot_type)
+
+    def get_specimen_processor(self, requisition=None):
+        return self.specimen_cls.specimen_processor_cls(
+            aliquot_identifier_cls=self.specimen_cls.aliquot_identifier_cls,
+            aliquot_creator_cls=self.specimen_cls.aliquot_creator_cls,
+            count_padding=self.specimen_cls.count_padding,
+            identifier_length=self.specimen_cls.identifier_length,
+            identifier_prefix=self.identifier_prefixes.get(requisition.pk),
+            model_obj=self.primary_aliquots.get(requisition.pk),
+            processing_profile=requisition.panel_object.processing_profile,
+        )
+
+    def process(self):
+        """Gets or creates the primary aliquots and creates the
+        aliquots of all processing profiles in one transaction.
+
+        Returns a `SpecimenProcessorResult`.
+        """
+        if not self.requisitions:
+            return self.specimen_cls.specimen_processor_cls.result_cls()
+        created = self._primary_aliquots is None
+        try:
+            with transaction.atomic():
+                aliquots = []
+                for requisition in self.requisitions:
+                    aliquots.extend(
+                        self.get_specimen_processor(requisition=requisition).build())
+                specimen_processor = self.get_specimen_processor(
+                    requisition=self.requisitions[0])
+                return specimen_processor.create_bulk(aliquots=aliquots)
+        except Exception:
+            if created:
+                # primary aliquots and requisition updates were rolled back
+                self._primary_aliquots = None
+                self.restore_requisitions()
+            raise
+
+    @property
+    def aliquots(self):
+        return self.aliquot_model.objects.filter(
+            identifier_prefix__in=self.identifier_prefixes.values())
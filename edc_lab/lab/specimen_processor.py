@@ -1,16 +1,38 @@
 from django.db.utils import IntegrityError
 from django.db import transaction
 
+from ..bulk import bulk_create_with_history
+from ..identifiers import AliquotIdentifierBatch
+
 
 class SpecimenProcessorError(Exception):
     pass
 
 
+class SpecimenProcessorResult:
+
+    """A class that reports the aliquots created and the aliquot
+    identifiers skipped, because they already exist, by a bulk
+    processing run.
+    """
+
+    def __init__(self, created=None, skipped=None):
+        self.created = created or []
+        self.skipped = skipped or []
+
+    def __repr__(self):
+        return (f'{self.__class__.__name__}(created={len(self.created)}, '
+                f'skipped={len(self.skipped)})')
+
+
 class SpecimenProcessor:
     """A class to process a specimen according to its processing
     profile.
     """
 
+    aliquot_identifier_batch_cls = AliquotIdentifierBatch
+    result_cls = SpecimenProcessorResult
+
     def __init__(self, model_obj=None, processing_profile=None,
                  aliquot_creator_cls=None, aliquot_identifier_cls=None,
                  identifier_length=None, identifier_prefix=None,
@@ -19,9 +41,10 @@ class SpecimenProcessor:
         self.aliquot_creator_cls = aliquot_creator_cls
         self.aliquot_identifier_cls = aliquot_identifier_cls
         self.processing_profile = processing_profile
+        self.aliquot_model = model_obj.__class__
 
         self.aliquot_creator_defaults = dict(
-            aliquot_model=model_obj.__class__,
+            aliquot_model=self.aliquot_model,
             count_padding=count_padding,
             identifier_length=identifier_length,
             identifier_prefix=identifier_prefix,
@@ -29,25 +52,81 @@ class SpecimenProcessor:
 
     def create(self):
         """Creates all aliquots in the porcessing profile.
+
+        Aliquots are created in the order of the processing
+        profile's compiled plan.
         """
         created = []
-        count = 1
-        for process in self.processing_profile.processes.values():
-            aliquot_count = process.aliquot_count
-            for _ in range(1, aliquot_count + 1):
-                count += 1
-                with transaction.atomic():
-                    try:
-                        aliquot_creator = self.aliquot_creator_cls(
-                            aliquot_identifier_cls=self.aliquot_identifier_cls,
-                            parent_identifier=self.object.aliquot_identifier,
-                            **self.aliquot_creator_defaults
-                        )
-                        aliquot = aliquot_creator.create(
-                            count=count, aliquot_type=process.aliquot_type)
-                    except IntegrityError:
-                        # raise SpecimenProcessorError(e) from e
-                        pass
-                    else:
-                        created.append(aliquot)
+        aliquot_creator = self.aliquot_creator_cls(
+            aliquot_identifier_cls=self.aliquot_identifier_cls,
+            parent_identifier=self.object.aliquot_identifier,
+            **self.aliquot_creator_defaults)
+        plan = self.processing_profile.get_plan(
+            count_padding=self.aliquot_creator_defaults.get('count_padding'))
+        for item in plan:
+            with transaction.atomic():
+                try:
+                    aliquot = aliquot_creator.create(
+                        count=item.count, aliquot_type=item)
+                except IntegrityError:
+                    # raise SpecimenProcessorError(e) from e
+                    pass
+                else:
+                    created.append(aliquot)
         return created
+
+    def build(self):
+        """Returns a list of unsaved aliquot model instances, one
+        for each aliquot in the processing profile.
+        """
+        aliquot_creator = self.aliquot_creator_cls(
+            aliquot_identifier_cls=self.aliquot_identifier_cls,
+            parent_identifier=self.object.aliquot_identifier,
+            **self.aliquot_creator_defaults)
+        identifier_batch = self.aliquot_identifier_batch_cls(
+            identifier_prefix=self.aliquot_creator_defaults.get('identifier_prefix'),
+            parent_segment=self.object.aliquot_identifier[-4:],
+            processing_profile=self.processing_profile,
+            identifier_length=self.aliquot_creator_defaults.get('identifier_length'),
+            count_padding=self.aliquot_creator_defaults.get('count_padding'))
+        return [
+            aliquot_creator.build(
+                count=item.count,
+                aliquot_type=item.aliquot_type,
+                aliquot_identifier=item.identifier)
+            for item in identifier_batch]
+
+    def create_bulk(self, aliquots=None):
+        """Creates all aliquots in the processing profile not
+        already created and returns a result object.
+
+        Existing aliquots are found with a single query and the
+        remainder inserted with a single `bulk_create`.
+
+        If `aliquots` is given, those unsaved aliquots are created
+        instead, e.g. those of all specimens in a `SpecimenBatch`.
+        """
+        aliquots = self.build() if aliquots is None else list(aliquots)
+        with transaction.atomic():
+            existing = self.get_existing_identifiers(
+                [obj.aliquot_identifier for obj in aliquots])
+            try:
+                created = bulk_create_with_history(
+                    model=self.aliquot_model,
+                    objs=[obj for obj in aliquots
+                          if obj.aliquot_identifier not in existing])
+            except IntegrityError as e:
+                raise SpecimenProcessorError(
+                    f'Unable to create aliquots for {self.object}. Got {e}') from e
+        return self.result_cls(
+            created=created,
+            skipped=[obj.aliquot_identifier for obj in aliquots
+                     if obj.aliquot_identifier in existing])
+
+    def get_existing_identifiers(self, aliquot_identifiers=None):
+        """Returns the subset of `aliquot_identifiers` that already
+        exist as a set.
+        """
+        return set(self.aliquot_model.objects.filter(
+            aliquot_identifier__in=aliquot_identifiers).values_list(
+                'aliquot_identifier', flat=True))
@@ -0,0 +1,141 @@
+from collections import namedtuple
+from django.apps import apps as django_apps
+from django.db import transaction
+
+from edc_base.utils import get_utcnow
+
+from ..box_geometry import box_geometries
+from ..bulk import bulk_create_history
+from ..exceptions import StorageLocationError
+
+StorageLocation = namedtuple(
+    'StorageLocation',
+    'identifier freezer shelf rack rack_position box_identifier position row column')
+
+
+class StorageLocator:
+
+    """A class to find where aliquots are stored and to move
+    boxes and racks.
+
+    The location of any number of aliquots is read with one
+    query from the box item identifier index through box, rack,
+    shelf and freezer. Locations are not copied onto box items
+    so moving a rack or boxes is one UPDATE regardless of the
+    number of aliquots moved.
+
+    For example:
+        locator = StorageLocator()
+        locator.locate(['AAA0000010201', ...])
+        locator.move_rack(rack=rack, shelf=shelf)
+    """
+
+    location_cls = StorageLocation
+
+    location_fields = [
+        'identifier',
+        'box__rack__shelf__freezer__name',
+        'box__rack__shelf__name',
+        'box__rack__name',
+        'box__rack_position',
+        'box__box_identifier',
+        'position',
+        'box__box_type__across',
+        'box__box_type__down',
+        'box__box_type__total',
+        'box__box_type__fill_order']
+
+    def __init__(self, box_model=None, box_item_model=None):
+        app_config = django_apps.get_app_config('edc_lab')
+        self.box_model = box_model or django_apps.get_model(
+            *app_config.box_model.split('.'))
+        self.box_item_model = box_item_model or django_apps.get_model(
+            *app_config.box_item_model.split('.'))
+        self.rack_model = self.box_model._meta.get_field('rack').related_model
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    def locate(self, identifiers=None):
+        """Returns a dictionary of {identifier: location} for the
+        identifiers that are in a box that has not been shipped.
+
+        Boxes not in a rack have None for freezer, shelf, rack and
+        rack_position.
+        """
+        locations = {}
+        for values in self.box_item_model.objects.in_open_boxes().filter(
+                identifier__in=list(identifiers)).values_list(*self.location_fields):
+            geometry = box_geometries.get_layout(*values[7:])
+            locations[values[0]] = self.location_cls(
+                *values[:7], *geometry.coordinates(values[6]))
+        return locations
+
+    def locate_one(self, identifier=None):
+        """Returns the location of an identifier or None.
+        """
+        return self.locate([identifier]).get(identifier)
+
+    def move_rack(self, rack=None, shelf=None, position=None):
+        """Moves a rack, and all boxes in it, to a shelf.
+        """
+        values = dict(shelf=shelf, modified=get_utcnow())
+        if position is not None:
+            values.update(position=position)
+        return self.rack_model.objects.filter(pk=rack.pk).update(**values)
+
+    def move_boxes(self, boxes=None, rack=None):
+        """Moves boxes to a rack keeping their rack positions and
+        returns the number of boxes moved.
+
+        `boxes` is a queryset or a list of boxes. One UPDATE moves
+        the boxes and one INSERT writes their historical records.
+        If `rack` is None the boxes are removed from storage.
+
+        Raises StorageLocationError if a rack position is taken in
+        `rack` or by more than one of the boxes.
+        """
+        pks = [obj.pk for obj in boxes]
+        values = dict(rack=rack, modified=get_utcnow())
+        if rack is None:
+            values.update(rack_position=None)
+        with transaction.atomic():
+            if rack is not None:
+                self.check_rack_positions(pks=pks, rack=rack)
+            moved = self.box_model.objects.filter(pk__in=pks).update(**values)
+            bulk_create_history(
+                model=self.box_model,
+                objs=self.box_model.objects.filter(pk__in=pks),
+                history_type='~')
+        return moved
+
+    def check_rack_positions(self, pks=None, rack=None):
+        """Raises StorageLocationError if the rack positions of the
+        boxes are not free in the rack.
+
+        Locks the rack row so concurrent moves to the same rack
+        are checked one at a time.
+        """
+        self.rack_model.objects.select_for_update().get(pk=rack.pk)
+        taken = dict(self.box_model.objects.filter(
+            rack=rack, rack_position__isnull=False).exclude(pk__in=pks).values_list(
+                'rack_position', 'box_identifier'))
+        conflicts = []
+        for box_identifier, rack_position in self.box_model.objects.filter(
+                pk__in=pks, rack_position__isnull=False).order_by(
+                    'rack_position').values_list('box_identifier', 'rack_position'):
+            if rack_position in taken:
+                conflicts.append(
+                    f'{box_identifier} at {rack_position} ({taken.get(rack_position)})')
+            taken.update({rack_position: box_identifier})
+        if conflicts:
+            raise StorageLocationError(
+                f'Unable to move boxes to rack {rack}. Rack position taken. '
+                f'Got {", ".join(conflicts)}.')
+
+    def move_rack_boxes(self, from_rack=None, to_rack=None):
+        """Moves all boxes in one rack to another rack keeping
+        their rack positions.
+        """
+        return self.move_boxes(
+            boxes=self.box_model.objects.filter(rack=from_rack), rack=to_rack)
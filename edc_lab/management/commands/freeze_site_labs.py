@@ -0,0 +1,25 @@
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand, CommandError
+
+from ...site_labs import site_labs
+
+
+class Command(BaseCommand):
+
+    help = ('Writes a snapshot of the site_labs registry to be loaded by '
+            'workers instead of autodiscovering labs.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=None,
+            help='Snapshot file. Default: settings.EDC_LAB_SITE_LABS_SNAPSHOT.')
+
+    def handle(self, *args, **options):
+        path = options.get('path') or django_apps.get_app_config(
+            'edc_lab').labs_snapshot
+        if not path:
+            raise CommandError(
+                'Snapshot path not specified. Use --path or set '
+                'settings.EDC_LAB_SITE_LABS_SNAPSHOT.')
+        site_labs.freeze(path)
+        self.stdout.write(f'Wrote site_labs snapshot to {path}.\n')
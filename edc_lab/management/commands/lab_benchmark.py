@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from ...benchmarks import benchmarks
+
+
+class Command(BaseCommand):
+
+    help = 'Runs an edc_lab benchmark and writes timings to stdout.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'benchmark', choices=sorted(benchmarks),
+            help='Name of the benchmark to run.')
+        parser.add_argument(
+            '--size', type=int, default=None,
+            help='Size of the data set. Default depends on the benchmark.')
+        parser.add_argument(
+            '--number', type=int, default=None,
+            help='Number of timed calls. Default depends on the benchmark.')
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'Running benchmark \'{options.get("benchmark")}\' ...\n')
+        benchmarks.get(options.get('benchmark'))(
+            size=options.get('size'),
+            number=options.get('number'),
+            stdout=self.stdout)
+        self.stdout.write('Done.\n')
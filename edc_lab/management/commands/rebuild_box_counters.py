@@ -0,0 +1,25 @@
+from django.apps import apps as django_apps
+from django.core.management.base import BaseCommand
+
+
+class Command(BaseCommand):
+
+    help = ('Recalculates the item_count, verified_count and max_position '
+            'of boxes from their box items.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'box_identifiers', nargs='*',
+            help='Box identifiers. Default: all boxes.')
+
+    def handle(self, *args, **options):
+        app_config = django_apps.get_app_config('edc_lab')
+        box_model = django_apps.get_model(*app_config.box_model.split('.'))
+        boxes = box_model.objects.all()
+        if options.get('box_identifiers'):
+            boxes = boxes.filter(box_identifier__in=options.get('box_identifiers'))
+        count = 0
+        for box in boxes.iterator():
+            box.rebuild_counters()
+            count += 1
+        self.stdout.write(f'Rebuilt counters for {count} boxes.\n')
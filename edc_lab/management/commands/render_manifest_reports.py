@@ -0,0 +1,41 @@
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from ...reports.manifest_artifacts import manifest_artifacts
+
+
+class Command(BaseCommand):
+
+    help = ('Renders and stores the PDF of shipped manifests that do not '
+            'yet have a stored artifact for their current contents.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'manifest_identifiers', nargs='*',
+            help='Manifest identifiers. Default: all shipped manifests.')
+        parser.add_argument(
+            '--username', required=True,
+            help='User named as shipper contact on the manifest.')
+
+    def handle(self, *args, **options):
+        app_config = django_apps.get_app_config('edc_lab')
+        manifest_model = django_apps.get_model(*app_config.manifest_model.split('.'))
+        try:
+            user = get_user_model().objects.get(username=options.get('username'))
+        except get_user_model().DoesNotExist:
+            raise CommandError(f'Invalid username. Got {options.get("username")}.')
+        manifests = manifest_model.objects.filter(shipped=True).select_related(
+            'shipper', 'consignee')
+        if options.get('manifest_identifiers'):
+            manifests = manifests.filter(
+                manifest_identifier__in=options.get('manifest_identifiers'))
+        rendered = 0
+        for manifest in manifests:
+            reprint = manifest.printed
+            if not manifest_artifacts.get(manifest=manifest, reprint=reprint, user=user):
+                name = manifest_artifacts.render(
+                    manifest=manifest, reprint=reprint, user=user)
+                self.stdout.write(f' * {manifest.manifest_identifier}: {name}\n')
+                rendered += 1
+        self.stdout.write(f'Rendered {rendered} manifest reports.\n')
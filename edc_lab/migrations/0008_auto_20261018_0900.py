@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.2 on 2026-10-18 09:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edc_lab', '0007_auto_20170321_1119'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='aliquot',
+            index=models.Index(fields=['identifier_prefix', 'is_primary'], name='edc_lab_aliquot_prefix_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='aliquot',
+            index=models.Index(fields=['requisition_identifier', 'is_primary'], name='edc_lab_aliquot_req_idx'),
+        ),
+    ]
@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.2 on 2026-10-18 10:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+from django.db.models import Count, Case, Max, When
+
+
+def update_box_counters(apps, schema_editor):
+    Box = apps.get_model('edc_lab', 'box')
+    for box in Box.objects.annotate(
+            _item_count=Count('boxitem'),
+            _verified_count=Count(Case(When(boxitem__verified=1, then=1))),
+            _max_position=Max('boxitem__position')):
+        Box.objects.filter(pk=box.pk).update(
+            item_count=box._item_count,
+            verified_count=box._verified_count,
+            max_position=box._max_position or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edc_lab', '0008_auto_20261018_0900'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='box',
+            name='item_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of items in the box. Maintained by BoxItem.'),
+        ),
+        migrations.AddField(
+            model_name='box',
+            name='max_position',
+            field=models.IntegerField(default=0, editable=False, help_text='Highest position occupied in the box.'),
+        ),
+        migrations.AddField(
+            model_name='box',
+            name='verified_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of items in the box that have been verified.'),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='item_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of items in the box. Maintained by BoxItem.'),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='max_position',
+            field=models.IntegerField(default=0, editable=False, help_text='Highest position occupied in the box.'),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='verified_count',
+            field=models.IntegerField(default=0, editable=False, help_text='Number of items in the box that have been verified.'),
+        ),
+        migrations.RunPython(update_box_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,46 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.2 on 2026-10-18 11:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+def update_box_occupancy(apps, schema_editor):
+    Box = apps.get_model('edc_lab', 'box')
+    BoxItem = apps.get_model('edc_lab', 'boxitem')
+    for box in Box.objects.select_related('box_type'):
+        box_type = box.box_type
+        bitmap = 0
+        for position in BoxItem.objects.filter(box=box).values_list('position', flat=True):
+            if not 1 <= position <= box_type.across * box_type.down:
+                continue
+            if box_type.fill_order == 'down':
+                row, column = divmod(position - 1, box_type.across)
+                slot = column * box_type.down + row
+            else:
+                slot = position - 1
+            if slot < box_type.total:
+                bitmap |= 1 << slot
+        Box.objects.filter(pk=box.pk).update(
+            occupancy=bitmap.to_bytes((box_type.total + 7) // 8, 'little'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edc_lab', '0009_auto_20261018_1000'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='box',
+            name='occupancy',
+            field=models.BinaryField(editable=False, help_text='Bitmap of occupied slots in fill order.', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='occupancy',
+            field=models.BinaryField(editable=False, help_text='Bitmap of occupied slots in fill order.', null=True),
+        ),
+        migrations.RunPython(update_box_occupancy, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.2 on 2026-10-18 12:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+import django.db.models.deletion
+import django_revision.revision_field
+import edc_base.model_fields.hostname_modification_field
+import edc_base.model_fields.userfield
+import edc_base.model_fields.uuid_auto_field
+import edc_base.utils
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edc_lab', '0010_auto_20261018_1100'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Freezer',
+            fields=[
+                ('created', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('modified', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('user_created', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user created')),
+                ('user_modified', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user modified')),
+                ('hostname_created', models.CharField(blank=True, default='mac2-2.local', help_text='System field. (modified on create only)', max_length=50)),
+                ('hostname_modified', edc_base.model_fields.hostname_modification_field.HostnameModificationField(blank=True, help_text='System field. (modified on every save)', max_length=50)),
+                ('revision', django_revision.revision_field.RevisionField(blank=True, editable=False, help_text='System field. Git repository tag:branch:commit.', max_length=75, null=True, verbose_name='Revision')),
+                ('id', edc_base.model_fields.uuid_auto_field.UUIDAutoField(blank=True, editable=False, help_text='System auto field. UUID primary key.', primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='a unique name to describe this freezer', max_length=25, unique=True)),
+                ('description', models.CharField(blank=True, max_length=50, null=True)),
+                ('location', models.CharField(blank=True, help_text='room or building', max_length=50, null=True)),
+            ],
+            options={
+                'ordering': ('name',),
+            },
+        ),
+        migrations.CreateModel(
+            name='Shelf',
+            fields=[
+                ('created', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('modified', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('user_created', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user created')),
+                ('user_modified', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user modified')),
+                ('hostname_created', models.CharField(blank=True, default='mac2-2.local', help_text='System field. (modified on create only)', max_length=50)),
+                ('hostname_modified', edc_base.model_fields.hostname_modification_field.HostnameModificationField(blank=True, help_text='System field. (modified on every save)', max_length=50)),
+                ('revision', django_revision.revision_field.RevisionField(blank=True, editable=False, help_text='System field. Git repository tag:branch:commit.', max_length=75, null=True, verbose_name='Revision')),
+                ('id', edc_base.model_fields.uuid_auto_field.UUIDAutoField(blank=True, editable=False, help_text='System auto field. UUID primary key.', primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='a name unique to the freezer', max_length=25)),
+                ('position', models.IntegerField(default=0, help_text='shelf number counting from the top')),
+                ('freezer', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='edc_lab.Freezer')),
+            ],
+            options={
+                'ordering': ('freezer', 'position'),
+                'verbose_name_plural': 'Shelves',
+            },
+        ),
+        migrations.CreateModel(
+            name='Rack',
+            fields=[
+                ('created', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('modified', models.DateTimeField(blank=True, default=edc_base.utils.get_utcnow)),
+                ('user_created', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user created')),
+                ('user_modified', edc_base.model_fields.userfield.UserField(blank=True, max_length=50, verbose_name='user modified')),
+                ('hostname_created', models.CharField(blank=True, default='mac2-2.local', help_text='System field. (modified on create only)', max_length=50)),
+                ('hostname_modified', edc_base.model_fields.hostname_modification_field.HostnameModificationField(blank=True, help_text='System field. (modified on every save)', max_length=50)),
+                ('revision', django_revision.revision_field.RevisionField(blank=True, editable=False, help_text='System field. Git repository tag:branch:commit.', max_length=75, null=True, verbose_name='Revision')),
+                ('id', edc_base.model_fields.uuid_auto_field.UUIDAutoField(blank=True, editable=False, help_text='System auto field. UUID primary key.', primary_key=True, serialize=False)),
+                ('name', models.CharField(help_text='a name unique to the shelf', max_length=25)),
+                ('position', models.IntegerField(default=0, help_text='rack number on the shelf counting from the left')),
+                ('shelf', models.ForeignKey(on_delete=django.db.models.deletion.PROTECT, to='edc_lab.Shelf')),
+            ],
+            options={
+                'ordering': ('shelf', 'position'),
+            },
+        ),
+        migrations.AlterUniqueTogether(
+            name='shelf',
+            unique_together=set([('freezer', 'name')]),
+        ),
+        migrations.AlterUniqueTogether(
+            name='rack',
+            unique_together=set([('shelf', 'name')]),
+        ),
+        migrations.AddField(
+            model_name='box',
+            name='rack',
+            field=models.ForeignKey(blank=True, help_text='Rack where the box is stored, if any.', null=True, on_delete=django.db.models.deletion.PROTECT, to='edc_lab.Rack'),
+        ),
+        migrations.AddField(
+            model_name='box',
+            name='rack_position',
+            field=models.IntegerField(blank=True, help_text='Slot of the box in the rack.', null=True),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='rack',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Rack where the box is stored, if any.', null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to='edc_lab.Rack'),
+        ),
+        migrations.AddField(
+            model_name='historicalbox',
+            name='rack_position',
+            field=models.IntegerField(blank=True, help_text='Slot of the box in the rack.', null=True),
+        ),
+        migrations.AlterUniqueTogether(
+            name='box',
+            unique_together=set([('rack', 'rack_position')]),
+        ),
+    ]
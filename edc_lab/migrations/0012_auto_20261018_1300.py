@@ -0,0 +1,19 @@
+# -*- coding: utf-8 -*-
+# Generated by Django 1.11.2 on 2026-10-18 13:00
+from __future__ import unicode_literals
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('edc_lab', '0011_auto_20261018_1200'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='boxitem',
+            index=models.Index(fields=['identifier', 'box', 'position'], name='edc_lab_boxitem_locate_idx'),
+        ),
+    ]
@@ -13,13 +13,24 @@ class PanelModelMixin(models.Model):
 
     @property
     def panel_object(self):
+        """Returns the panel instance for this panel_name.
+
+        The panel, or None if the panel name is undefined, is
+        cached on the instance until panel_name changes or lab
+        profiles are re-registered.
+        """
         try:
-            panel_object = site_labs.get(
-                self._meta.label_lower).panels[self.panel_name]
-        except KeyError as e:
+            panel_name, version, panel_object = self._panel_object
+        except AttributeError:
+            panel_name, version, panel_object = None, None, None
+        if panel_name != self.panel_name or version != site_labs.version:
+            panel_object = site_labs.get_panel(
+                self._meta.label_lower, self.panel_name)
+            self._panel_object = (self.panel_name, site_labs.version, panel_object)
+        if panel_object is None:
             raise PanelModelError(
-                'Undefined panel name. Got {}. See AppConfig. Got {}'.format(
-                    self.panel_name, str(e)))
+                f'Undefined panel name. Got {self.panel_name}. '
+                f'See AppConfig. Got \'{self._meta.label_lower}\'')
         return panel_object
 
     class Meta:
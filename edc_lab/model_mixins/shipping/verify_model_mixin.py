@@ -1,9 +1,10 @@
-from django.db import models
+from django.db import models, transaction
 
 from edc_base.utils import get_utcnow
 from edc_constants.constants import OPEN
 
-from ...constants import VERIFIED
+from ...bulk import bulk_create_history
+from ...constants import FLAG_UNVERIFIED, FLAG_VERIFIED, VERIFIED
 
 
 class VerifyModelMixin(models.Model):
@@ -37,16 +38,38 @@ class VerifyBoxModelMixin(VerifyModelMixin, models.Model):
                 self.status = OPEN
 
     def unverify_box(self):
+        """Unverifies all items in the box with one UPDATE and
+        saves the box once.
+        """
         if self.status in [OPEN, VERIFIED]:
-            for box_item in self.boxitem_set.all():
-                box_item.unverify()
+            with transaction.atomic():
+                box_items = list(self.boxitem_set.exclude(verified=FLAG_UNVERIFIED))
+                if box_items:
+                    verified_count = len(
+                        [obj for obj in box_items if obj.verified == FLAG_VERIFIED])
+                    modified = get_utcnow()
+                    self.boxitem_set.filter(
+                        pk__in=[obj.pk for obj in box_items]).update(
+                            verified=FLAG_UNVERIFIED, verified_datetime=None, modified=modified)
+                    for box_item in box_items:
+                        box_item.verified = FLAG_UNVERIFIED
+                        box_item.verified_datetime = None
+                        box_item.modified = modified
+                    bulk_create_history(
+                        model=self.boxitem_set.model, objs=box_items, history_type='~')
+                    self.add_to_counters(verified_count=-verified_count)
                 self.save()
 
     @property
     def is_verified(self):
-        if self.boxitem_set.all().count() == 0:
+        """Returns True if the box has items and all have been
+        verified, using the counters maintained on the box.
+
+        Items flagged as a mismatch are not verified.
+        """
+        if self.item_count == 0:
             return False
-        elif self.boxitem_set.filter(verified=False).exists():
+        elif self.verified_count < self.item_count:
             return False
         return True
 
@@ -4,6 +4,7 @@ from .box_item import BoxItem
 from .box_type import BoxType
 from .receive import Receive
 from .identifier_history import IdentifierHistory
+from .storage import Freezer, Rack, Shelf
 from .manifest import Manifest, ManifestItem, Shipper, Consignee
 
 import sys
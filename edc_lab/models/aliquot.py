@@ -1,3 +1,5 @@
+from django.db import models
+
 from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
 from edc_search.model_mixins import SearchSlugModelMixin, SearchSlugManager
@@ -42,3 +44,10 @@ class Aliquot(AliquotModelMixin,
 
     class Meta:
         app_label = 'edc_lab'
+        indexes = [
+            models.Index(
+                fields=['identifier_prefix', 'is_primary'],
+                name='edc_lab_aliquot_prefix_idx'),
+            models.Index(
+                fields=['requisition_identifier', 'is_primary'],
+                name='edc_lab_aliquot_req_idx')]
@@ -1,16 +1,23 @@
-from django.db import models
+from django.apps import apps as django_apps
+from django.db import models, transaction
+from django.db.models import Count, Case, F, Max, Value, When
 from django.db.models.deletion import PROTECT
+from django.db.models.functions import Greatest
 from django.utils import timezone
 
 from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
+from edc_base.utils import get_utcnow
 from edc_constants.constants import OTHER, OPEN
 from edc_search.model_mixins import SearchSlugModelMixin, SearchSlugManager
 
-from ..constants import VERIFIED, PACKED, SHIPPED, TESTING, STORAGE
+from ..bulk import bulk_create_with_history
+from ..constants import FLAG_VERIFIED, VERIFIED, PACKED, SHIPPED, TESTING, STORAGE
+from ..exceptions import BoxItemDuplicateError
 from ..identifiers import BoxIdentifier
 from ..model_mixins.shipping import VerifyBoxModelMixin
 from .box_type import BoxType
+from .storage import Rack
 
 
 BOX_DIMENSIONS = (
@@ -32,6 +39,14 @@ STATUS = (
     (SHIPPED, 'Shipped'),
 )
 
+# columns maintained by UPDATEs from BoxItem, never by Box.save
+COUNTER_FIELDS = ('item_count', 'verified_count', 'max_position', 'occupancy')
+
+
+class BoxFullError(Exception):
+    pass
+
+
 human_readable_pattern = '^[A-Z]{3}\-[0-9]{4}\-[0-9]{2}$'
 
 
@@ -92,18 +107,67 @@ class Box(SearchSlugModelMixin, VerifyBoxModelMixin, BaseUuidModel):
         null=True,
         blank=True)
 
+    item_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of items in the box. Maintained by BoxItem.')
+
+    verified_count = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text='Number of items in the box that have been verified.')
+
+    max_position = models.IntegerField(
+        default=0,
+        editable=False,
+        help_text='Highest position occupied in the box.')
+
+    occupancy = models.BinaryField(
+        null=True,
+        editable=False,
+        help_text='Bitmap of occupied slots in fill order.')
+
+    rack = models.ForeignKey(
+        Rack,
+        on_delete=PROTECT,
+        null=True,
+        blank=True,
+        help_text='Rack where the box is stored, if any.')
+
+    rack_position = models.IntegerField(
+        null=True,
+        blank=True,
+        help_text='Slot of the box in the rack.')
+
     objects = BoxManager()
 
     history = HistoricalRecords()
 
     def save(self, *args, **kwargs):
+        """Saves the box without writing the counters or the
+        occupancy bitmap, which are only changed in place by
+        UPDATEs on the box row.
+
+        The box row is locked while the counters are read so the
+        verified state is set from the committed counters.
+        """
         if not self.box_identifier:
             identifier = BoxIdentifier(model=self.__class__)
             self.box_identifier = identifier.identifier
         if not self.name:
             self.name = self.box_identifier
-        self.update_verified()
-        super().save(*args, **kwargs)
+        if self._state.adding:
+            self.update_verified()
+            super().save(*args, **kwargs)
+        else:
+            with transaction.atomic():
+                self.refresh_counters(lock=True)
+                self.update_verified()
+                if kwargs.get('update_fields') is None:
+                    kwargs.update(update_fields=[
+                        field.name for field in self._meta.concrete_fields
+                        if not field.primary_key and field.name not in COUNTER_FIELDS])
+                super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -114,7 +178,7 @@ class Box(SearchSlugModelMixin, VerifyBoxModelMixin, BaseUuidModel):
 
     @property
     def count(self):
-        return self.boxitem_set.all().count()
+        return self.item_count
 
     @property
     def items(self):
@@ -125,24 +189,227 @@ class Box(SearchSlugModelMixin, VerifyBoxModelMixin, BaseUuidModel):
         x = self.box_identifier
         return '{}-{}-{}'.format(x[0:4], x[4:8], x[8:12])
 
+    @property
+    def geometry(self):
+        """Returns the cached geometry of the box type's layout.
+        """
+        return self.box_type.geometry
+
     @property
     def next_position(self):
-        """Returns an integer or None.
+        """Returns the first free position in fill order as an
+        integer or None if the box is full.
         """
-        last_obj = self.boxitem_set.all().order_by('position').last()
-        if not last_obj:
-            next_position = 1
-        else:
-            next_position = last_obj.position + 1
-        if next_position > self.box_type.total:
-            next_position = None
-        return next_position
+        slot = self.first_free_slot(self.get_occupancy())
+        if slot >= self.geometry.total:
+            return None
+        return self.geometry.slot_to_position(slot)
 
     @property
-    def max_position(self):
-        return
+    def free_count(self):
+        """Returns the number of free slots in the box.
+        """
+        total = self.geometry.total
+        mask = (1 << total) - 1
+        return total - bin(self.get_occupancy() & mask).count('1')
+
+    @staticmethod
+    def first_free_slot(bitmap=None):
+        """Returns the zero-based index of the lowest unset bit.
+        """
+        return (~bitmap & (bitmap + 1)).bit_length() - 1
+
+    def get_occupancy(self):
+        """Returns the occupancy bitmap as an integer where bit n
+        is set if slot n (in fill order) is occupied.
+        """
+        if self.occupancy is None:
+            return self.build_occupancy(
+                self.boxitem_set.values_list('position', flat=True))
+        return int.from_bytes(bytes(self.occupancy), 'little')
+
+    def build_occupancy(self, positions=None):
+        """Returns an occupancy bitmap for the given positions.
+
+        Positions outside of the box are ignored. When filling down
+        a box with fewer cells than `across` x `down`, valid
+        positions can be numbered above `total`, so positions are
+        checked by their slot.
+        """
+        position_slots = self.geometry.position_slots
+        total = self.geometry.total
+        bitmap = 0
+        for position in positions:
+            if 1 <= position < len(position_slots) and position_slots[position] < total:
+                bitmap |= 1 << position_slots[position]
+        return bitmap
+
+    def set_occupancy(self, bitmap=None):
+        self.occupancy = bitmap.to_bytes(
+            (self.geometry.total + 7) // 8, 'little')
+
+    def lock(self):
+        """Returns this box's row after locking it for the rest of
+        the transaction.
+        """
+        return self.__class__.objects.select_for_update().select_related(
+            'box_type').get(pk=self.pk)
+
+    def update_occupancy(self, occupy=None, release=None):
+        """Sets and clears the bits of positions in the occupancy
+        bitmap while holding a lock on the box row.
+        """
+        with transaction.atomic():
+            box = self.lock()
+            bitmap = box.get_occupancy()
+            bitmap |= box.build_occupancy(occupy or [])
+            bitmap &= ~box.build_occupancy(release or [])
+            box.set_occupancy(bitmap)
+            self.occupancy = box.occupancy
+            self.__class__.objects.filter(pk=self.pk).update(
+                occupancy=self.occupancy)
+
+    def claim_positions(self, count=None):
+        """Returns a list of `count` free positions, in fill order,
+        after marking them as occupied or raises BoxFullError.
+
+        Must be called in a transaction so that the positions
+        stay claimed until the box items are created.
+        """
+        box = self.lock()
+        bitmap = box.get_occupancy()
+        geometry = box.geometry
+        positions = []
+        for _ in range(0, count):
+            slot = self.first_free_slot(bitmap)
+            if slot >= geometry.total:
+                raise BoxFullError(
+                    f'Box is full. Unable to place {count} items in box {self}. '
+                    f'Got {len(positions)} free positions.')
+            bitmap |= 1 << slot
+            positions.append(geometry.slot_to_position(slot))
+        box.set_occupancy(bitmap)
+        self.occupancy = box.occupancy
+        self.__class__.objects.filter(pk=self.pk).update(occupancy=self.occupancy)
+        return positions
+
+    def lock_aliquots(self, identifiers=None):
+        """Locks the aliquot rows of the identifiers for the rest
+        of the transaction.
+
+        Placing the same aliquot in two boxes at once waits on
+        these locks, so the duplicate check of one sees the box
+        items committed by the other. Aliquots are always locked
+        after the box row and in identifier order.
+        """
+        app_config = django_apps.get_app_config('edc_lab')
+        aliquot_model = django_apps.get_model(*app_config.aliquot_model.split('.'))
+        list(aliquot_model.objects.select_for_update().filter(
+            aliquot_identifier__in=identifiers).order_by(
+                'aliquot_identifier').values_list('pk', flat=True))
+
+    def place(self, identifiers=None):
+        """Returns a list of box items created for the identifiers
+        in the first free positions of the box.
+
+        Duplicates are checked, positions claimed and items created
+        in one transaction while holding a lock on the box and the
+        aliquots, so concurrent placements never take the same
+        position or put an aliquot in two boxes.
+
+        Raises BoxItemDuplicateError if any identifier is in
+        another box that has not been shipped.
+        """
+        identifiers = list(identifiers)
+        box_item_model = self.boxitem_set.model
+        with transaction.atomic():
+            self.lock()
+            self.lock_aliquots(identifiers)
+            duplicates = list(box_item_model.objects.in_open_boxes().filter(
+                identifier__in=identifiers).exclude(box=self).values_list(
+                    'identifier', flat=True))
+            if duplicates:
+                raise BoxItemDuplicateError(
+                    f'Unable to place items in box {self}. Already boxed. '
+                    f'Got {", ".join(duplicates)}.')
+            positions = self.claim_positions(len(identifiers))
+            box_items = bulk_create_with_history(
+                model=box_item_model,
+                objs=[box_item_model(box=self, identifier=identifier, position=position)
+                      for identifier, position in zip(identifiers, positions)])
+            self.add_to_counters(
+                item_count=len(box_items), position=max(positions or [0]))
+        return box_items
+
+    def refresh_counters(self, lock=None):
+        """Reads the counters and the occupancy bitmap from the DB
+        into self, optionally locking the box row.
+        """
+        queryset = self.__class__.objects.filter(pk=self.pk)
+        if lock:
+            queryset = queryset.select_for_update()
+        values = queryset.values(*COUNTER_FIELDS).first()
+        for attr, value in (values or {}).items():
+            setattr(self, attr, value)
+
+    def add_to_counters(self, item_count=None, verified_count=None, position=None):
+        """Adds to the item and verified counters and raises
+        max_position to at least `position` in one UPDATE,
+        then refreshes self.
+
+        The box's modified datetime is always updated so that
+        anything cached against it, e.g. the box grid, expires.
+        """
+        values = {}
+        if item_count:
+            values.update(item_count=F('item_count') + item_count)
+        if verified_count:
+            values.update(verified_count=F('verified_count') + verified_count)
+        if position is not None:
+            values.update(max_position=Greatest(F('max_position'), Value(position)))
+        self.__class__.objects.filter(pk=self.pk).update(
+            modified=get_utcnow(), **values)
+        self.refresh_counters()
+
+    def recalculate_max_position(self):
+        """Recalculates max_position from the box items.
+        """
+        max_position = self.boxitem_set.aggregate(
+            max_position=Max('position')).get('max_position') or 0
+        self.__class__.objects.filter(pk=self.pk).update(
+            max_position=max_position, modified=get_utcnow())
+        self.max_position = max_position
+
+    def rebuild_counters(self):
+        """Recalculates all counters and the occupancy bitmap
+        from the box items.
+
+        Like `add_to_counters`, updates the box's modified datetime.
+        """
+        with transaction.atomic():
+            values = self.boxitem_set.aggregate(
+                item_count=Count('id'),
+                verified_count=Count(Case(When(verified=FLAG_VERIFIED, then=1))),
+                max_position=Max('position'))
+            values.update(max_position=values.get('max_position') or 0)
+            self.set_occupancy(self.build_occupancy(
+                self.boxitem_set.values_list('position', flat=True)))
+            values.update(occupancy=self.occupancy, modified=get_utcnow())
+            self.__class__.objects.filter(pk=self.pk).update(**values)
+        for attr, value in values.items():
+            setattr(self, attr, value)
+
+    def save_if_verification_changed(self):
+        """Saves self if the verified state or status implied by
+        the counters differs from that on self.
+        """
+        verified, status = self.verified, self.status
+        self.update_verified()
+        if (verified, status) != (self.verified, self.status):
+            self.save()
 
     class Meta:
         app_label = 'edc_lab'
         ordering = ('-box_datetime', )
         verbose_name_plural = 'Boxes'
+        unique_together = (('rack', 'rack_position'), )
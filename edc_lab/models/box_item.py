@@ -1,18 +1,72 @@
 import re
 
-from django.db import models
+from collections import namedtuple
+from django.db import models, transaction
+from django.db.models import Count
 from django.db.models.deletion import PROTECT
 
 from edc_base.model_managers import HistoricalRecords
 from edc_base.model_mixins import BaseUuidModel
 from edc_search.model_mixins import SearchSlugModelMixin, SearchSlugManager
 
+from ..constants import FLAG_VERIFIED, SHIPPED
+from ..exceptions import BoxItemDuplicateError
 from ..model_mixins.shipping import VerifyModelMixin
 from ..patterns import aliquot_pattern
 from .box import Box
+from .dirty_boxes import dirty_boxes
 
+BoxItemLocation = namedtuple(
+    'BoxItemLocation', 'identifier box_id box_identifier box_status position')
 
-class BoxItemManager(SearchSlugManager, models.Manager):
+
+class BoxItemQuerySet(models.QuerySet):
+
+    def in_open_boxes(self):
+        """Returns box items in boxes that have not been shipped.
+        """
+        return self.exclude(box__status=SHIPPED)
+
+    def locate(self, identifiers=None):
+        """Returns a dictionary of {identifier: [location, ...]}
+        for the identifiers found in any box.
+
+        Locations are read with one query on the identifier index.
+        An identifier with more than one location is a duplicate.
+        """
+        locations = {}
+        for values in self.filter(identifier__in=list(identifiers)).order_by().values_list(
+                'identifier', 'box_id', 'box__box_identifier', 'box__status', 'position'):
+            locations.setdefault(values[0], []).append(BoxItemLocation(*values))
+        return locations
+
+    def duplicates(self):
+        """Returns a dictionary of {identifier: box count} for
+        identifiers in more than one box.
+        """
+        return dict(
+            self.order_by().values('identifier').annotate(
+                box_count=Count('box', distinct=True)).filter(
+                    box_count__gt=1).values_list('identifier', 'box_count'))
+
+    def delete(self):
+        """Deletes the box items and rebuilds the counters of
+        each affected box once instead of once per item.
+
+        Affected boxes are saved once when the transaction commits.
+        """
+        box_ids = set(self.values_list('box_id', flat=True))
+        with transaction.atomic(using=self.db), dirty_boxes.bulk_delete():
+            deleted = super().delete()
+            for box in Box.objects.using(self.db).filter(pk__in=box_ids):
+                box.rebuild_counters()
+                dirty_boxes.mark(box_pk=box.pk, using=self.db)
+        return deleted
+    delete.alters_data = True
+    delete.queryset_only = True
+
+
+class BoxItemManager(SearchSlugManager, models.Manager.from_queryset(BoxItemQuerySet)):
 
     def get_by_natural_key(self, position, identifier, box_identifier, name):
         return self.get(
@@ -40,6 +94,83 @@ class BoxItem(SearchSlugModelMixin, VerifyModelMixin, BaseUuidModel):
 
     history = HistoricalRecords()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+    def save(self, *args, **kwargs):
+        """Saves the box item and updates the counters on its box
+        in the same transaction.
+
+        Raises if the identifier is in another box that has not
+        been shipped. The check and the save run in one transaction
+        holding locks on the box and the aliquot.
+        """
+        adding = self._state.adding
+        loaded_values = getattr(self, '_loaded_values', None)
+        with transaction.atomic():
+            if (adding or not loaded_values
+                    or loaded_values.get('identifier') != self.identifier
+                    or loaded_values.get('box_id') != self.box_id):
+                self.box.lock()
+                self.check_duplicates()
+            super().save(*args, **kwargs)
+            if adding or loaded_values:
+                self.update_box_counters(None if adding else loaded_values)
+            else:
+                # not loaded from the DB, counters cannot be adjusted
+                self.box.rebuild_counters()
+        self._loaded_values = dict(
+            box_id=self.box_id, identifier=self.identifier,
+            position=self.position, verified=self.verified)
+
+    def check_duplicates(self):
+        """Raises if the identifier is in another open box.
+
+        Locks the aliquot row first so a concurrent save of the
+        same identifier waits for this transaction to commit.
+        """
+        self.box.lock_aliquots([self.identifier])
+        box_identifiers = list(
+            self.__class__.objects.in_open_boxes().filter(
+                identifier=self.identifier).exclude(box_id=self.box_id).values_list(
+                    'box__box_identifier', flat=True))
+        if box_identifiers:
+            raise BoxItemDuplicateError(
+                f'Aliquot {self.identifier} is already in box '
+                f'{", ".join(box_identifiers)}.')
+
+    def update_box_counters(self, loaded_values=None):
+        """Updates the item_count, verified_count, max_position
+        and occupancy of the box(es) affected by saving this item.
+        """
+        verified = 1 if self.verified == FLAG_VERIFIED else 0
+        if loaded_values is None:
+            self.box.add_to_counters(
+                item_count=1, verified_count=verified, position=self.position)
+            self.box.update_occupancy(occupy=[self.position])
+        else:
+            old_verified = 1 if loaded_values.get('verified') == FLAG_VERIFIED else 0
+            old_box_id = loaded_values.get('box_id', self.box_id)
+            old_position = loaded_values.get('position', self.position)
+            if old_box_id != self.box_id:
+                old_box = self.box.__class__.objects.get(pk=old_box_id)
+                old_box.add_to_counters(item_count=-1, verified_count=-old_verified)
+                old_box.recalculate_max_position()
+                old_box.update_occupancy(release=[old_position])
+                self.box.add_to_counters(
+                    item_count=1, verified_count=verified, position=self.position)
+                self.box.update_occupancy(occupy=[self.position])
+            else:
+                self.box.add_to_counters(
+                    verified_count=verified - old_verified)
+                if old_position != self.position:
+                    self.box.recalculate_max_position()
+                    self.box.update_occupancy(
+                        occupy=[self.position], release=[old_position])
+
     def natural_key(self):
         return (self.position, self.identifier) + self.box.natural_key()
     natural_key.dependencies = ['edc_lab.box']
@@ -63,3 +194,7 @@ class BoxItem(SearchSlugModelMixin, VerifyModelMixin, BaseUuidModel):
         app_label = 'edc_lab'
         ordering = ('position', )
         unique_together = (('box', 'position'), ('box', 'identifier'))
+        indexes = [
+            models.Index(
+                fields=['identifier', 'box', 'position'],
+                name='edc_lab_boxitem_locate_idx')]
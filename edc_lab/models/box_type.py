@@ -2,6 +2,8 @@ from django.db import models
 
 from edc_base.model_mixins import BaseUuidModel
 
+from ..box_geometry import box_geometries
+
 FILL_ORDER = (
     ('across', 'Across'),
     ('down', 'Down'),
@@ -37,12 +39,50 @@ class BoxType(BaseUuidModel):
 
     objects = BoxTypeManager()
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_layout = instance.layout
+        return instance
+
     def __str__(self):
         return '{} max={}'.format(self.name, self.total)
 
     def natural_key(self):
         return (self.name, )
 
+    @property
+    def layout(self):
+        """Returns the values that determine the geometry.
+        """
+        return (self.across, self.down, self.total, self.fill_order)
+
+    @property
+    def layout_changed(self):
+        """Returns True if the layout differs from the one read
+        from the DB or if it was not read from the DB.
+        """
+        return getattr(self, '_loaded_layout', None) != self.layout
+
+    @property
+    def geometry(self):
+        """Returns the cached geometry for this box type's layout.
+        """
+        return box_geometries.get_layout(
+            across=self.across, down=self.down,
+            total=self.total, fill_order=self.fill_order)
+
+    def slot_to_position(self, slot=None):
+        """Returns the position of the zero-based slot, where slots
+        are numbered in fill order and positions across rows.
+        """
+        return self.geometry.slot_to_position(slot)
+
+    def position_to_slot(self, position=None):
+        """Returns the zero-based slot in fill order of a position.
+        """
+        return self.geometry.position_to_slot(position)
+
     class Meta:
         app_label = 'edc_lab'
         ordering = ('name', )
@@ -0,0 +1,110 @@
+import threading
+
+from contextlib import contextmanager
+from django.apps import apps as django_apps
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models import Q
+
+
+class DirtyBoxes:
+
+    """A class to collect the boxes changed in a transaction and
+    save each box once when the transaction commits.
+
+    Boxes are marked dirty by pk or box_identifier, optionally
+    with a new status. Marks are kept per thread and database
+    until the outermost atomic block commits, so marks made in
+    any number of nested or sibling atomic blocks get one save
+    and one historical record per box.
+
+    A new status is written to the box row when marked, so it
+    is rolled back with the transaction. Marks left over from a
+    rolled back transaction only recompute the box from the DB
+    and never apply a status the box row does not have.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}()'
+
+    @property
+    def bulk(self):
+        return getattr(self._local, 'bulk', False)
+
+    @contextmanager
+    def bulk_delete(self):
+        """A context manager that tells per-instance signal
+        handlers that a bulk hook is updating the boxes instead.
+        """
+        bulk, self._local.bulk = self.bulk, True
+        try:
+            yield
+        finally:
+            self._local.bulk = bulk
+
+    @property
+    def box_model(self):
+        app_config = django_apps.get_app_config('edc_lab')
+        return django_apps.get_model(*app_config.box_model.split('.'))
+
+    def get_marks(self, using=None):
+        """Returns the dictionary of marks of this thread for the
+        database.
+        """
+        if not hasattr(self._local, 'marks'):
+            self._local.marks = {}
+        return self._local.marks.setdefault(using, {})
+
+    def mark(self, box_pk=None, box_identifier=None, status=None, using=None):
+        """Marks a box dirty to be saved when the current
+        transaction commits.
+
+        If not in a transaction, the box is saved immediately.
+        """
+        using = using or DEFAULT_DB_ALIAS
+        key = ('pk', box_pk) if box_pk else ('box_identifier', box_identifier)
+        if not transaction.get_connection(using).in_atomic_block:
+            self.recompute(marks={key: status}, using=using)
+        else:
+            if status:
+                self.box_model.objects.using(using).filter(
+                    **{key[0]: key[1]}).update(status=status)
+            marks = self.get_marks(using)
+            marks.update({key: status or marks.get(key)})
+            # marks are flushed by the first callback to run
+            transaction.on_commit(lambda: self.flush(using=using), using=using)
+
+    def flush(self, using=None):
+        """Saves the boxes marked on this thread for the database.
+        """
+        marks = self.get_marks(using)
+        self._local.marks[using] = {}
+        self.recompute(marks=marks, using=using, check_status=True)
+
+    def recompute(self, marks=None, using=None, check_status=None):
+        """Saves each marked box once, setting the status if one
+        was given when marked, otherwise only if the verified state
+        implied by the box counters changed.
+
+        If `check_status`, a status is only set if the box row
+        already has it, i.e. it was not rolled back.
+        """
+        if not marks:
+            return
+        pks = [value for key, value in marks if key == 'pk']
+        box_identifiers = [value for key, value in marks if key == 'box_identifier']
+        boxes = self.box_model.objects.using(using).filter(
+            Q(pk__in=pks) | Q(box_identifier__in=box_identifiers))
+        for box in boxes:
+            status = (marks.get(('pk', box.pk))
+                      or marks.get(('box_identifier', box.box_identifier)))
+            if status and (box.status == status or not check_status):
+                box.status = status
+                box.save()
+            else:
+                box.save_if_verification_changed()
+
+
+dirty_boxes = DirtyBoxes()
@@ -1,26 +1,53 @@
-from django.db.models.signals import post_delete
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 
-from edc_lab.constants import VERIFIED
+from edc_lab.constants import FLAG_VERIFIED, VERIFIED
 from edc_lab.models import BoxItem
 
 from .box import Box
+from .box_type import BoxType
+from .dirty_boxes import dirty_boxes
 from .manifest import ManifestItem
 
 
 @receiver(post_delete, weak=False, sender=ManifestItem,
           dispatch_uid="manifest_item_on_post_delete")
 def manifest_item_on_post_delete(sender, instance, using, **kwargs):
-    try:
-        box = Box.objects.get(box_identifier=instance.identifier)
-    except Box.DoesNotExist:
-        pass
-    else:
-        box.status = VERIFIED
-        box.save()
+    """Marks the box, if any, to be set to VERIFIED when the
+    transaction commits.
+    """
+    dirty_boxes.mark(
+        box_identifier=instance.identifier, status=VERIFIED, using=using)
 
 
 @receiver(post_delete, weak=False, sender=BoxItem,
           dispatch_uid="box_item_on_post_delete")
 def box_item_on_post_delete(sender, instance, using, **kwargs):
-    instance.box.save()
+    """Updates the box counters and marks the box to be saved
+    when the transaction commits.
+
+    Skipped if the box items are being deleted by
+    `BoxItemQuerySet.delete`.
+    """
+    if dirty_boxes.bulk:
+        return
+    box = instance.box
+    box.add_to_counters(
+        item_count=-1,
+        verified_count=-1 if instance.verified == FLAG_VERIFIED else None)
+    if instance.position >= box.max_position:
+        box.recalculate_max_position()
+    box.update_occupancy(release=[instance.position])
+    dirty_boxes.mark(box_pk=box.pk, using=using)
+
+
+@receiver(post_save, weak=False, sender=BoxType,
+          dispatch_uid="box_type_on_post_save")
+def box_type_on_post_save(sender, instance, raw, created, using, **kwargs):
+    """Clears the occupancy bitmap of the boxes of this type if
+    the layout changed. The bitmaps are rebuilt from the box
+    items when next read.
+    """
+    if not created and instance.layout_changed:
+        Box.objects.using(using).filter(box_type=instance).update(occupancy=None)
+    instance._loaded_layout = instance.layout
@@ -0,0 +1,109 @@
+from django.db import models
+from django.db.models.deletion import PROTECT
+
+from edc_base.model_mixins import BaseUuidModel
+
+
+class FreezerManager(models.Manager):
+
+    def get_by_natural_key(self, name):
+        return self.get(name=name)
+
+
+class Freezer(BaseUuidModel):
+
+    name = models.CharField(
+        max_length=25,
+        unique=True,
+        help_text="a unique name to describe this freezer")
+
+    description = models.CharField(
+        max_length=50,
+        null=True,
+        blank=True)
+
+    location = models.CharField(
+        max_length=50,
+        null=True,
+        blank=True,
+        help_text="room or building")
+
+    objects = FreezerManager()
+
+    def __str__(self):
+        return self.name
+
+    def natural_key(self):
+        return (self.name, )
+
+    class Meta:
+        app_label = 'edc_lab'
+        ordering = ('name', )
+
+
+class ShelfManager(models.Manager):
+
+    def get_by_natural_key(self, name, freezer_name):
+        return self.get(name=name, freezer__name=freezer_name)
+
+
+class Shelf(BaseUuidModel):
+
+    freezer = models.ForeignKey(Freezer, on_delete=PROTECT)
+
+    name = models.CharField(
+        max_length=25,
+        help_text="a name unique to the freezer")
+
+    position = models.IntegerField(
+        default=0,
+        help_text="shelf number counting from the top")
+
+    objects = ShelfManager()
+
+    def __str__(self):
+        return f'{self.freezer}/{self.name}'
+
+    def natural_key(self):
+        return (self.name, ) + self.freezer.natural_key()
+    natural_key.dependencies = ['edc_lab.freezer']
+
+    class Meta:
+        app_label = 'edc_lab'
+        ordering = ('freezer', 'position')
+        unique_together = (('freezer', 'name'), )
+        verbose_name_plural = 'Shelves'
+
+
+class RackManager(models.Manager):
+
+    def get_by_natural_key(self, name, shelf_name, freezer_name):
+        return self.get(
+            name=name, shelf__name=shelf_name, shelf__freezer__name=freezer_name)
+
+
+class Rack(BaseUuidModel):
+
+    shelf = models.ForeignKey(Shelf, on_delete=PROTECT)
+
+    name = models.CharField(
+        max_length=25,
+        help_text="a name unique to the shelf")
+
+    position = models.IntegerField(
+        default=0,
+        help_text="rack number on the shelf counting from the left")
+
+    objects = RackManager()
+
+    def __str__(self):
+        return f'{self.shelf}/{self.name}'
+
+    def natural_key(self):
+        return (self.name, ) + self.shelf.natural_key()
+    natural_key.dependencies = ['edc_lab.shelf']
+
+    class Meta:
+        app_label = 'edc_lab'
+        ordering = ('shelf', 'position')
+        unique_together = (('shelf', 'name'), )
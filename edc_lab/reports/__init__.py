@@ -1,3 +1,4 @@
 from .manifest_report import ManifestReport
+from .manifest_report_data import ManifestReportData, ManifestReportError
 from .numbered_canvas import NumberedCanvas
-from .report import Report
+from .report import Report, barcode_cache, get_barcode, get_styles
@@ -0,0 +1,214 @@
+import hashlib
+import threading
+
+from concurrent.futures import ThreadPoolExecutor
+from django.apps import apps as django_apps
+from django.contrib.auth import get_user_model
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.db import connection, transaction
+from django.http import FileResponse, HttpResponse
+from tempfile import SpooledTemporaryFile
+
+
+class ManifestArtifacts:
+
+    """A class to render the PDF of a shipped manifest once and
+    serve it from storage afterwards.
+
+    Artifacts are named by manifest identifier, a hash of the
+    manifest's boxes and box items and of the shipper contact
+    named in the PDF, and whether the PDF is a reprint. A change
+    to a ManifestItem or BoxItem, or a print by another user,
+    changes the hash so the request renders a new artifact.
+
+    Renders can be queued on a local thread pool, e.g. the reprint
+    after the first print, or run by `manage.py render_manifest_reports`.
+    An artifact is saved while holding a lock on the manifest row
+    so it is saved once however many requests or workers render
+    it at the same time.
+    """
+
+    location = 'edc_lab/manifests'
+    max_workers = 1
+
+    def __init__(self, storage=None):
+        self.storage = storage or default_storage
+        self._executor = None
+        self._pending = {}
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(location={self.location})'
+
+    @property
+    def executor(self):
+        with self._lock:
+            if not self._executor:
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+            return self._executor
+
+    @staticmethod
+    def contact_name(user=None):
+        """Returns the shipper contact name the PDF prints for
+        `user`.
+        """
+        if not user:
+            return ''
+        return '{} {}'.format(user.first_name, user.last_name)
+
+    def content_hash(self, manifest=None, user=None):
+        """Returns a sha256 hex digest of the manifest's items, the
+        box items of its boxes and the contact name of `user`.
+        """
+        app_config = django_apps.get_app_config('edc_lab')
+        box_item_model = django_apps.get_model(*app_config.box_item_model.split('.'))
+        identifiers = sorted(
+            manifest.manifestitem_set.values_list('identifier', flat=True))
+        box_items = box_item_model.objects.filter(
+            box__box_identifier__in=identifiers).order_by(
+                'box__box_identifier', 'position').values_list(
+                    'box__box_identifier', 'position', 'identifier')
+        sha256 = hashlib.sha256()
+        sha256.update(f'{self.contact_name(user)}\n'.encode())
+        for identifier in identifiers:
+            sha256.update(f'{identifier}\n'.encode())
+        for values in box_items:
+            sha256.update('{},{},{}\n'.format(*values).encode())
+        return sha256.hexdigest()
+
+    def get_name(self, manifest=None, reprint=None, user=None, content_hash=None):
+        content_hash = content_hash or self.content_hash(manifest, user=user)
+        suffix = '-reprint' if reprint else ''
+        return (f'{self.location}/{manifest.manifest_identifier}-'
+                f'{content_hash[:16]}{suffix}.pdf')
+
+    def get(self, manifest=None, reprint=None, user=None):
+        """Returns the storage name of the artifact or None.
+        """
+        name = self.get_name(manifest=manifest, reprint=reprint, user=user)
+        return name if self.storage.exists(name) else None
+
+    def lock(self, manifest=None):
+        """Returns the manifest's row after locking it for the rest
+        of the transaction.
+        """
+        return manifest.__class__.objects.select_for_update().get(pk=manifest.pk)
+
+    def render(self, manifest=None, reprint=None, user=None, name=None):
+        """Renders the artifact, if it does not exist, and returns
+        its storage name.
+
+        The PDF is built without a lock. Storage is checked again
+        and the artifact saved while holding a lock on the manifest
+        row, so a concurrent render of the same artifact is not
+        saved twice.
+
+        Does not mark the manifest as printed.
+        """
+        from .manifest_report import ManifestReport
+        name = name or self.get_name(manifest=manifest, reprint=reprint, user=user)
+        if self.storage.exists(name):
+            return name
+        report = ManifestReport(manifest=manifest, user=user)
+        with SpooledTemporaryFile(max_size=report.spool_max_size) as buffer:
+            printed, manifest.printed = manifest.printed, bool(reprint)
+            try:
+                report.build(buffer, mark_printed=False)
+            finally:
+                manifest.printed = printed
+            buffer.seek(0)
+            with transaction.atomic():
+                self.lock(manifest)
+                if not self.storage.exists(name):
+                    name = self.storage.save(name, File(buffer))
+        return name
+
+    def submit(self, manifest=None, reprint=None, user=None):
+        """Queues a render of the artifact on the thread pool and
+        returns the future. A render already queued for the same
+        artifact is not queued again.
+        """
+        name = self.get_name(manifest=manifest, reprint=reprint, user=user)
+        with self._lock:
+            future = self._pending.get(name)
+            if future and not future.done():
+                return future
+        future = self.executor.submit(
+            self.render_in_thread, manifest_pk=manifest.pk, reprint=reprint,
+            user_pk=getattr(user, 'pk', None), name=name)
+        with self._lock:
+            self._pending[name] = future
+        future.add_done_callback(lambda f: self._pending.pop(name, None))
+        return future
+
+    def render_in_thread(self, manifest_pk=None, reprint=None, user_pk=None, name=None):
+        """Renders an artifact in a worker thread with the worker's
+        own database connection, closed when done.
+        """
+        app_config = django_apps.get_app_config('edc_lab')
+        manifest_model = django_apps.get_model(*app_config.manifest_model.split('.'))
+        try:
+            manifest = manifest_model.objects.get(pk=manifest_pk)
+            user = get_user_model().objects.get(pk=user_pk) if user_pk else None
+            return self.render(manifest=manifest, reprint=reprint, user=user, name=name)
+        finally:
+            connection.close()
+
+    def wait(self, name=None):
+        """Waits for a queued render of the artifact, if any.
+
+        A failed render is ignored; the caller renders the
+        artifact itself if it is still missing.
+        """
+        with self._lock:
+            future = self._pending.get(name)
+        if future:
+            try:
+                future.result()
+            except Exception:
+                pass
+
+    def response(self, report=None, spooled=None):
+        """Returns a response with the PDF of a shipped manifest
+        report from storage, rendering the artifact first if needed.
+
+        If spooled, returns a FileResponse streaming the PDF from
+        storage, otherwise an HttpResponse with the PDF read into
+        memory. Defaults to `report.spooled`.
+
+        On the first print, marks the manifest as printed and,
+        once the transaction commits, queues a render of the
+        reprint. The PDF is rendered before the manifest row is
+        locked; if a concurrent request printed the manifest first,
+        the reprint is served instead.
+        """
+        manifest, user = report.manifest, report.user
+        spooled = report.spooled if spooled is None else spooled
+        reprint = manifest.printed
+        name = self.get_name(manifest=manifest, reprint=reprint, user=user)
+        self.wait(name)
+        name = self.render(manifest=manifest, reprint=reprint, user=user, name=name)
+        if not reprint:
+            with transaction.atomic():
+                printed = self.lock(manifest).printed
+                if not printed:
+                    manifest.printed = True
+                    manifest.save()
+                    transaction.on_commit(
+                        lambda: self.submit(manifest=manifest, reprint=True, user=user))
+            if printed:
+                manifest.printed = True
+                name = self.render(manifest=manifest, reprint=True, user=user)
+        if spooled:
+            response = FileResponse(
+                self.storage.open(name, 'rb'), content_type='application/pdf')
+            response['Content-Length'] = self.storage.size(name)
+        else:
+            with self.storage.open(name, 'rb') as f:
+                response = HttpResponse(content_type='application/pdf')
+                response.write(f.read())
+        return response
+
+
+manifest_artifacts = ManifestArtifacts()
@@ -2,27 +2,52 @@ import os
 
 from django.apps import apps as django_apps
 from django.conf import settings
-from django.http import HttpResponse
+from django.http import FileResponse, HttpResponse
 from io import BytesIO
-from reportlab.graphics.barcode import code39
+from tempfile import SpooledTemporaryFile
+from time import perf_counter
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.units import mm, cm
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
+from reportlab.platypus import (
+    SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, LongTable)
 
+from .manifest_artifacts import manifest_artifacts
+from .manifest_report_data import ManifestReportData, ManifestReportError
 from .numbered_canvas import NumberedCanvas
-from .report import Report
+from .report import Report, get_barcode
 
 
-class ManifestReportError(Exception):
-    def __init__(self, message, code=None):
-        super().__init__(message)
-        self.code = code
+# styles shared by the tables of every box in the contents section
+BOX_TABLE_STYLE = TableStyle([
+    ('INNERGRID', (0, 0), (-1, 0), 0.25, colors.black),
+    ('INNERGRID', (0, 1), (-1, -1), 0.25, colors.black),
+    ('BOX', (0, 0), (-1, -1), 0.25, colors.black)])
+
+BOX_ITEMS_TABLE_STYLE = TableStyle([
+    ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.black),
+    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+    ('BOX', (0, 0), (-1, -1), 0.25, colors.black)])
 
 
 class ManifestReport(Report):
 
-    def __init__(self, manifest=None, user=None, **kwargs):
+    """A class to render a manifest as a PDF.
+
+    By default the PDF is built into a temporary file that is
+    kept in memory up to `spool_max_size` bytes and on disk after
+    that, and returned as a streamed FileResponse.
+
+    The PDF of a shipped manifest is rendered once and served
+    from storage by `artifacts`. Previews are always rendered.
+    """
+
+    artifacts = manifest_artifacts
+    data_cls = ManifestReportData
+    spooled = True
+    spool_max_size = 1024 * 1024
+
+    def __init__(self, manifest=None, user=None, data=None, **kwargs):
         super().__init__(**kwargs)
         app_config = django_apps.get_app_config('edc_lab')
         self.manifest = manifest  # a Manifest model instance
@@ -37,6 +62,22 @@ class ManifestReport(Report):
             *app_config.requisition_model.split('.'))
         self.image_folder = os.path.join(
             settings.STATIC_ROOT, 'bcpp', 'images')
+        self._data = data
+        self.render_stats = {}
+        self.barcode_stats = {}
+
+    @property
+    def data(self):
+        """Returns the manifest contents read in one query per model.
+        """
+        if self._data is None:
+            self._data = self.data_cls(
+                manifest=self.manifest,
+                box_model=self.box_model,
+                box_item_model=self.box_item_model,
+                aliquot_model=self.aliquot_model,
+                requisition_model=self.requisition_model)
+        return self._data
 
     @property
     def contact_name(self):
@@ -98,10 +139,46 @@ class ManifestReport(Report):
                 box_word=box_word, specimen_word=specimen_word,
                 type_word=type_word, **description))
 
-    def render(self, **kwargs):
-        response = HttpResponse(content_type='application/pdf')
-        buffer = BytesIO()
+    def render(self, spooled=None, **kwargs):
+        """Returns an HTTP response with the manifest PDF.
+
+        If spooled, returns a FileResponse streaming the PDF from
+        a spooled temporary file, otherwise an HttpResponse with
+        the PDF copied from memory.
+
+        Shipped manifests are served from storage if `artifacts`
+        is set.
+        """
+        spooled = self.spooled if spooled is None else spooled
+        if self.manifest.shipped and self.artifacts:
+            return self.artifacts.response(self, spooled=spooled)
+        if spooled:
+            buffer = SpooledTemporaryFile(max_size=self.spool_max_size)
+            try:
+                self.build(buffer)
+            except Exception:
+                buffer.close()
+                raise
+            size = buffer.tell()
+            buffer.seek(0)
+            response = FileResponse(buffer, content_type='application/pdf')
+            response['Content-Length'] = size
+        else:
+            buffer = BytesIO()
+            self.build(buffer)
+            response = HttpResponse(content_type='application/pdf')
+            response.write(buffer.getvalue())
+        return response
+
+    def build(self, buffer=None, mark_printed=True):
+        """Builds the manifest PDF into the file-like `buffer`.
+
+        If `mark_printed`, a shipped manifest is saved as printed.
 
+        Sets `render_stats` to the build time and the barcode
+        cache hits and misses of this build.
+        """
+        start, self.barcode_stats = perf_counter(), {}
         doc = SimpleDocTemplate(
             buffer, rightMargin=.5 * cm, leftMargin=.5 * cm,
             topMargin=1.5 * cm, bottomMargin=1.5 * cm,
@@ -137,8 +214,8 @@ class ManifestReport(Report):
                 self.styles["line_label_center"]))
 
         if self.manifest.shipped:
-            barcode = code39.Standard39(
-                self.manifest.manifest_identifier, barHeight=10 * mm, stop=1)
+            barcode = get_barcode(
+                self.manifest.manifest_identifier, 10 * mm, stats=self.barcode_stats)
         else:
             barcode = 'PREVIEW'
 
@@ -263,16 +340,35 @@ class ManifestReport(Report):
 
         story = self.append_manifest_items_story(story)
 
-        if self.manifest.shipped and not self.manifest.printed:
+        if mark_printed and self.manifest.shipped and not self.manifest.printed:
             self.manifest.printed = True
             self.manifest.save()
 
         doc.build(story, canvasmaker=NumberedCanvas)
-        pdf = buffer.getvalue()
-        response.write(pdf)
-        return response
+        self.render_stats = self.get_render_stats(start, self.barcode_stats)
+        return buffer
+
+    @staticmethod
+    def get_render_stats(start=None, barcode_stats=None):
+        """Returns a dictionary of the seconds since `start` and the
+        barcode cache hits, misses and hit rate counted in
+        `barcode_stats`.
+        """
+        hits = barcode_stats.get('barcode_hits', 0)
+        misses = barcode_stats.get('barcode_misses', 0)
+        return dict(
+            seconds=perf_counter() - start,
+            barcode_hits=hits,
+            barcode_misses=misses,
+            barcode_hit_rate=hits / (hits + misses) if hits + misses else 0.0)
 
     def append_manifest_items_story(self, story):
+        """Appends a box table and a box items table for each box
+        in the manifest.
+
+        Each table is built once. Box items tables repeat their
+        header row when split across pages.
+        """
         box_header = [
             Paragraph('BOX:', self.styles["line_label"]),
             Paragraph(
@@ -281,87 +377,58 @@ class ManifestReport(Report):
             Paragraph('ITEMS:', self.styles["line_label"]),
             Paragraph('BOX DATE:', self.styles["line_label"]),
             Paragraph('BOX BARCODE:', self.styles["line_label"])]
-        for index, manifest_item in enumerate(
-                self.manifest.manifestitem_set.all().order_by('-created')):
+        box_items_header = [
+            Paragraph('BARCODE', self.styles["line_label_center"]),
+            Paragraph('POS', self.styles["line_label_center"]),
+            Paragraph(
+                'ALIQUOT IDENTIFIER', self.styles["line_label_center"]),
+            Paragraph('SUBJECT', self.styles["line_label_center"]),
+            Paragraph('TYPE', self.styles["line_label_center"]),
+            Paragraph('DATE', self.styles["line_label_center"])]
+        for index, report_box in enumerate(self.data.boxes):
             if index > 0:
                 story.append(Spacer(0.1 * cm, .5 * cm))
-            data1 = []
-            data1.append(box_header)
-            try:
-                box = self.box_model.objects.get(
-                    box_identifier=manifest_item.identifier)
-            except self.box_model.DoesNotExist as e:
-                raise ManifestReportError(
-                    f'{e} Got Manifest item \'{manifest_item.identifier}\'.',
-                    code='unboxed_item') from e
-            barcode = code39.Standard39(
-                box.box_identifier, barHeight=5 * mm, stop=1)
-            data1.append([
-                Paragraph(
-                    box.box_identifier, self.styles["line_data_large"]),
-                Paragraph(
-                    box.get_category_display().upper(), self.styles["line_data_large"]),
-                Paragraph(box.specimen_types, self.styles["line_data_large"]),
-                Paragraph(
-                    '{}/{}'.format(str(box.count), str(box.box_type.total)), self.styles["line_data_large"]),
-                Paragraph(box.box_datetime.strftime(
-                    '%Y-%m-%d'), self.styles["line_data_large"]),
-                barcode])
             t1 = Table(
-                data1, colWidths=(None, None, None, None, None, None))
-            t1.setStyle(TableStyle([
-                ('INNERGRID', (0, 0), (-1, 0), 0.25, colors.black),
-                ('INNERGRID', (0, 1), (-1, -1), 0.25, colors.black),
-                ('BOX', (0, 0), (-1, -1), 0.25, colors.black),
-            ]))
+                [box_header, self.get_box_row(report_box.box)],
+                colWidths=(None, None, None, None, None, None))
+            t1.setStyle(BOX_TABLE_STYLE)
             story.append(t1)
             story.append(Spacer(0.1 * cm, .5 * cm))
-
-            table_data = []
-            table_data = [[
-                Paragraph('BARCODE', self.styles["line_label_center"]),
-                Paragraph('POS', self.styles["line_label_center"]),
-                Paragraph(
-                    'ALIQUOT IDENTIFIER', self.styles["line_label_center"]),
-                Paragraph('SUBJECT', self.styles["line_label_center"]),
-                Paragraph('TYPE', self.styles["line_label_center"]),
-                Paragraph('DATE', self.styles["line_label_center"]),
-            ]]
-            for box_item in box.boxitem_set.all().order_by('position'):
-                try:
-                    aliquot = self.aliquot_model.objects.get(
-                        aliquot_identifier=box_item.identifier)
-                except self.aliquot_model.DoesNotExist as e:
-                    raise ManifestReportError(
-                        f'{e} Got Box item \'{box_item.identifier}\'',
-                        code='invalid_aliquot_identifier')
-                try:
-                    requisition = self.requisition_model.objects.get(
-                        requisition_identifier=aliquot.requisition_identifier)
-                except self.requisition_model.DoesNotExist as e:
-                    raise ManifestReportError(
-                        f'{e} Got requisition identifier {aliquot.requisition_identifier}',
-                        code='invalid_requisition_identifier')
-                barcode = code39.Standard39(
-                    aliquot.aliquot_identifier, barHeight=5 * mm, stop=1)
-                table_data.append([
-                    barcode,
-                    Paragraph(str(box_item.position), self.styles['row_data']),
-                    Paragraph(
-                        aliquot.human_readable_identifier, self.styles['row_data']),
-                    Paragraph(
-                        aliquot.subject_identifier, self.styles['row_data']),
-                    Paragraph('{} ({}) {}'.format(
-                        aliquot.aliquot_type,
-                        aliquot.numeric_code,
-                        requisition.panel_object.abbreviation), self.styles['row_data']),
-                    Paragraph(aliquot.aliquot_datetime.strftime(
-                        '%Y-%m-%d'), self.styles['row_data']),
-                ])
-                t1 = Table(table_data)
-                t1.setStyle(TableStyle([
-                    ('INNERGRID', (0, 0), (-1, -1), 0.25, colors.black),
-                    ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-                    ('BOX', (0, 0), (-1, -1), 0.25, colors.black)]))
-            story.append(t1)
+            table_data = [box_items_header]
+            table_data.extend(
+                self.get_box_item_row(*item) for item in report_box.items)
+            t2 = LongTable(table_data, repeatRows=1)
+            t2.setStyle(BOX_ITEMS_TABLE_STYLE)
+            story.append(t2)
         return story
+
+    def get_box_row(self, box=None):
+        barcode = get_barcode(box.box_identifier, 5 * mm, stats=self.barcode_stats)
+        return [
+            Paragraph(
+                box.box_identifier, self.styles["line_data_large"]),
+            Paragraph(
+                box.get_category_display().upper(), self.styles["line_data_large"]),
+            Paragraph(box.specimen_types, self.styles["line_data_large"]),
+            Paragraph(
+                '{}/{}'.format(str(box.count), str(box.box_type.total)), self.styles["line_data_large"]),
+            Paragraph(box.box_datetime.strftime(
+                '%Y-%m-%d'), self.styles["line_data_large"]),
+            barcode]
+
+    def get_box_item_row(self, box_item=None, aliquot=None, requisition=None, panel=None):
+        barcode = get_barcode(
+            aliquot.aliquot_identifier, 5 * mm, stats=self.barcode_stats)
+        return [
+            barcode,
+            Paragraph(str(box_item.position), self.styles['row_data']),
+            Paragraph(
+                aliquot.human_readable_identifier, self.styles['row_data']),
+            Paragraph(
+                aliquot.subject_identifier, self.styles['row_data']),
+            Paragraph('{} ({}) {}'.format(
+                aliquot.aliquot_type,
+                aliquot.numeric_code,
+                panel.abbreviation), self.styles['row_data']),
+            Paragraph(aliquot.aliquot_datetime.strftime(
+                '%Y-%m-%d'), self.styles['row_data'])]
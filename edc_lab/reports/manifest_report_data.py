@@ -0,0 +1,109 @@
+from collections import namedtuple
+
+
+class ManifestReportError(Exception):
+    def __init__(self, message, code=None):
+        super().__init__(message)
+        self.code = code
+
+
+ManifestReportBox = namedtuple(
+    'ManifestReportBox', 'manifest_item box items')
+
+ManifestReportItem = namedtuple(
+    'ManifestReportItem', 'box_item aliquot requisition panel')
+
+
+class ManifestReportData:
+
+    """A class to read the contents of a manifest for the
+    manifest report.
+
+    Manifest items, boxes, box items, aliquots and requisitions
+    are each read with one query and joined in memory. Each query
+    selects its rows with a subquery on the previous table rather
+    than a list of identifiers, so neither the number of queries
+    nor the number of query parameters depends on the size of the
+    manifest.
+
+    Raises ManifestReportError for the first missing box, aliquot
+    or requisition in report order.
+    """
+
+    box_cls = ManifestReportBox
+    item_cls = ManifestReportItem
+
+    def __init__(self, manifest=None, box_model=None, box_item_model=None,
+                 aliquot_model=None, requisition_model=None, boxes=None):
+        self.manifest = manifest
+        self.box_model = box_model
+        self.box_item_model = box_item_model
+        self.aliquot_model = aliquot_model
+        self.requisition_model = requisition_model
+        self._boxes = boxes
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(manifest={self.manifest})'
+
+    def __iter__(self):
+        return iter(self.boxes)
+
+    @property
+    def boxes(self):
+        """Returns a list of boxes, each with its items, in
+        report order.
+        """
+        if self._boxes is None:
+            self._boxes = self.load()
+        return self._boxes
+
+    def load(self):
+        manifest_items = self.manifest.manifestitem_set.all()
+        box_queryset = self.box_model.objects.filter(
+            box_identifier__in=manifest_items.values('identifier'))
+        box_item_queryset = self.box_item_model.objects.filter(
+            box__in=box_queryset.values('pk'))
+        aliquot_queryset = self.aliquot_model.objects.filter(
+            aliquot_identifier__in=box_item_queryset.values('identifier'))
+        manifest_items = list(manifest_items.order_by('-created'))
+        boxes = {
+            obj.box_identifier: obj
+            for obj in box_queryset.select_related('box_type')}
+        for manifest_item in manifest_items:
+            if manifest_item.identifier not in boxes:
+                raise ManifestReportError(
+                    f'{self.box_model._meta.object_name} matching query does not exist. '
+                    f'Got Manifest item \'{manifest_item.identifier}\'.',
+                    code='unboxed_item')
+        box_items = {}
+        for box_item in box_item_queryset.order_by('position'):
+            box_items.setdefault(box_item.box_id, []).append(box_item)
+        aliquots = {
+            obj.aliquot_identifier: obj for obj in aliquot_queryset}
+        requisitions = {
+            obj.requisition_identifier: obj
+            for obj in self.requisition_model.objects.filter(
+                requisition_identifier__in=aliquot_queryset.values(
+                    'requisition_identifier'))}
+        report_boxes = []
+        for manifest_item in manifest_items:
+            box = boxes.get(manifest_item.identifier)
+            items = []
+            for box_item in box_items.get(box.pk, []):
+                aliquot = aliquots.get(box_item.identifier)
+                if not aliquot:
+                    raise ManifestReportError(
+                        f'{self.aliquot_model._meta.object_name} matching query '
+                        f'does not exist. Got Box item \'{box_item.identifier}\'',
+                        code='invalid_aliquot_identifier')
+                requisition = requisitions.get(aliquot.requisition_identifier)
+                if not requisition:
+                    raise ManifestReportError(
+                        f'{self.requisition_model._meta.object_name} matching query '
+                        f'does not exist. Got requisition identifier '
+                        f'{aliquot.requisition_identifier}',
+                        code='invalid_requisition_identifier')
+                items.append(self.item_cls(
+                    box_item, aliquot, requisition, requisition.panel_object))
+            report_boxes.append(self.box_cls(manifest_item, box, items))
+        return report_boxes
@@ -1,16 +1,145 @@
+import threading
+
+from collections import OrderedDict
+from functools import lru_cache
+from reportlab.graphics import renderPDF
+from reportlab.graphics.barcode import createBarcodeDrawing
 from reportlab.lib.pagesizes import A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_RIGHT, TA_CENTER, TA_LEFT
-from reportlab.platypus import Paragraph
+from reportlab.platypus import Flowable, Paragraph
 
 from django.apps import apps as django_apps
 from django.utils import timezone
 
 
+BARCODE_CACHE_SIZE = 8192
+
+
+@lru_cache(maxsize=None)
+def get_styles():
+    """Returns the paragraph styles shared by all reports.
+
+    Built once per process.
+    """
+    styles = getSampleStyleSheet()
+    styles.add(
+        ParagraphStyle(name='header', fontSize=6, alignment=TA_CENTER))
+    styles.add(
+        ParagraphStyle(name='footer', fontSize=6, alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='center', alignment=TA_CENTER))
+    styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT))
+    styles.add(ParagraphStyle(name='left', alignment=TA_LEFT))
+    styles.add(ParagraphStyle(
+        name='line_data', alignment=TA_LEFT, fontSize=8, leading=7))
+    styles.add(ParagraphStyle(
+        name='line_data_small', alignment=TA_LEFT, fontSize=7, leading=8))
+    styles.add(ParagraphStyle(
+        name='line_data_small_center', alignment=TA_CENTER, fontSize=7, leading=8))
+    styles.add(ParagraphStyle(
+        name='line_data_large', alignment=TA_LEFT, fontSize=12, leading=12))
+    styles.add(ParagraphStyle(
+        name='line_data_largest', alignment=TA_LEFT, fontSize=14, leading=15))
+    styles.add(ParagraphStyle(
+        name='line_label', font='Helvetica-Bold', fontSize=7, leading=6, alignment=TA_LEFT))
+    styles.add(ParagraphStyle(
+        name='line_label_center',
+        font='Helvetica-Bold', fontSize=7, alignment=TA_CENTER))
+    styles.add(ParagraphStyle(
+        name='row_header',
+        font='Helvetica-Bold', fontSize=8, leading=8, alignment=TA_CENTER))
+    styles.add(ParagraphStyle(
+        name='row_data',
+        font='Helvetica', fontSize=7, leading=7, alignment=TA_CENTER,))
+    return styles
+
+
+class BarcodeFlowable(Flowable):
+
+    """A flowable that draws a shared barcode drawing.
+
+    The drawing is only read, so a new flowable can be made for
+    each use while the drawing is cached.
+    """
+
+    def __init__(self, drawing=None):
+        super().__init__()
+        self.drawing = drawing
+        self.width = drawing.width
+        self.height = drawing.height
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(drawing={self.drawing!r})'
+
+    def wrap(self, available_width, available_height):
+        return self.width, self.height
+
+    def draw(self):
+        renderPDF.draw(self.drawing, self.canv, 0, 0)
+
+
+class BarcodeCache:
+
+    """An in-process cache of code39 barcode drawings.
+
+    The least recently used drawings are dropped once the cache
+    holds `maxsize` drawings. Hits and misses are counted into
+    the `stats` dictionary passed by the caller, if any.
+    """
+
+    flowable_cls = BarcodeFlowable
+
+    def __init__(self, maxsize=None):
+        self.maxsize = maxsize
+        self._drawings = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(maxsize={self.maxsize})'
+
+    def __len__(self):
+        return len(self._drawings)
+
+    def get(self, value=None, bar_height=None, stats=None):
+        """Returns a new barcode flowable for the value and bar
+        height.
+        """
+        key = (value, bar_height)
+        with self._lock:
+            drawing = self._drawings.get(key)
+            hit = drawing is not None
+            if hit:
+                self._drawings.move_to_end(key)
+        if not hit:
+            drawing = createBarcodeDrawing(
+                'Standard39', value=value, barHeight=bar_height, stop=1)
+            with self._lock:
+                self._drawings[key] = drawing
+                while len(self._drawings) > self.maxsize:
+                    self._drawings.popitem(last=False)
+        if stats is not None:
+            name = 'barcode_hits' if hit else 'barcode_misses'
+            stats.update({name: stats.get(name, 0) + 1})
+        return self.flowable_cls(drawing)
+
+    def clear(self):
+        with self._lock:
+            self._drawings = OrderedDict()
+
+
+barcode_cache = BarcodeCache(maxsize=BARCODE_CACHE_SIZE)
+
+
+def get_barcode(value=None, bar_height=None, stats=None):
+    """Returns a code39 barcode flowable for the value and bar
+    height drawing a cached barcode. See `barcode_cache`.
+    """
+    return barcode_cache.get(value=value, bar_height=bar_height, stats=stats)
+
+
 class Report:
 
     def __init__(self, header_line=None, **kwargs):
-        self._styles = None
         self.edc_base_app_config = django_apps.get_app_config('edc_base')
         self.header_line = header_line or self.edc_base_app_config.institution
 
@@ -30,35 +159,4 @@ class Report:
 
     @property
     def styles(self):
-        if not self._styles:
-            styles = getSampleStyleSheet()
-            styles.add(
-                ParagraphStyle(name='header', fontSize=6, alignment=TA_CENTER))
-            styles.add(
-                ParagraphStyle(name='footer', fontSize=6, alignment=TA_RIGHT))
-            styles.add(ParagraphStyle(name='center', alignment=TA_CENTER))
-            styles.add(ParagraphStyle(name='Right', alignment=TA_RIGHT))
-            styles.add(ParagraphStyle(name='left', alignment=TA_LEFT))
-            styles.add(ParagraphStyle(
-                name='line_data', alignment=TA_LEFT, fontSize=8, leading=7))
-            styles.add(ParagraphStyle(
-                name='line_data_small', alignment=TA_LEFT, fontSize=7, leading=8))
-            styles.add(ParagraphStyle(
-                name='line_data_small_center', alignment=TA_CENTER, fontSize=7, leading=8))
-            styles.add(ParagraphStyle(
-                name='line_data_large', alignment=TA_LEFT, fontSize=12, leading=12))
-            styles.add(ParagraphStyle(
-                name='line_data_largest', alignment=TA_LEFT, fontSize=14, leading=15))
-            styles.add(ParagraphStyle(
-                name='line_label', font='Helvetica-Bold', fontSize=7, leading=6, alignment=TA_LEFT))
-            styles.add(ParagraphStyle(
-                name='line_label_center',
-                font='Helvetica-Bold', fontSize=7, alignment=TA_CENTER))
-            styles.add(ParagraphStyle(
-                name='row_header',
-                font='Helvetica-Bold', fontSize=8, leading=8, alignment=TA_CENTER))
-            styles.add(ParagraphStyle(
-                name='row_data',
-                font='Helvetica', fontSize=7, leading=7, alignment=TA_CENTER,))
-            self._styles = styles
-        return self._styles
+        return get_styles()
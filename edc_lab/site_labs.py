@@ -1,8 +1,13 @@
-import copy
+import hashlib
+import os
+import pickle
 import sys
+import threading
 
 from django.apps import apps as django_apps
-from django.utils.module_loading import import_module, module_has_submodule
+from importlib import import_module
+from importlib.util import find_spec
+from time import perf_counter
 
 
 class AlreadyRegistered(Exception):
@@ -15,15 +20,38 @@ class RegistryNotLoaded(Exception):
 
 class SiteLabs:
 
+    snapshot_protocol = '1'
+
+    # modules of the classes pickled in a snapshot
+    snapshot_modules = (
+        'edc_lab.lab.aliquot_type',
+        'edc_lab.lab.lab_profile',
+        'edc_lab.lab.processing_profile',
+        'edc_lab.lab.requisition_panel',
+    )
+
     def __init__(self):
         self._registry = {}
+        self._panels = {}
+        self._panels_registry = None
         self.loaded = False
+        self.version = 0
+        self.lab_modules = []
+        self.timings = {}
+        self.timing = False
+        self.verbose = True
+        self.snapshot_names = set()
+        self._pending = []
+        self._importing = False
+        self._lock = threading.RLock()
 
     def __repr__(self):
         return f'{self.__class__.__name__}(loaded={self.loaded})'
 
     @property
     def registry(self):
+        if self._pending:
+            self.import_pending()
         if not self.loaded:
             raise RegistryNotLoaded(
                 'Registry not loaded. Is AppConfig for \'edc_lab\' '
@@ -31,19 +59,65 @@ class SiteLabs:
         return self._registry
 
     def get(self, lab_profile_name):
+        if self._pending:
+            self.import_pending()
         if not self.loaded:
             raise RegistryNotLoaded(self)
         return self._registry.get(lab_profile_name)
 
+    def get_panel(self, label_lower=None, panel_name=None):
+        """Returns the panel for the requisition model label_lower
+        and panel name or None.
+
+        Panels are read from a cache keyed by (label_lower, panel_name)
+        that is rebuilt if lab profiles are registered or the
+        registry is replaced.
+        """
+        if self._pending:
+            self.import_pending()
+        if self._panels_registry is not self._registry:
+            self.build_panel_cache()
+        try:
+            return self._panels[(label_lower, panel_name)]
+        except KeyError:
+            # panel may have been added to a registered lab profile
+            lab_profile = self.get(label_lower)
+            panel = None if lab_profile is None else lab_profile.panels.get(panel_name)
+            if panel is not None:
+                self._panels.update({(label_lower, panel_name): panel})
+            return panel
+
+    def build_panel_cache(self):
+        """Builds the panel cache from the registry.
+        """
+        panels = {}
+        for key, lab_profile in self._registry.items():
+            if key != lab_profile.name:
+                panels.update({
+                    (key, panel_name): panel
+                    for panel_name, panel in lab_profile.panels.items()})
+        self._panels = panels
+        self._panels_registry = self._registry
+        self.version += 1
+
     def register(self, lab_profile=None):
         """Registers a lab profile instance using the label_lower (model)
         as the key.
 
             model: label_lower string
             lab_profile: instance of LabProfile
+
+        The processing profiles of the lab profile are validated
+        and compiled into their processing plans.
         """
         if lab_profile:
             self.loaded = True
+            if lab_profile.name in self.snapshot_names:
+                # replaces the lab profile loaded from a snapshot
+                self.snapshot_names.discard(lab_profile.name)
+                self._registry = {
+                    k: v for k, v in self._registry.items()
+                    if v.name != lab_profile.name}
             value = self.registry.get(
                 lab_profile.requisition_model._meta.label_lower)
             if value and value != lab_profile:
@@ -51,34 +125,184 @@ class SiteLabs:
                     f'Lab profile {lab_profile} is already registered with '
                     f'model \'{lab_profile.requisition_model._meta.label_lower}\'.')
             elif lab_profile.name not in self.registry:
+                for processing_profile in lab_profile.processing_profiles.values():
+                    processing_profile.validate()
                 self.registry.update({lab_profile.name: lab_profile})
                 self.registry.update(
                     {lab_profile.requisition_model._meta.label_lower: lab_profile})
+                for processing_profile in lab_profile.processing_profiles.values():
+                    processing_profile.compile()
+                self._panels_registry = None
+                self.version += 1
             else:
                 raise AlreadyRegistered(
                     f'Lab profile {lab_profile} is already registered.')
 
-    def autodiscover(self, module_name=None):
+    def autodiscover(self, module_name=None, lazy=None, verbose=None, timing=None):
         """Autodiscovers classes in the labs.py file of any
         INSTALLED_APP.
+
+        `labs` modules are located with `find_spec` without importing
+        them. If `lazy`, located modules are imported on first access
+        to the registry instead of now.
+
+        If `timing`, writes the discovery cost of each app to stdout.
         """
         module_name = module_name or 'labs'
-        sys.stdout.write(f' * checking for {module_name} ...\n')
-        for app in django_apps.app_configs:
+        self.verbose = True if verbose is None else verbose
+        self.timing = timing
+        self.timings = {}
+        self.write(f' * checking for {module_name} ...\n')
+        self.lab_modules = self.find_modules(module_name)
+        with self._lock:
+            self._pending = list(self.lab_modules)
+        if not lazy:
+            self.import_pending()
+
+    def find_modules(self, module_name=None):
+        """Returns a list of (app name, module name) for apps
+        with the given submodule.
+        """
+        lab_modules = []
+        for app_config in django_apps.get_app_configs():
+            start = perf_counter()
             try:
-                mod = import_module(app)
-                try:
-                    before_import_registry = copy.copy(site_labs._registry)
-                    import_module(f'{app}.{module_name}')
-                    sys.stdout.write(
-                        f' * registered labs from application \'{app}\'\n')
-                except Exception as e:
-                    if f'No module named \'{app}.{module_name}\'' not in str(e):
-                        site_labs._registry = before_import_registry
-                        if module_has_submodule(mod, module_name):
-                            raise
+                spec = find_spec(f'{app_config.name}.{module_name}')
             except ImportError:
-                pass
+                spec = None
+            if spec:
+                lab_modules.append((app_config.name, spec.name))
+            self.timings.update({app_config.name: perf_counter() - start})
+        return lab_modules
+
+    def import_pending(self):
+        """Imports located `labs` modules not yet imported.
+
+        Imports are serialized by a lock; a concurrent caller waits
+        until all pending modules are imported. A module is removed
+        from `_pending` only once imported, so readers never see an
+        empty `_pending` with a partial registry.
+
+        If a module fails to import, the registry is restored and the
+        modules after it remain pending.
+        """
+        with self._lock:
+            if self._importing:
+                # called by a labs module registering with site_labs
+                return
+            self._importing = True
+            try:
+                self._import_pending()
+            finally:
+                self._importing = False
+
+    def _import_pending(self):
+        while self._pending:
+            app, module_name = self._pending[0]
+            start = perf_counter()
+            before_import_registry = dict(self._registry)
+            try:
+                import_module(module_name)
+            except Exception:
+                self._pending.pop(0)
+                self._registry = before_import_registry
+                self._panels_registry = None
+                self.version += 1
+                raise
+            self._pending.pop(0)
+            self.timings.update(
+                {app: self.timings.get(app, 0) + perf_counter() - start})
+            self.write(f' * registered labs from application \'{app}\'\n')
+        if self.loaded:
+            self.build_panel_cache()
+        if self.timing:
+            self.write_timing_report()
+
+    def write_timing_report(self):
+        """Writes the discovery cost of each app to stdout
+        regardless of `verbose`.
+        """
+        sys.stdout.write(f' * labs discovery: {sum(self.timings.values()) * 1000:.2f}ms\n')
+        for app, seconds in sorted(
+                self.timings.items(), key=lambda x: x[1], reverse=True):
+            sys.stdout.write(f'   - {app}: {seconds * 1000:.2f}ms\n')
+
+    def labs_hash(self, module_name=None):
+        """Returns a hash of the source of all `labs` modules, the
+        modules next to them that they may import and the edc_lab
+        modules of the classes in the registry.
+        """
+        labs_hash = hashlib.sha256(self.snapshot_protocol.encode())
+        paths = [find_spec(name).origin for name in self.snapshot_modules]
+        for _, name in self.find_modules(module_name or 'labs'):
+            spec = find_spec(name)
+            paths.append(spec.origin)
+            directory = os.path.dirname(spec.origin)
+            for location in spec.submodule_search_locations or []:
+                directory = os.path.dirname(location)
+                for root, _, filenames in sorted(os.walk(location)):
+                    paths.extend(os.path.join(root, filename)
+                                 for filename in sorted(filenames)
+                                 if filename.endswith('.py'))
+            paths.extend(os.path.join(directory, filename)
+                         for filename in sorted(os.listdir(directory))
+                         if filename.endswith('.py'))
+        for path in dict.fromkeys(paths):
+            labs_hash.update(path.encode())
+            with open(path, 'rb') as f:
+                labs_hash.update(f.read())
+        return labs_hash.hexdigest()
+
+    def freeze(self, path=None):
+        """Writes the registry and a hash of the `labs` modules to
+        a snapshot file.
+
+        The registry is fully loaded before it is written.
+        """
+        registry = self.registry
+        with open(path, 'wb') as f:
+            pickle.dump(
+                dict(labs_hash=self.labs_hash(), registry=registry),
+                f, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load_snapshot(self, path=None):
+        """Loads the registry from a snapshot file written by
+        `freeze` and returns True, or returns False if the snapshot
+        does not exist, does not match the source it was written
+        from or cannot be unpickled into the current classes.
+
+        Snapshot files are trusted deploy artifacts; do not load
+        a snapshot from an untrusted source.
+        """
+        try:
+            with open(path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except FileNotFoundError:
+            return False
+        except Exception as e:
+            self.write(f' * unable to load labs snapshot \'{path}\'. Got {e}\n')
+            return False
+        if not isinstance(snapshot, dict) or snapshot.get('labs_hash') != self.labs_hash():
+            return False
+        registry, panels, panels_registry = self._registry, self._panels, self._panels_registry
+        try:
+            self._registry = snapshot.get('registry')
+            self.snapshot_names = {v.name for v in self._registry.values()}
+            self.build_panel_cache()
+        except Exception as e:
+            self._registry, self._panels, self._panels_registry = (
+                registry, panels, panels_registry)
+            self.snapshot_names = set()
+            self.write(f' * unable to load labs snapshot \'{path}\'. Got {e}\n')
+            return False
+        self._pending = []
+        self.loaded = True
+        self.write(f' * loaded labs from snapshot \'{path}\'\n')
+        return True
+
+    def write(self, msg=None):
+        if self.verbose:
+            sys.stdout.write(msg)
 
 
 site_labs = SiteLabs()
@@ -1,5 +1,5 @@
 from django import template
-from django.core.exceptions import ObjectDoesNotExist
+from django.core.cache import cache
 from django.urls import reverse
 
 from ..models import BoxItem
@@ -9,41 +9,67 @@ from edc_lab.constants import SHIPPED
 register = template.Library()
 
 
-@register.inclusion_tag('edc_lab/listboard/box/box_cell.html')
-def show_box_rows(box, listboard_url_name, position=None):
-    position = '0' if position is None else str(position)
+BOX_ROWS_CACHE_TIMEOUT = 300
+
+# position used to reverse the cell URL once per box
+POSITION_PLACEHOLDER = 987654321
+
+
+def get_box_rows(box, listboard_url_name):
+    """Returns a dictionary of headers and rows of cells for
+    the box grid.
+
+    Box items are read with one query, the layout comes from
+    the cached box geometry and the cell URL is reversed once.
+    The result is cached by box pk and modified datetime.
+    """
+    cache_key = None
+    if box.modified:
+        cache_key = (f'edc_lab:box_rows:{box.pk}:{box.modified.timestamp()}:'
+                     f'{listboard_url_name}')
+        box_rows = cache.get(cache_key)
+        if box_rows:
+            return box_rows
     btn_style = {
         -1: 'btn-danger',
         0: 'btn-default',
         1: 'btn-success'}
-    pos = 0
+    box_items = {obj.position: obj for obj in box.boxitem_set.all()}
+    href_prefix, href_suffix = reverse(listboard_url_name, kwargs={
+        'position': POSITION_PLACEHOLDER,
+        'box_identifier': box.box_identifier,
+        'action_name': 'verify'}).split(str(POSITION_PLACEHOLDER), 1)
+    empty_box_item = BoxItem(box=box)
+    geometry = box.geometry
     rows = []
-    header = range(1, box.box_type.across + 1)
-    for i in range(1, box.box_type.down + 1):
-        row = {}
-        reverse_kwargs = {}
-        row['position'] = i
-        row['cells'] = []
-        for _ in range(1, box.box_type.across + 1):
-            cell = {}
-            pos += 1
-            try:
-                box_item = box.boxitem_set.get(position=pos)
-            except ObjectDoesNotExist:
-                box_item = BoxItem(box=box)
-            reverse_kwargs = {
+    for i, positions in enumerate(geometry.rows, start=1):
+        row = {'position': i, 'cells': []}
+        for pos in positions:
+            box_item = box_items.get(pos, empty_box_item)
+            row['cells'].append({
                 'position': pos,
-                'box_identifier': box.box_identifier,
-                'action_name': 'verify'}
-            cell['href'] = reverse(listboard_url_name, kwargs=reverse_kwargs)
-            cell['btn_style'] = btn_style.get(box_item.verified)
-            cell['btn_label'] = str(pos).zfill(2)
-            cell['btn_title'] = box_item.human_readable_identifier or 'empty'
-            cell['has_focus'] = str(pos) == position
-            cell['box_item'] = box_item
-            row['cells'].append(cell)
+                'href': f'{href_prefix}{pos}{href_suffix}',
+                'btn_style': btn_style.get(box_item.verified),
+                'btn_label': str(pos).zfill(2),
+                'btn_title': box_item.human_readable_identifier or 'empty',
+                'box_item_id': box_item.id if pos in box_items else None})
         rows.append(row)
-    return {'headers': header, 'rows': rows}
+    box_rows = {'headers': geometry.headers, 'rows': rows}
+    if cache_key:
+        cache.set(cache_key, box_rows, BOX_ROWS_CACHE_TIMEOUT)
+    return box_rows
+
+
+@register.inclusion_tag('edc_lab/listboard/box/box_cell.html')
+def show_box_rows(box, listboard_url_name, position=None):
+    position = '0' if position is None else str(position)
+    box_rows = get_box_rows(box, listboard_url_name)
+    rows = []
+    for row in box_rows['rows']:
+        rows.append(dict(row, cells=[
+            dict(cell, has_focus=str(cell['position']) == position)
+            for cell in row['cells']]))
+    return {'headers': box_rows['headers'], 'rows': rows}
 
 
 @register.filter(is_safe=True)
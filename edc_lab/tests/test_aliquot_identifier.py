@@ -2,6 +2,8 @@ from django.test import TestCase, tag
 
 from ..identifiers import AliquotIdentifier, Prefix, PrefixKeyError, PrefixLengthError
 from ..identifiers import AliquotIdentifierLengthError, AliquotIdentifierCountError
+from ..identifiers import AliquotIdentifierBatch
+from ..lab import AliquotType, Process, ProcessingProfile
 
 
 @tag('prefix')
@@ -123,3 +125,69 @@ class TestAliquotIdentifier(TestCase):
                 identifier_length=17)
         except AliquotIdentifierLengthError:
             self.fail('AliquotIdentifierLengthError unexpectedly raised.')
+
+
+@tag('identifier')
+class TestAliquotIdentifierBatch(TestCase):
+
+    def setUp(self):
+        a = AliquotType(name='aliquot_a', numeric_code='55', alpha_code='AA')
+        b = AliquotType(name='aliquot_b', numeric_code='66', alpha_code='BB')
+        c = AliquotType(name='aliquot_c', numeric_code='77', alpha_code='CC')
+        a.add_derivatives(b, c)
+        self.processing_profile = ProcessingProfile(
+            name='process', aliquot_type=a)
+        self.processing_profile.add_processes(
+            Process(aliquot_type=b, aliquot_count=3),
+            Process(aliquot_type=c, aliquot_count=4))
+        self.options = dict(
+            identifier_prefix='XXXXXXXX',
+            parent_segment='0201',
+            count_padding=2,
+            identifier_length=16)
+
+    def test_batch_matches_scalar(self):
+        batch = AliquotIdentifierBatch(
+            processing_profile=self.processing_profile, **self.options)
+        self.assertEqual(len(batch), 7)
+        count = 1
+        identifiers = []
+        for process in self.processing_profile.processes.values():
+            for _ in range(0, process.aliquot_count):
+                count += 1
+                identifiers.append(AliquotIdentifier(
+                    count=count,
+                    numeric_code=process.aliquot_type.numeric_code,
+                    **self.options).identifier)
+        self.assertEqual(batch.identifiers, identifiers)
+        self.assertEqual([item.count for item in batch], list(range(2, 9)))
+        self.assertEqual(
+            [item.numeric_code for item in batch], ['66'] * 3 + ['77'] * 4)
+
+    def test_batch_length_raises(self):
+        self.options.update(identifier_length=17)
+        self.assertRaises(
+            AliquotIdentifierLengthError,
+            AliquotIdentifierBatch,
+            processing_profile=self.processing_profile, **self.options)
+
+    def test_batch_large_count_raises_length_error(self):
+        self.assertRaises(
+            AliquotIdentifierLengthError,
+            AliquotIdentifierBatch,
+            processing_profile=self.processing_profile,
+            start=95, **self.options)
+
+    def test_batch_count_raises(self):
+        self.assertRaises(
+            AliquotIdentifierCountError,
+            AliquotIdentifierBatch,
+            processing_profile=self.processing_profile,
+            start=1, **self.options)
+
+    def test_batch_needs_parent_segment(self):
+        self.options.update(parent_segment=None)
+        self.assertRaises(
+            AliquotIdentifierCountError,
+            AliquotIdentifierBatch,
+            processing_profile=self.processing_profile, **self.options)
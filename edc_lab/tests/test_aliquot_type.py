@@ -33,11 +33,46 @@ class TestAliquotType(TestCase):
         """Asserts can add a derivative.
         """
         self.wb.add_derivatives(self.bc)
-        self.assertEqual(self.wb.derivatives, [self.bc])
+        self.assertEqual(self.wb.derivatives, (self.bc, ))
 
     def test_aliquot_type_derivatives_multi(self):
         """Asserts can add more than one derivative.
         """
         pl = AliquotType(name='plasma', numeric_code='32', alpha_code='PL')
         self.wb.add_derivatives(self.bc, pl)
-        self.assertEqual(self.wb.derivatives, [self.bc, pl])
+        self.assertEqual(self.wb.derivatives, (self.bc, pl))
+
+    def test_aliquot_type_equality(self):
+        wb = AliquotType(
+            name='whole_blood', numeric_code='02', alpha_code='WB')
+        self.assertEqual(wb, self.wb)
+        self.assertNotEqual(wb, self.bc)
+        self.assertEqual(len({wb, self.wb, self.bc}), 2)
+
+    def test_aliquot_type_immutable(self):
+        self.assertRaises(AttributeError, setattr, self.wb, 'name', 'plasma')
+        self.assertRaises(AttributeError, setattr, self.wb, 'color', 'red')
+
+    def test_aliquot_type_derivatives_unique(self):
+        self.wb.add_derivatives(self.bc, self.bc)
+        self.assertEqual(self.wb.derivatives, (self.bc, ))
+        self.assertTrue(self.wb.is_derivative(self.bc))
+
+    def test_aliquot_type_transitive_derivatives(self):
+        pl = AliquotType(name='plasma', numeric_code='32', alpha_code='PL')
+        pa = AliquotType(name='plasma_aliquot', numeric_code='36', alpha_code='PA')
+        self.wb.add_derivatives(self.bc, pl)
+        self.assertFalse(self.wb.can_derive(pa))
+        pl.add_derivatives(pa)
+        self.assertFalse(self.wb.is_derivative(pa))
+        self.assertTrue(self.wb.can_derive(pa))
+        self.assertTrue(self.wb.can_derive(pa, through=pl))
+        self.assertFalse(self.wb.can_derive(pa, through=self.bc))
+        self.assertFalse(pa.can_derive(self.wb))
+
+    def test_aliquot_type_derivatives_cycle(self):
+        pl = AliquotType(name='plasma', numeric_code='32', alpha_code='PL')
+        self.wb.add_derivatives(pl)
+        pl.add_derivatives(self.wb)
+        self.assertTrue(self.wb.can_derive(self.wb))
+        self.assertEqual(list(self.wb.all_derivatives), [pl, self.wb])
@@ -0,0 +1,316 @@
+from django.core.management import call_command
+from django.test import TestCase, tag
+from unittest.mock import patch
+
+from edc_constants.constants import OPEN
+
+from ..box_geometry import BoxGeometryError
+from ..constants import SHIPPED, VERIFIED
+from ..exceptions import BoxItemDuplicateError
+from ..models import Box, BoxItem, BoxType
+from ..models.box import BoxFullError
+
+
+@tag('box')
+class TestBoxCounters(TestCase):
+
+    def setUp(self):
+        box_type = BoxType.objects.create(
+            name='box_type', across=8, down=8, total=64)
+        self.box = Box.objects.create(box_type=box_type)
+
+    def add_items(self, count=None, verified=None):
+        for position in range(1, count + 1):
+            BoxItem.objects.create(
+                box=self.box,
+                identifier=f'{position}',
+                position=position,
+                verified=verified or 0)
+
+    def test_counters_on_create(self):
+        self.add_items(3)
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 3)
+        self.assertEqual(self.box.count, 3)
+        self.assertEqual(self.box.verified_count, 0)
+        self.assertEqual(self.box.max_position, 3)
+        self.assertEqual(self.box.next_position, 4)
+
+    def test_counters_on_verify(self):
+        self.add_items(3)
+        for box_item in BoxItem.objects.all():
+            box_item.verified = 1
+            box_item.save()
+        self.box.save()
+        self.assertEqual(self.box.verified_count, 3)
+        self.assertTrue(self.box.is_verified)
+        self.assertEqual(self.box.status, VERIFIED)
+
+    def test_counters_on_unverify(self):
+        self.add_items(3, verified=1)
+        BoxItem.objects.get(position=2).unverify()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.verified_count, 2)
+        self.assertEqual(self.box.status, OPEN)
+
+    def test_counters_on_delete(self):
+        self.add_items(3)
+        BoxItem.objects.get(position=3).delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 2)
+        self.assertEqual(self.box.max_position, 2)
+        BoxItem.objects.all().delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 0)
+        self.assertEqual(self.box.max_position, 0)
+
+    def test_counters_on_move(self):
+        self.add_items(3)
+        box_item = BoxItem.objects.get(position=3)
+        box_item.position = 10
+        box_item.save()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.max_position, 10)
+        other_box = Box.objects.create(box_type=self.box.box_type)
+        box_item.box = other_box
+        box_item.save()
+        self.box.refresh_from_db()
+        other_box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 2)
+        self.assertEqual(self.box.max_position, 2)
+        self.assertEqual(other_box.item_count, 1)
+        self.assertEqual(other_box.max_position, 10)
+
+    def test_box_properties_without_queries(self):
+        self.add_items(20)
+        box = Box.objects.select_related('box_type').get(pk=self.box.pk)
+        with self.assertNumQueries(0):
+            box.is_verified
+            box.count
+            box.next_position
+
+    def test_save_does_not_write_counters(self):
+        self.add_items(2)
+        stale_box = Box.objects.get(pk=self.box.pk)
+        stale_box.item_count = 99
+        stale_box.max_position = 99
+        with patch.object(Box, 'refresh_counters'):
+            stale_box.save()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 2)
+        self.assertEqual(self.box.max_position, 2)
+
+    def test_rebuild_counters(self):
+        self.add_items(3, verified=1)
+        Box.objects.filter(pk=self.box.pk).update(
+            item_count=0, verified_count=0, max_position=0)
+        call_command('rebuild_box_counters', self.box.box_identifier)
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 3)
+        self.assertEqual(self.box.verified_count, 3)
+        self.assertEqual(self.box.max_position, 3)
+
+
+@tag('box')
+class TestBoxOccupancy(TestCase):
+
+    def setUp(self):
+        self.box_type = BoxType.objects.create(
+            name='box_type', across=3, down=2, total=6)
+        self.box = Box.objects.create(box_type=self.box_type)
+
+    def test_positions_across(self):
+        self.assertEqual(
+            [self.box_type.slot_to_position(slot) for slot in range(0, 6)],
+            [1, 2, 3, 4, 5, 6])
+
+    def test_positions_down(self):
+        self.box_type.fill_order = 'down'
+        self.assertEqual(
+            [self.box_type.slot_to_position(slot) for slot in range(0, 6)],
+            [1, 4, 2, 5, 3, 6])
+        for slot in range(0, 6):
+            self.assertEqual(
+                self.box_type.position_to_slot(
+                    self.box_type.slot_to_position(slot)), slot)
+
+    def test_next_position_reuses_gap(self):
+        for position in range(1, 4):
+            BoxItem.objects.create(
+                box=self.box, identifier=f'{position}', position=position)
+        BoxItem.objects.get(position=2).delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.next_position, 2)
+
+    def test_place(self):
+        BoxItem.objects.create(box=self.box, identifier='1', position=1)
+        box_items = self.box.place(['2', '3', '4'])
+        self.assertEqual([obj.position for obj in box_items], [2, 3, 4])
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 4)
+        self.assertEqual(self.box.max_position, 4)
+        self.assertEqual(self.box.next_position, 5)
+
+    def test_place_down(self):
+        self.box_type.fill_order = 'down'
+        self.box_type.save()
+        box = Box.objects.get(pk=self.box.pk)
+        box_items = box.place(['1', '2', '3'])
+        self.assertEqual([obj.position for obj in box_items], [1, 4, 2])
+
+    def test_place_down_partial_box(self):
+        box_type = BoxType.objects.create(
+            name='box_type_7', across=3, down=3, total=7, fill_order='down')
+        box = Box.objects.create(box_type=box_type)
+        box_items = box.place([str(n) for n in range(1, 7)])
+        self.assertEqual(
+            [obj.position for obj in box_items], [1, 4, 7, 2, 5, 8])
+        box = Box.objects.get(pk=box.pk)
+        self.assertEqual(box.free_count, 1)
+        self.assertEqual(box.next_position, 3)
+        Box.objects.filter(pk=box.pk).update(occupancy=None)
+        box = Box.objects.get(pk=box.pk)
+        self.assertEqual(box.next_position, 3)
+        box.place(['7'])
+        self.assertRaises(BoxFullError, box.place, ['8'])
+
+    def test_place_full(self):
+        self.box.place(['1', '2', '3', '4', '5'])
+        self.assertRaises(BoxFullError, self.box.place, ['6', '7'])
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 5)
+        self.assertEqual(self.box.next_position, 6)
+        self.box.place(['6'])
+        self.box.refresh_from_db()
+        self.assertIsNone(self.box.next_position)
+
+    def test_save_refreshes_counters(self):
+        stale_box = Box.objects.get(pk=self.box.pk)
+        self.box.place(['1', '2'])
+        stale_box.save()
+        self.assertEqual(stale_box.item_count, 2)
+        self.assertEqual(stale_box.max_position, 2)
+        self.assertEqual(stale_box.next_position, 3)
+
+
+@tag('box')
+class TestBoxGeometry(TestCase):
+
+    def setUp(self):
+        self.box_type = BoxType.objects.create(
+            name='box_type', across=3, down=2, total=6)
+        self.box = Box.objects.create(box_type=self.box_type)
+
+    def test_coordinates(self):
+        geometry = self.box_type.geometry
+        self.assertEqual(geometry.coordinates(1), (1, 1))
+        self.assertEqual(geometry.coordinates(4), (2, 1))
+        self.assertEqual(geometry.coordinates(6), (2, 3))
+        for position in range(1, 7):
+            self.assertEqual(
+                geometry.position(*geometry.coordinates(position)), position)
+        self.assertEqual(geometry.rows, ((1, 2, 3), (4, 5, 6)))
+
+    def test_invalid(self):
+        geometry = self.box_type.geometry
+        self.assertRaises(BoxGeometryError, geometry.coordinates, 7)
+        self.assertRaises(BoxGeometryError, geometry.slot_to_position, 6)
+        self.assertRaises(BoxGeometryError, geometry.position, 3, 1)
+
+    def test_layout_shared(self):
+        box_type = BoxType.objects.create(
+            name='box_type_2', across=3, down=2, total=6)
+        self.assertIs(box_type.geometry, self.box_type.geometry)
+
+    def test_box_geometry_without_queries(self):
+        box = Box.objects.select_related('box_type').get(pk=self.box.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(box.geometry.total, 6)
+
+    def test_layout_changed_on_save(self):
+        self.assertEqual(self.box.geometry.fill_order, 'across')
+        box_type = BoxType.objects.get(pk=self.box_type.pk)
+        box_type.fill_order = 'down'
+        box_type.save()
+        box = Box.objects.get(pk=self.box.pk)
+        self.assertEqual(box.geometry.fill_order, 'down')
+        self.assertEqual(box.next_position, 1)
+
+    def test_layout_change_clears_occupancy(self):
+        BoxItem.objects.create(box=self.box, identifier='A1', position=1)
+        BoxItem.objects.create(box=self.box, identifier='A2', position=2)
+        box_type = BoxType.objects.get(pk=self.box_type.pk)
+        box_type.fill_order = 'down'
+        box_type.save()
+        box = Box.objects.get(pk=self.box.pk)
+        self.assertIsNone(box.occupancy)
+        # positions 1 and 2 are slots 0 and 2 when filling down
+        self.assertEqual(box.next_position, 4)
+
+    def test_layout_unchanged_keeps_occupancy(self):
+        BoxItem.objects.create(box=self.box, identifier='A1', position=1)
+        box_type = BoxType.objects.get(pk=self.box_type.pk)
+        box_type.name = 'renamed'
+        box_type.save()
+        box = Box.objects.get(pk=self.box.pk)
+        self.assertIsNotNone(box.occupancy)
+
+
+@tag('box')
+class TestBoxItemLocate(TestCase):
+
+    def setUp(self):
+        box_type = BoxType.objects.create(
+            name='box_type', across=10, down=10, total=100)
+        self.box = Box.objects.create(box_type=box_type)
+        self.other_box = Box.objects.create(box_type=box_type)
+        self.identifiers = [f'A{n}' for n in range(0, 50)]
+        self.box.place(self.identifiers)
+
+    def test_locate(self):
+        with self.assertNumQueries(1):
+            locations = BoxItem.objects.locate(self.identifiers + ['B1'])
+        self.assertEqual(sorted(locations), sorted(self.identifiers))
+        location = locations.get('A4')[0]
+        self.assertEqual(location.box_identifier, self.box.box_identifier)
+        self.assertEqual(location.position, 5)
+
+    def test_duplicate_in_open_box_raises(self):
+        self.assertRaises(
+            BoxItemDuplicateError,
+            BoxItem.objects.create, box=self.other_box, identifier='A1', position=1)
+        self.assertRaises(
+            BoxItemDuplicateError, self.other_box.place, ['B1', 'A2'])
+        self.assertFalse(self.other_box.boxitem_set.exists())
+
+    def test_duplicate_checked_after_locking_aliquots(self):
+        with patch.object(Box, 'lock_aliquots') as lock_aliquots:
+            self.assertRaises(
+                BoxItemDuplicateError, self.other_box.place, ['B1', 'A2'])
+            lock_aliquots.assert_called_once_with(['B1', 'A2'])
+        with patch.object(Box, 'lock_aliquots') as lock_aliquots:
+            self.assertRaises(
+                BoxItemDuplicateError,
+                BoxItem.objects.create, box=self.other_box, identifier='A1', position=1)
+            lock_aliquots.assert_called_once_with(['A1'])
+
+    def test_duplicate_does_not_claim_positions(self):
+        self.assertRaises(
+            BoxItemDuplicateError, self.other_box.place, ['B1', 'A2'])
+        other_box = Box.objects.get(pk=self.other_box.pk)
+        self.assertEqual(other_box.free_count, 100)
+        self.assertEqual(other_box.next_position, 1)
+
+    def test_duplicate_in_shipped_box_allowed(self):
+        Box.objects.filter(pk=self.box.pk).update(status=SHIPPED)
+        self.other_box.place(['A1'])
+        locations = BoxItem.objects.locate(['A1'])
+        self.assertEqual(len(locations.get('A1')), 2)
+        self.assertEqual(BoxItem.objects.duplicates(), {'A1': 2})
+        self.assertEqual(BoxItem.objects.in_open_boxes().duplicates(), {})
+
+    def test_move_within_box(self):
+        box_item = BoxItem.objects.get(identifier='A1')
+        box_item.position = 99
+        box_item.save()
+        self.assertEqual(BoxItem.objects.locate(['A1']).get('A1')[0].position, 99)
@@ -0,0 +1,114 @@
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from edc_constants.constants import OPEN
+
+from ..lab import BoxPacker
+from ..constants import SHIPPED
+from ..lab.box_packer import ACCEPTED, ALREADY_BOXED, ALREADY_IN_BOX, BOX_FULL, BOX_NOT_OPEN
+from ..lab.box_packer import DOES_NOT_EXIST, INVALID_SPECIMEN_TYPE
+from ..lab.box_packer import PRIMARY_NOT_ACCEPTED
+from ..models import Aliquot, Box, BoxItem, BoxType
+
+
+@tag('box_packer')
+class TestBoxPacker(TestCase):
+
+    def setUp(self):
+        self.box_type = BoxType.objects.create(
+            name='box_type', across=5, down=2, total=10)
+        self.box = Box.objects.create(
+            box_type=self.box_type, specimen_types='32,36')
+
+    def create_aliquots(self, count=None, numeric_code=None, is_primary=None):
+        identifiers = []
+        for index in range(0, count):
+            identifier = f'{numeric_code or "32"}{index:016d}'
+            Aliquot.objects.create(
+                aliquot_identifier=identifier,
+                numeric_code=numeric_code or '32',
+                is_primary=is_primary or False,
+                count=2)
+            identifiers.append(identifier)
+        return identifiers
+
+    def test_pack(self):
+        identifiers = self.create_aliquots(5)
+        result = BoxPacker(box=self.box).pack(identifiers)
+        self.assertEqual(result.accepted, identifiers)
+        self.assertEqual(result.rejected, {})
+        self.assertEqual(
+            list(BoxItem.objects.filter(box=self.box).values_list('position', flat=True)),
+            [1, 2, 3, 4, 5])
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 5)
+        self.assertEqual(self.box.status, OPEN)
+
+    def test_pack_reasons(self):
+        identifiers = self.create_aliquots(2)
+        primary = self.create_aliquots(1, numeric_code='36', is_primary=True)
+        invalid = self.create_aliquots(1, numeric_code='02')
+        other_box = Box.objects.create(box_type=self.box_type, specimen_types='32')
+        BoxItem.objects.create(box=other_box, identifier=identifiers[1], position=1)
+        result = BoxPacker(box=self.box).pack(
+            identifiers + identifiers[0:1] + primary + invalid + ['blah'])
+        self.assertEqual(result.reasons, {
+            identifiers[0]: ACCEPTED,
+            identifiers[1]: ALREADY_BOXED,
+            primary[0]: PRIMARY_NOT_ACCEPTED,
+            invalid[0]: INVALID_SPECIMEN_TYPE,
+            'blah': DOES_NOT_EXIST})
+        result = BoxPacker(box=self.box).pack(identifiers[0:1] * 2)
+        self.assertEqual(result.reasons, {identifiers[0]: ALREADY_IN_BOX})
+
+    def test_pack_duplicates(self):
+        identifiers = self.create_aliquots(2)
+        result = BoxPacker(box=self.box).pack(identifiers + identifiers[0:1])
+        self.assertEqual(result.accepted, identifiers)
+        self.assertEqual(result.duplicates, identifiers[0:1])
+
+    def test_pack_box_full(self):
+        identifiers = self.create_aliquots(12)
+        result = BoxPacker(box=self.box).pack(identifiers)
+        self.assertEqual(len(result.accepted), 10)
+        self.assertEqual(
+            result.rejected, {identifier: BOX_FULL for identifier in identifiers[10:]})
+
+    def test_pack_validates_locked_box(self):
+        identifiers = self.create_aliquots(2)
+        packer = BoxPacker(box=self.box)
+        Box.objects.filter(pk=self.box.pk).update(status=SHIPPED)
+        result = packer.pack(identifiers)
+        self.assertEqual(
+            result.rejected, {identifier: BOX_NOT_OPEN for identifier in identifiers})
+        self.assertFalse(BoxItem.objects.filter(box=self.box).exists())
+
+    def test_pack_boxed_in_shipped_box(self):
+        identifiers = self.create_aliquots(1)
+        shipped_box = Box.objects.create(box_type=self.box_type, specimen_types='32')
+        BoxItem.objects.create(box=shipped_box, identifier=identifiers[0], position=1)
+        Box.objects.filter(pk=shipped_box.pk).update(status=SHIPPED)
+        result = BoxPacker(box=self.box).pack(identifiers)
+        self.assertEqual(result.reasons, {identifiers[0]: ACCEPTED})
+
+    def test_pack_already_in_box_and_shipped_box(self):
+        identifiers = self.create_aliquots(1)
+        shipped_box = Box.objects.create(box_type=self.box_type, specimen_types='32')
+        BoxItem.objects.create(box=shipped_box, identifier=identifiers[0], position=1)
+        Box.objects.filter(pk=shipped_box.pk).update(status=SHIPPED)
+        BoxPacker(box=self.box).pack(identifiers)
+        result = BoxPacker(box=self.box).pack(identifiers)
+        self.assertEqual(result.reasons, {identifiers[0]: ALREADY_IN_BOX})
+
+    def test_pack_queries(self):
+        """Asserts the number of queries does not depend on the
+        number of identifiers.
+        """
+        identifiers = self.create_aliquots(10)
+        with CaptureQueriesContext(connection) as one:
+            BoxPacker(box=self.box).pack(identifiers[0:1])
+        box = Box.objects.create(box_type=self.box_type, specimen_types='32')
+        with CaptureQueriesContext(connection) as many:
+            BoxPacker(box=box).pack(identifiers[1:])
+        self.assertEqual(len(one), len(many))
@@ -0,0 +1,85 @@
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from edc_constants.constants import OPEN
+
+from ..constants import VERIFIED
+from ..lab import BoxVerification, BoxVerificationError
+from ..models import Box, BoxItem, BoxType
+
+
+@tag('box_verification')
+class TestBoxVerification(TestCase):
+
+    def setUp(self):
+        box_type = BoxType.objects.create(
+            name='box_type', across=5, down=5, total=25)
+        self.box = Box.objects.create(box_type=box_type)
+        self.box.place([f'A{position}' for position in range(1, 11)])
+
+    def test_scan(self):
+        verification = BoxVerification(box=self.box)
+        self.assertEqual(verification.scan(1, 'A1'), 1)
+        self.assertEqual(verification.scan(2, 'blah'), -1)
+        self.assertEqual(verification.mismatches, {2: ('A2', 'blah')})
+        self.assertEqual(verification.unscanned, list(range(3, 11)))
+
+    def test_scan_empty_position(self):
+        verification = BoxVerification(box=self.box)
+        self.assertRaises(BoxVerificationError, verification.scan, 20, 'A20')
+
+    def test_commit_all_verified(self):
+        verification = BoxVerification(box=self.box)
+        verification.scan_many((p, f'A{p}') for p in range(1, 11))
+        verification.commit()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.verified_count, 10)
+        self.assertEqual(self.box.status, VERIFIED)
+        self.assertEqual(BoxItem.objects.filter(verified=1).count(), 10)
+
+    def test_commit_mismatch(self):
+        verification = BoxVerification(box=self.box)
+        verification.scan_many((p, f'A{p}') for p in range(1, 10))
+        verification.scan(10, 'blah')
+        verification.commit()
+        self.assertEqual(BoxItem.objects.get(position=10).verified, -1)
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.verified_count, 9)
+        self.assertEqual(self.box.status, OPEN)
+        self.box.rebuild_counters()
+        self.assertEqual(self.box.verified_count, 9)
+        self.assertEqual(
+            BoxItem.history.filter(history_type='~').count(), 10)
+
+    def test_commit_stale_session(self):
+        first = BoxVerification(box=self.box)
+        second = BoxVerification(box=self.box)
+        first.scan_many((p, f'A{p}') for p in range(1, 11))
+        second.scan_many((p, f'A{p}') for p in range(1, 11))
+        first.commit()
+        self.assertEqual(second.commit(), [])
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.verified_count, 10)
+
+    def test_commit_queries(self):
+        verification = BoxVerification(box=self.box)
+        verification.scan_many((p, f'A{p}') for p in range(1, 3))
+        with CaptureQueriesContext(connection) as few:
+            verification.commit()
+        verification = BoxVerification(box=self.box)
+        verification.scan_many((p, f'A{p}') for p in range(3, 11))
+        with CaptureQueriesContext(connection) as many:
+            verification.commit()
+        self.assertEqual(len(few), len(many))
+
+    def test_unverify_box(self):
+        verification = BoxVerification(box=self.box)
+        verification.scan_many((p, f'A{p}') for p in range(1, 11))
+        verification.commit()
+        box = Box.objects.get(pk=self.box.pk)
+        box.unverify_box()
+        box.refresh_from_db()
+        self.assertEqual(box.verified_count, 0)
+        self.assertEqual(box.status, OPEN)
+        self.assertEqual(BoxItem.objects.filter(verified=0).count(), 10)
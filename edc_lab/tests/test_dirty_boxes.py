@@ -0,0 +1,149 @@
+from django.db import connection, transaction
+from django.test import TransactionTestCase, tag
+from django.test.utils import CaptureQueriesContext
+
+from edc_constants.constants import OPEN
+
+from ..constants import PACKED, VERIFIED
+from ..models import Box, BoxItem, BoxType
+from ..models import Consignee, Manifest, ManifestItem, Shipper
+from ..models.dirty_boxes import dirty_boxes
+
+
+@tag('box')
+class TestDirtyBoxes(TransactionTestCase):
+
+    """Box recomputation runs on commit so these tests use
+    TransactionTestCase.
+    """
+
+    def setUp(self):
+        box_type = BoxType.objects.create(
+            name='box_type', across=8, down=8, total=64)
+        self.box = Box.objects.create(box_type=box_type)
+
+    def add_items(self, count=None, verified=None):
+        for position in range(1, count + 1):
+            BoxItem.objects.create(
+                box=self.box,
+                identifier=f'{position}',
+                position=position,
+                verified=verified or 0)
+
+    def history_count(self):
+        return Box.history.filter(id=self.box.pk).count()
+
+    def test_delete_last_unverified_item_verifies_box(self):
+        self.add_items(2, verified=1)
+        BoxItem.objects.create(
+            box=self.box, identifier='3', position=3)
+        self.box.save()
+        self.assertEqual(self.box.status, OPEN)
+        BoxItem.objects.get(position=3).delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.status, VERIFIED)
+
+    def test_deletes_in_transaction_save_box_once(self):
+        self.add_items(10, verified=1)
+        BoxItem.objects.create(
+            box=self.box, identifier='11', position=11)
+        self.box.save()
+        history_count = self.history_count()
+        with transaction.atomic():
+            for box_item in BoxItem.objects.filter(position__gt=5):
+                box_item.delete()
+            self.assertEqual(self.history_count(), history_count)
+        self.assertEqual(self.history_count(), history_count + 1)
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 5)
+        self.assertEqual(self.box.status, VERIFIED)
+
+    def test_queryset_delete_rebuilds_counters(self):
+        self.add_items(20, verified=1)
+        BoxItem.objects.filter(position__gt=5).delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.item_count, 5)
+        self.assertEqual(self.box.verified_count, 5)
+        self.assertEqual(self.box.max_position, 5)
+        self.assertEqual(self.box.next_position, 6)
+
+    def test_queryset_delete_queries(self):
+        """Asserts a queryset delete does not update the box
+        once per item.
+        """
+        self.add_items(20)
+        table = Box._meta.db_table
+        with CaptureQueriesContext(connection) as few:
+            BoxItem.objects.filter(position__gt=18).delete()
+        with CaptureQueriesContext(connection) as many:
+            BoxItem.objects.filter(position__gt=2).delete()
+        self.assertEqual(
+            len([q for q in few if q['sql'].startswith(f'UPDATE "{table}"')]),
+            len([q for q in many if q['sql'].startswith(f'UPDATE "{table}"')]))
+
+    def test_manifest_item_delete_verifies_box_once(self):
+        self.add_items(2, verified=1)
+        Box.objects.filter(pk=self.box.pk).update(status=PACKED)
+        manifest = Manifest.objects.create(
+            consignee=Consignee.objects.create(name='consignee'),
+            shipper=Shipper.objects.create(name='shipper'),
+            site_code='site_code',
+            site_name='site_name')
+        ManifestItem.objects.create(
+            manifest=manifest, identifier=self.box.box_identifier)
+        ManifestItem.objects.create(
+            manifest=manifest, identifier='not_a_box')
+        history_count = self.history_count()
+        with transaction.atomic():
+            ManifestItem.objects.all().delete()
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.status, VERIFIED)
+        self.assertEqual(self.history_count(), history_count + 1)
+
+    def test_sibling_savepoints_save_box_once(self):
+        self.add_items(2)
+        history_count = self.history_count()
+        with transaction.atomic():
+            for _ in range(0, 3):
+                with transaction.atomic():
+                    dirty_boxes.mark(box_pk=self.box.pk, status=VERIFIED)
+        self.assertEqual(self.history_count(), history_count + 1)
+
+    def test_rolled_back_marks_not_saved_again(self):
+        self.add_items(2)
+        try:
+            with transaction.atomic():
+                dirty_boxes.mark(box_pk=self.box.pk, status=VERIFIED)
+                raise ValueError
+        except ValueError:
+            pass
+        history_count = self.history_count()
+        with transaction.atomic():
+            dirty_boxes.mark(box_pk=self.box.pk)
+        self.assertEqual(self.history_count(), history_count)
+
+    def test_rolled_back_marks_discarded(self):
+        self.add_items(2)
+        try:
+            with transaction.atomic():
+                dirty_boxes.mark(box_pk=self.box.pk, status=VERIFIED)
+                raise ValueError
+        except ValueError:
+            pass
+        with transaction.atomic():
+            dirty_boxes.mark(box_pk=self.box.pk)
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.status, OPEN)
+
+    def test_rolled_back_savepoint_marks_discarded(self):
+        self.add_items(2)
+        with transaction.atomic():
+            dirty_boxes.mark(box_pk=self.box.pk)
+            try:
+                with transaction.atomic():
+                    dirty_boxes.mark(box_pk=self.box.pk, status=VERIFIED)
+                    raise ValueError
+            except ValueError:
+                pass
+        self.box.refresh_from_db()
+        self.assertEqual(self.box.status, OPEN)
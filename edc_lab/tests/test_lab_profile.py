@@ -59,6 +59,23 @@ class TestBuildProfile(TestCase):
         except ProcessingProfileInvalidDerivative:
             self.fail('ProcessingProfileInvalidDerivative unexpectedly raised.')
 
+    def test_processing_transitive_bad(self):
+        """Asserts CANNOT add process for aliquot C to a profile
+        for aliquot A if C is derived from A only through B."""
+        a = AliquotType(name='aliquot_a', numeric_code='55', alpha_code='AA')
+        b = AliquotType(name='aliquot_b', numeric_code='66', alpha_code='BB')
+        c = AliquotType(name='aliquot_c', numeric_code='77', alpha_code='CC')
+        a.add_derivatives(b)
+        b.add_derivatives(c)
+        self.assertTrue(a.can_derive(c, through=b))
+        processing_profile = ProcessingProfile(
+            name='process', aliquot_type=a)
+        self.assertRaises(
+            ProcessingProfileInvalidDerivative,
+            processing_profile.add_processes,
+            Process(aliquot_type=b, aliquot_count=1),
+            Process(aliquot_type=c, aliquot_count=2))
+
     def test_panel(self):
         RequisitionPanel(name='Viral Load', aliquot_type=self.bc)
 
@@ -147,6 +164,65 @@ class TestBuildProfile(TestCase):
             requisition_model='edc_lab.subjectrequisition')
         lab_profile.add_panel(panel=panel)
 
+    def test_processing_plan(self):
+        a = AliquotType(name='aliquot_a', numeric_code='55', alpha_code='AA')
+        b = AliquotType(name='aliquot_b', numeric_code='66', alpha_code='BB')
+        c = AliquotType(name='aliquot_c', numeric_code='77', alpha_code='CC')
+        a.add_derivatives(b, c)
+        processing_profile = ProcessingProfile(
+            name='process', aliquot_type=a)
+        processing_profile.add_processes(
+            Process(aliquot_type=b, aliquot_count=2),
+            Process(aliquot_type=c, aliquot_count=1))
+        plan = processing_profile.get_plan()
+        self.assertEqual(
+            [(item.count, item.name, item.alpha_code, item.suffix) for item in plan],
+            [(2, 'aliquot_b', 'BB', '6602'),
+             (3, 'aliquot_b', 'BB', '6603'),
+             (4, 'aliquot_c', 'CC', '7704')])
+        self.assertEqual(plan.suffix_lengths, {4})
+        self.assertIs(processing_profile.get_plan(), plan)
+
+    def test_processing_plan_invalidated(self):
+        a = AliquotType(name='aliquot_a', numeric_code='55', alpha_code='AA')
+        b = AliquotType(name='aliquot_b', numeric_code='66', alpha_code='BB')
+        c = AliquotType(name='aliquot_c', numeric_code='77', alpha_code='CC')
+        a.add_derivatives(b, c)
+        processing_profile = ProcessingProfile(
+            name='process', aliquot_type=a)
+        processing_profile.add_processes(
+            Process(aliquot_type=b, aliquot_count=2))
+        plan = processing_profile.compile()
+        self.assertEqual(len(plan), 2)
+        processing_profile.add_processes(
+            Process(aliquot_type=c, aliquot_count=1))
+        self.assertIsNot(processing_profile.get_plan(), plan)
+        self.assertEqual(len(processing_profile.get_plan()), 3)
+
+    def test_panel_equality(self):
+        panel = RequisitionPanel(
+            name='Viral Load',
+            aliquot_type=self.wb,
+            model='edc_lab.subjectrequisition')
+        other = RequisitionPanel(
+            name='Viral Load',
+            aliquot_type=self.wb,
+            model='edc_lab.subjectrequisition')
+        self.assertEqual(panel, other)
+        self.assertIn(other, {panel})
+        self.assertRaises(AttributeError, setattr, panel, 'name', 'CD4')
+
+    def test_process_equality(self):
+        self.wb.add_derivatives(self.bc)
+        process = Process(aliquot_type=self.bc, aliquot_count=3)
+        self.assertEqual(process, Process(aliquot_type=self.bc, aliquot_count=3))
+        self.assertNotEqual(process, Process(aliquot_type=self.bc, aliquot_count=2))
+        processing_profile = ProcessingProfile(
+            name='process', aliquot_type=self.wb)
+        self.assertEqual(
+            processing_profile,
+            ProcessingProfile(name='process', aliquot_type=self.wb))
+
     def test_add_panel(self):
         a = AliquotType(name='aliquot_a', numeric_code='55', alpha_code='AA')
         b = AliquotType(name='aliquot_b', numeric_code='66', alpha_code='BB')
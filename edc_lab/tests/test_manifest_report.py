@@ -1,13 +1,55 @@
+import shutil
+import tempfile
+
+from concurrent.futures import Future
 from django.contrib.auth.models import User
+from django.core.files.storage import FileSystemStorage
+from django.db import connection
 from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from reportlab.platypus import LongTable
+from unittest.mock import patch
+
+from edc_constants.constants import YES
 
 from ..models import Manifest, Shipper, Consignee, ManifestItem
-from ..reports import ManifestReport
+from ..lab import SpecimenBatch
+from ..reports import ManifestReport, barcode_cache, get_barcode
+from edc_lab.reports.manifest_artifacts import ManifestArtifacts
 from edc_lab.reports.manifest_report import ManifestReportError
 from edc_lab.models.box import Box
 from edc_lab.models.box_item import BoxItem
 from edc_lab.models.box_type import BoxType
 from edc_lab.models.aliquot import Aliquot
+from .models import SubjectRequisition, SubjectVisit
+from .site_labs_test_mixin import TestMixin
+
+
+class QueuedManifestArtifacts(ManifestArtifacts):
+
+    """Records queued renders instead of running them in a thread.
+    """
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.queued = []
+
+    def submit(self, manifest=None, reprint=None, user=None):
+        self.queued.append((manifest.manifest_identifier, reprint))
+
+
+def patch_artifacts(test_case):
+    """Patches ManifestReport to store artifacts in a temporary
+    directory for the duration of the test and returns the artifacts.
+    """
+    location = tempfile.mkdtemp()
+    test_case.addCleanup(shutil.rmtree, location)
+    artifacts = QueuedManifestArtifacts(
+        storage=FileSystemStorage(location=location))
+    patcher = patch.object(ManifestReport, 'artifacts', artifacts)
+    patcher.start()
+    test_case.addCleanup(patcher.stop)
+    return artifacts
 
 
 @tag('manifest')
@@ -54,6 +96,7 @@ class TestManifest(TestCase):
 class TestManifestReport(TestCase):
 
     def setUp(self):
+        self.artifacts = patch_artifacts(self)
         self.user = User.objects.create(first_name='Noam', last_name='Chomsky')
         consignee = Consignee.objects.create(name='consignee')
         shipper = Shipper.objects.create(name='shipper')
@@ -68,6 +111,18 @@ class TestManifestReport(TestCase):
         report = ManifestReport(manifest=self.manifest, user=self.user)
         report.render()
 
+    def test_report_spooled(self):
+        report = ManifestReport(manifest=self.manifest, user=self.user)
+        response = report.render()
+        self.assertTrue(response.streaming)
+        content = b''.join(response.streaming_content)
+        self.assertTrue(content.startswith(b'%PDF'))
+        self.assertEqual(int(response['Content-Length']), len(content))
+        response.close()
+        response = report.render(spooled=False)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
     def test_report_shipped(self):
         self.manifest.shipped = True
         self.manifest.save()
@@ -156,3 +211,226 @@ class TestManifestReport(TestCase):
             report.render()
         except ManifestReportError as e:
             self.assertEqual(e.code, 'invalid_requisition_identifier')
+
+
+@tag('manifest')
+class TestManifestReportQueries(TestMixin, TestCase):
+
+    def setUp(self):
+        self.setup_site_labs()
+        self.artifacts = patch_artifacts(self)
+        self.user = User.objects.create(first_name='Noam', last_name='Chomsky')
+        self.subject_visit = SubjectVisit.objects.create(
+            subject_identifier='1111111111')
+        self.box_type = BoxType.objects.create(
+            name='box_type', across=8, down=8, total=64)
+
+    def get_manifest(self, box_count=None, item_count=None):
+        manifest = Manifest.objects.create(
+            consignee=Consignee.objects.create(name='consignee'),
+            shipper=Shipper.objects.create(name='shipper'),
+            site_code='site_code',
+            site_name='site_name')
+        for _ in range(0, box_count):
+            requisitions = [
+                SubjectRequisition.objects.create(
+                    subject_visit=self.subject_visit,
+                    panel_name=self.panel.name,
+                    protocol_number='999',
+                    is_drawn=YES) for _ in range(0, item_count)]
+            batch = SpecimenBatch(requisitions=requisitions)
+            box = Box.objects.create(box_type=self.box_type)
+            box.place([obj.aliquot_identifier for obj in batch.primary_aliquots.values()])
+            ManifestItem.objects.create(
+                manifest=manifest, identifier=box.box_identifier)
+        return manifest
+
+    def test_data(self):
+        manifest = self.get_manifest(box_count=2, item_count=3)
+        report = ManifestReport(manifest=manifest, user=self.user)
+        self.assertEqual(len(report.data.boxes), 2)
+        for report_box in report.data:
+            self.assertEqual(
+                [item.box_item.position for item in report_box.items], [1, 2, 3])
+            for item in report_box.items:
+                self.assertEqual(item.aliquot.aliquot_identifier, item.box_item.identifier)
+                self.assertEqual(
+                    item.requisition.requisition_identifier,
+                    item.aliquot.requisition_identifier)
+                self.assertEqual(item.panel, self.panel)
+
+    def test_queries_constant(self):
+        small = self.get_manifest(box_count=1, item_count=1)
+        large = self.get_manifest(box_count=3, item_count=5)
+        with CaptureQueriesContext(connection) as small_queries:
+            ManifestReport(manifest=small, user=self.user).append_manifest_items_story([])
+        with CaptureQueriesContext(connection) as large_queries:
+            ManifestReport(manifest=large, user=self.user).append_manifest_items_story([])
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertEqual(len(large_queries), 5)
+
+    def test_queries_do_not_list_identifiers(self):
+        manifest = self.get_manifest(box_count=2, item_count=3)
+        with CaptureQueriesContext(connection) as queries:
+            ManifestReport(manifest=manifest, user=self.user).data.boxes
+        sql = ' '.join(query.get('sql') for query in queries)
+        for box_item in BoxItem.objects.all():
+            self.assertNotIn(box_item.identifier, sql)
+        for manifest_item in manifest.manifestitem_set.all():
+            self.assertNotIn(manifest_item.identifier, sql)
+
+    def test_one_items_table_per_box(self):
+        manifest = self.get_manifest(box_count=2, item_count=5)
+        story = ManifestReport(
+            manifest=manifest, user=self.user).append_manifest_items_story([])
+        tables = [obj for obj in story if isinstance(obj, LongTable)]
+        self.assertEqual(len(tables), 2)
+        self.assertEqual([len(obj._cellvalues) for obj in tables], [6, 6])
+        self.assertEqual(tables[0].repeatRows, 1)
+
+    def test_styles_shared(self):
+        manifest = self.get_manifest(box_count=1, item_count=1)
+        self.assertIs(
+            ManifestReport(manifest=manifest, user=self.user).styles,
+            ManifestReport(manifest=manifest, user=self.user).styles)
+
+    def test_reprint_reuses_barcodes(self):
+        manifest = self.get_manifest(box_count=2, item_count=3)
+        report = ManifestReport(manifest=manifest, user=self.user)
+        barcode_cache.clear()
+        report.render().close()
+        self.assertEqual(report.render_stats.get('barcode_misses'), 8)
+        report.render().close()
+        self.assertEqual(report.render_stats.get('barcode_misses'), 0)
+        self.assertEqual(report.render_stats.get('barcode_hits'), 8)
+        self.assertEqual(report.render_stats.get('barcode_hit_rate'), 1.0)
+
+    def test_barcode_flowable_not_shared(self):
+        barcode = get_barcode('ABC123', 5)
+        other = get_barcode('ABC123', 5)
+        self.assertIsNot(barcode, other)
+        self.assertIs(barcode.drawing, other.drawing)
+        self.assertEqual(barcode.wrap(100, 100), other.wrap(100, 100))
+
+    def test_barcode_stats_per_build(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        report = ManifestReport(manifest=manifest, user=self.user)
+        other = ManifestReport(manifest=manifest, user=self.user)
+        barcode_cache.clear()
+        report.render().close()
+        get_barcode('ABC123', 5)
+        other.render().close()
+        self.assertEqual(report.render_stats.get('barcode_misses'), 3)
+        self.assertEqual(other.render_stats.get('barcode_hits'), 3)
+        self.assertEqual(other.render_stats.get('barcode_misses'), 0)
+
+    def test_shipped_rendered_once(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        with patch('django.db.transaction.on_commit') as on_commit:
+            response = ManifestReport(manifest=manifest, user=self.user).render()
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        response.close()
+        manifest.refresh_from_db()
+        self.assertTrue(manifest.printed)
+        # reprint queued only when the transaction commits
+        self.assertEqual(self.artifacts.queued, [])
+        on_commit.call_args[0][0]()
+        self.assertEqual(
+            self.artifacts.queued, [(manifest.manifest_identifier, True)])
+        # reprint rendered by the worker, here synchronously
+        name = self.artifacts.render(manifest=manifest, reprint=True, user=self.user)
+        self.assertEqual(name, self.artifacts.get(manifest=manifest, reprint=True, user=self.user))
+        barcode_cache.clear()
+        report = ManifestReport(manifest=manifest, user=self.user)
+        report.render().close()
+        self.assertEqual(report.render_stats, {})
+        self.assertEqual(len(barcode_cache), 0)
+
+    def test_shipped_not_spooled(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        response = ManifestReport(
+            manifest=manifest, user=self.user).render(spooled=False)
+        self.assertFalse(response.streaming)
+        self.assertTrue(response.content.startswith(b'%PDF'))
+
+    def test_artifact_per_user(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.printed = True
+        manifest.save()
+        other_user = User.objects.create(
+            username='other', first_name='Ada', last_name='Lovelace')
+        name = self.artifacts.render(manifest=manifest, reprint=True, user=self.user)
+        self.assertIsNone(self.artifacts.get(manifest=manifest, reprint=True, user=other_user))
+        other_name = self.artifacts.render(manifest=manifest, reprint=True, user=other_user)
+        self.assertNotEqual(name, other_name)
+
+    def test_printed_concurrently_serves_reprint(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        report = ManifestReport(manifest=manifest, user=self.user)
+        Manifest.objects.filter(pk=manifest.pk).update(printed=True)
+        report.render().close()
+        self.assertEqual(self.artifacts.queued, [])
+        self.assertIsNotNone(self.artifacts.get(manifest=manifest, reprint=True, user=self.user))
+
+    def test_artifact_saved_once(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        name = self.artifacts.render(manifest=manifest, reprint=True, user=self.user)
+        self.assertEqual(
+            self.artifacts.render(manifest=manifest, reprint=True, user=self.user), name)
+        self.assertEqual(
+            self.artifacts.storage.listdir(self.artifacts.location)[1],
+            [name.split('/')[-1]])
+
+    def test_failed_queued_render_rendered_in_request(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        future = Future()
+        future.set_exception(RuntimeError('worker failed'))
+        name = self.artifacts.get_name(manifest=manifest, reprint=False, user=self.user)
+        self.artifacts._pending[name] = future
+        response = ManifestReport(manifest=manifest, user=self.user).render()
+        self.assertTrue(b''.join(response.streaming_content).startswith(b'%PDF'))
+        response.close()
+        self.assertEqual(name, self.artifacts.get(manifest=manifest, reprint=False, user=self.user))
+
+    def test_render_in_thread(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.printed = True
+        manifest.save()
+        name = self.artifacts.get_name(manifest=manifest, reprint=True, user=self.user)
+        with patch('edc_lab.reports.manifest_artifacts.connection') as worker_connection:
+            self.assertEqual(
+                self.artifacts.render_in_thread(
+                    manifest_pk=manifest.pk, reprint=True,
+                    user_pk=self.user.pk, name=name), name)
+        worker_connection.close.assert_called_once_with()
+        self.assertEqual(name, self.artifacts.get(manifest=manifest, reprint=True, user=self.user))
+
+    def test_artifact_invalidated_by_box_item(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        manifest.shipped = True
+        manifest.save()
+        name = self.artifacts.render(manifest=manifest, reprint=True, user=self.user)
+        box = Box.objects.get(box_identifier=manifest.manifestitem_set.get().identifier)
+        BoxItem.objects.filter(box=box, position=2).delete()
+        self.assertIsNone(self.artifacts.get(manifest=manifest, reprint=True, user=self.user))
+        self.assertNotEqual(
+            self.artifacts.get_name(manifest=manifest, reprint=True, user=self.user), name)
+
+    def test_preview_not_stored(self):
+        manifest = self.get_manifest(box_count=1, item_count=2)
+        ManifestReport(manifest=manifest, user=self.user).render().close()
+        self.assertIsNone(self.artifacts.get(manifest=manifest, reprint=False, user=self.user))
+        manifest.refresh_from_db()
+        self.assertFalse(manifest.printed)
@@ -79,3 +79,23 @@ class TestPrimaryAliquot(TestCase):
             aliquot_identifier_cls=AliquotIdentifier,
             aliquot_creator_cls=AliquotCreator)
         self.assertTrue(str(primary_aliquot))
+
+    def test_primary_aliquot_by_aliquot_identifier(self):
+        """Asserts an existing primary aliquot is found with a single
+        query on the aliquot identifier if the aliquot type is known.
+        """
+        aliquot_type = AliquotType(
+            name='aliquot_a', numeric_code='22', alpha_code='WW')
+        options = dict(
+            requisition_identifier='ABCDE',
+            identifier_prefix='066ABCDE',
+            aliquot_model=Aliquot,
+            aliquot_type=aliquot_type,
+            identifier_length=16,
+            count_padding=2,
+            aliquot_identifier_cls=AliquotIdentifier,
+            aliquot_creator_cls=AliquotCreator)
+        obj = PrimaryAliquot(**options).object
+        with self.assertNumQueries(1):
+            p = PrimaryAliquot(**options)
+        self.assertEqual(obj.aliquot_identifier, p.object.aliquot_identifier)
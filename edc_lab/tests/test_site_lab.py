@@ -1,11 +1,18 @@
+import io
+import os
+import pickle
 import re
+import tempfile
+import threading
 
 from django.test import TestCase, tag
+from unittest.mock import patch
 
 from edc_constants.constants import YES, NO, NOT_APPLICABLE
 
 from ..lab import AliquotType, LabProfile, ProcessingProfile
-from ..lab import Process, ProcessingProfileAlreadyAdded
+from ..lab import Process, ProcessingProfileAlreadyAdded, RequisitionPanel
+from ..model_mixins.panel_model_mixin import PanelModelError
 from ..site_labs import SiteLabs, site_labs
 from .models import SubjectRequisition, SubjectVisit
 from edc_lab.tests.test_specimens import TestMixin
@@ -127,3 +134,170 @@ class TestSiteLab2(TestMixin, TestCase):
         requisition.save()
         self.assertEqual(
             requisition_identifier, requisition.requisition_identifier)
+
+    def test_get_panel(self):
+        self.assertEqual(
+            site_labs.get_panel(
+                SubjectRequisition._meta.label_lower, self.panel.name),
+            self.panel)
+        self.assertIsNone(
+            site_labs.get_panel(
+                SubjectRequisition._meta.label_lower, 'blah'))
+
+    def test_get_panel_added_after_register(self):
+        panel = RequisitionPanel(
+            name='another_panel',
+            model=SubjectRequisition,
+            aliquot_type=self.panel.aliquot_type)
+        self.lab_profile.add_panel(panel)
+        self.assertEqual(
+            site_labs.get_panel(
+                SubjectRequisition._meta.label_lower, panel.name),
+            panel)
+
+    def test_panel_object_cached(self):
+        requisition = SubjectRequisition(panel_name=self.panel.name)
+        panel_object = requisition.panel_object
+        self.assertIs(requisition.panel_object, panel_object)
+        with self.assertNumQueries(0):
+            requisition.panel_object
+
+    def test_panel_object_panel_name_changed(self):
+        requisition = SubjectRequisition(panel_name=self.panel.name)
+        requisition.panel_object
+        requisition.panel_name = 'blah'
+        self.assertRaises(PanelModelError, getattr, requisition, 'panel_object')
+
+    def test_panel_object_undefined_cached(self):
+        requisition = SubjectRequisition(panel_name='blah')
+        with patch.object(site_labs, 'get_panel', return_value=None) as get_panel:
+            self.assertRaises(PanelModelError, getattr, requisition, 'panel_object')
+            self.assertRaises(PanelModelError, getattr, requisition, 'panel_object')
+        self.assertEqual(get_panel.call_count, 1)
+
+    def test_panel_object_reregistered(self):
+        requisition = SubjectRequisition(panel_name=self.panel.name)
+        panel_object = requisition.panel_object
+        self.setup_site_labs()
+        self.assertIsNot(requisition.panel_object, panel_object)
+        self.assertIs(requisition.panel_object, self.panel)
+
+
+@tag('site')
+class TestSiteLabAutodiscover(TestCase):
+
+    def test_autodiscover_finds_modules(self):
+        site_lab = SiteLabs()
+        site_lab.autodiscover(module_name='tests', lazy=True, verbose=False)
+        self.assertIn(('edc_lab', 'edc_lab.tests'), site_lab.lab_modules)
+        self.assertIn('edc_lab', site_lab.timings)
+
+    def test_autodiscover_lazy(self):
+        site_lab = SiteLabs()
+        site_lab.autodiscover(module_name='tests', lazy=True, verbose=False)
+        self.assertTrue(site_lab._pending)
+        site_lab.import_pending()
+        self.assertFalse(site_lab._pending)
+
+    def test_autodiscover_missing_module(self):
+        site_lab = SiteLabs()
+        site_lab.autodiscover(module_name='blah', verbose=False)
+        self.assertEqual(site_lab.lab_modules, [])
+        self.assertFalse(site_lab.loaded)
+
+    def test_autodiscover_timing_not_verbose(self):
+        site_lab = SiteLabs()
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            site_lab.autodiscover(module_name='tests', verbose=False, timing=True)
+        self.assertIn('labs discovery', stdout.getvalue())
+        self.assertNotIn('registered labs', stdout.getvalue())
+
+    def test_import_pending_failure_keeps_remaining(self):
+        site_lab = SiteLabs()
+        site_lab._pending = [('app_a', 'app_a.labs'), ('app_b', 'app_b.labs')]
+        with patch('edc_lab.site_labs.import_module', side_effect=ImportError):
+            self.assertRaises(ImportError, site_lab.import_pending)
+        self.assertEqual(site_lab._pending, [('app_b', 'app_b.labs')])
+
+    def test_import_pending_reader_waits(self):
+        """Asserts a reader waits for a concurrent import instead
+        of reading a partial registry.
+        """
+        site_lab = SiteLabs()
+        site_lab.verbose = False
+        site_lab._pending = [('app_a', 'app_a.labs')]
+        started, release = threading.Event(), threading.Event()
+        results = []
+
+        def import_module(name):
+            started.set()
+            release.wait(5)
+            site_lab.loaded = True
+
+        with patch('edc_lab.site_labs.import_module', side_effect=import_module):
+            importer = threading.Thread(target=site_lab.import_pending)
+            importer.start()
+            started.wait(5)
+            reader = threading.Thread(
+                target=lambda: results.append(site_lab.get('app_a')))
+            reader.start()
+            reader.join(0.2)
+            self.assertTrue(reader.is_alive())
+            release.set()
+            importer.join(5)
+            reader.join(5)
+        self.assertEqual(results, [None])
+
+
+@tag('site')
+class TestSiteLabSnapshot(TestMixin, TestCase):
+
+    def setUp(self):
+        self.setup_site_labs()
+        self.path = os.path.join(tempfile.mkdtemp(), 'site_labs.pickle')
+
+    def test_snapshot(self):
+        site_labs.freeze(self.path)
+        site_lab = SiteLabs()
+        self.assertTrue(site_lab.load_snapshot(self.path))
+        self.assertTrue(site_lab.loaded)
+        self.assertEqual(
+            site_lab.get(self.lab_profile.name).panels,
+            self.lab_profile.panels)
+        self.assertEqual(
+            site_lab.get_panel(
+                SubjectRequisition._meta.label_lower, self.panel.name),
+            self.panel)
+
+    def test_snapshot_missing(self):
+        site_lab = SiteLabs()
+        self.assertFalse(site_lab.load_snapshot(self.path))
+        self.assertFalse(site_lab.loaded)
+
+    def test_snapshot_hash_mismatch(self):
+        with open(self.path, 'wb') as f:
+            pickle.dump(dict(labs_hash='blah', registry={}), f)
+        site_lab = SiteLabs()
+        self.assertFalse(site_lab.load_snapshot(self.path))
+        self.assertFalse(site_lab.loaded)
+
+    def test_snapshot_class_missing(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'cedc_lab.lab.aliquot_type\nNoSuchClass\n.')
+        site_lab = SiteLabs()
+        site_lab.verbose = False
+        self.assertFalse(site_lab.load_snapshot(self.path))
+        self.assertFalse(site_lab.loaded)
+
+    def test_snapshot_hash_includes_lab_classes(self):
+        site_lab = SiteLabs()
+        labs_hash = site_lab.labs_hash()
+        site_lab.snapshot_modules = SiteLabs.snapshot_modules[1:]
+        self.assertNotEqual(site_lab.labs_hash(), labs_hash)
+
+    def test_snapshot_lab_profile_reregistered(self):
+        site_labs.freeze(self.path)
+        site_lab = SiteLabs()
+        site_lab.load_snapshot(self.path)
+        site_lab.register(self.lab_profile)
+        self.assertIs(site_lab.get(self.lab_profile.name), self.lab_profile)
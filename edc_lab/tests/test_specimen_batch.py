@@ -0,0 +1,140 @@
+from django.db import connection
+from django.test import TestCase, tag
+from django.test.utils import CaptureQueriesContext
+from unittest.mock import patch
+
+from edc_constants.constants import YES, NO
+
+from ..lab import Specimen, SpecimenBatch, SpecimenNotDrawnError
+from ..lab.specimen_processor import SpecimenProcessor, SpecimenProcessorError
+from ..models import Aliquot
+from .models import SubjectRequisition, SubjectVisit
+from .site_labs_test_mixin import TestMixin
+
+
+@tag('specimen_batch')
+class TestSpecimenBatch(TestMixin, TestCase):
+
+    def setUp(self):
+        self.setup_site_labs()
+        self.subject_visit = SubjectVisit.objects.create(
+            subject_identifier='1111111111')
+        self.requisitions = []
+        for _ in range(0, 5):
+            self.requisitions.append(SubjectRequisition.objects.create(
+                subject_visit=self.subject_visit,
+                panel_name=self.panel.name,
+                protocol_number='999',
+                is_drawn=YES))
+
+    def test_batch_creates_primary_aliquots(self):
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        self.assertEqual(Aliquot.objects.filter(is_primary=True).count(), 0)
+        batch.primary_aliquots
+        self.assertEqual(
+            Aliquot.objects.filter(is_primary=True).count(),
+            len(self.requisitions))
+
+    def test_batch_updates_requisitions(self):
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        primary_aliquots = batch.primary_aliquots
+        for requisition in SubjectRequisition.objects.all():
+            aliquot = primary_aliquots.get(requisition.pk)
+            self.assertEqual(
+                requisition.identifier_prefix, aliquot.identifier_prefix)
+            self.assertEqual(
+                requisition.primary_aliquot_identifier, aliquot.aliquot_identifier)
+
+    def test_batch_gets_existing_primary_aliquots(self):
+        specimen = Specimen(requisition=self.requisitions[0])
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        self.assertEqual(
+            batch.primary_aliquots.get(self.requisitions[0].pk).aliquot_identifier,
+            specimen.primary_aliquot.aliquot_identifier)
+        self.assertEqual(
+            Aliquot.objects.filter(is_primary=True).count(),
+            len(self.requisitions))
+
+    def test_batch_from_pks(self):
+        batch = SpecimenBatch(
+            requisition_pks=[obj.pk for obj in self.requisitions])
+        self.assertEqual(len(batch.primary_aliquots), len(self.requisitions))
+
+    def test_batch_from_requisition_identifiers(self):
+        batch = SpecimenBatch(
+            requisition_identifiers=[
+                obj.requisition_identifier for obj in self.requisitions])
+        self.assertEqual(len(batch.primary_aliquots), len(self.requisitions))
+
+    def test_batch_not_drawn(self):
+        requisition = SubjectRequisition.objects.create(
+            subject_visit=self.subject_visit,
+            panel_name=self.panel.name,
+            protocol_number='999',
+            is_drawn=NO)
+        self.assertRaises(
+            SpecimenNotDrawnError,
+            SpecimenBatch, requisitions=self.requisitions + [requisition])
+
+    def test_batch_process(self):
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        result = batch.process()
+        self.assertEqual(
+            len(result.created),
+            len(self.requisitions) * self.profile_aliquot_count)
+        self.assertEqual(
+            batch.aliquots.count(),
+            len(self.requisitions) * (self.profile_aliquot_count + 1))
+
+    def test_batch_process_twice(self):
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        batch.process()
+        result = batch.process()
+        self.assertEqual(result.created, [])
+        self.assertEqual(
+            len(result.skipped),
+            len(self.requisitions) * self.profile_aliquot_count)
+
+    def test_batch_process_rolls_back_primary_aliquots(self):
+        batch = SpecimenBatch(requisitions=self.requisitions)
+        with patch.object(SpecimenProcessor, 'create_bulk',
+                          side_effect=SpecimenProcessorError):
+            self.assertRaises(SpecimenProcessorError, batch.process)
+        self.assertEqual(Aliquot.objects.filter(is_primary=True).count(), 0)
+        self.assertEqual(
+            SubjectRequisition.objects.filter(identifier_prefix__isnull=False).count(), 0)
+        self.assertFalse([obj for obj in batch.requisitions if obj.identifier_prefix])
+        batch.process()
+        self.assertEqual(
+            Aliquot.objects.filter(is_primary=True).count(), len(self.requisitions))
+        self.assertEqual(
+            SubjectRequisition.objects.filter(identifier_prefix__isnull=True).count(), 0)
+        self.assertEqual(
+            SubjectRequisition.objects.filter(
+                primary_aliquot_identifier__isnull=True).count(), 0)
+
+    def test_batch_process_matches_specimen(self):
+        """Asserts aliquots created by the batch are the same
+        as those created one specimen at a time.
+        """
+        specimen = Specimen(requisition=self.requisitions[0])
+        expected = sorted(
+            obj.aliquot_identifier for obj in specimen.process())
+        Aliquot.objects.filter(is_primary=False).delete()
+        SpecimenBatch(requisitions=self.requisitions).process()
+        self.assertEqual(
+            sorted(specimen.aliquots.filter(
+                is_primary=False).values_list('aliquot_identifier', flat=True)),
+            expected)
+
+    def test_batch_process_queries(self):
+        """Asserts processing queries do not depend on the number
+        of requisitions.
+        """
+        batch = SpecimenBatch(requisitions=self.requisitions[0:1])
+        with CaptureQueriesContext(connection) as one:
+            batch.process()
+        batch = SpecimenBatch(requisitions=self.requisitions[1:])
+        with CaptureQueriesContext(connection) as many:
+            batch.process()
+        self.assertEqual(len(one), len(many))
@@ -157,3 +157,82 @@ class TestSpecimen2(TestMixin, TestCase):
             index += 2
             self.assertFalse(aliquot.is_primary)
             self.assertEqual(f'66{str(index).zfill(2)}', aliquot.aliquot_identifier[-4:])
+
+    def test_specimen_process_bulk(self):
+        """Asserts bulk processing creates the correct number
+        of child aliquots.
+        """
+        result = self.specimen.process(bulk=True)
+        self.assertEqual(len(result.created), self.profile_aliquot_count)
+        self.assertEqual(result.skipped, [])
+        self.assertEqual(self.specimen.aliquots.count(),
+                         self.profile_aliquot_count + 1)
+
+    def test_specimen_process_bulk_skips_existing(self):
+        """Asserts bulk processing more than once skips existing
+        aliquots.
+        """
+        self.specimen.process()
+        result = self.specimen.process(bulk=True)
+        self.assertEqual(result.created, [])
+        self.assertEqual(len(result.skipped), self.profile_aliquot_count)
+        self.assertEqual(self.specimen.aliquots.count(),
+                         self.profile_aliquot_count + 1)
+
+    def test_specimen_process_bulk_matches_process(self):
+        """Asserts bulk processing creates the same aliquots as
+        processing one at a time.
+        """
+        aliquots = self.specimen.process()
+        Aliquot.objects.filter(
+            aliquot_identifier__in=[obj.aliquot_identifier for obj in aliquots]).delete()
+        result = self.specimen.process(bulk=True)
+        self.assertEqual(
+            [(obj.aliquot_identifier, obj.count, obj.parent_identifier)
+             for obj in aliquots],
+            [(obj.aliquot_identifier, obj.count, obj.parent_identifier)
+             for obj in result.created])
+
+    def test_specimen_process_bulk_history(self):
+        """Asserts bulk processing writes historical records and
+        search slugs.
+        """
+        result = self.specimen.process(bulk=True)
+        for aliquot in result.created:
+            self.assertEqual(
+                Aliquot.history.filter(
+                    aliquot_identifier=aliquot.aliquot_identifier,
+                    history_type='+').count(), 1)
+            self.assertIn(
+                aliquot.aliquot_identifier,
+                Aliquot.objects.get(pk=aliquot.pk).slug)
+
+    def test_specimen_primary_aliquot_cached(self):
+        """Asserts the primary aliquot and identifier prefix are
+        not looked up again once resolved.
+        """
+        self.specimen.primary_aliquot
+        with self.assertNumQueries(0):
+            self.specimen.primary_aliquot
+            self.specimen.primary_aliquot
+            self.specimen.identifier_prefix
+
+    def test_specimen_primary_aliquot_single_query(self):
+        """Asserts instantiating a specimen for a requisition with
+        an existing primary aliquot needs one query.
+        """
+        with self.assertNumQueries(1):
+            specimen = Specimen(requisition=self.requisition)
+            specimen.primary_aliquot
+            specimen.primary_aliquot
+            specimen.identifier_prefix
+
+    def test_specimen_refresh(self):
+        """Asserts refresh resolves the primary aliquot again.
+        """
+        obj = self.specimen.primary_aliquot
+        self.specimen.refresh()
+        with self.assertNumQueries(1):
+            self.assertEqual(
+                self.specimen.primary_aliquot.aliquot_identifier,
+                obj.aliquot_identifier)
@@ -0,0 +1,94 @@
+from django.test import TestCase, tag
+
+from ..constants import SHIPPED
+from ..exceptions import StorageLocationError
+from ..lab import StorageLocator
+from ..models import Box, BoxItem, BoxType, Freezer, Rack, Shelf
+
+
+@tag('storage')
+class TestStorageLocator(TestCase):
+
+    def setUp(self):
+        self.box_type = box_type = BoxType.objects.create(
+            name='box_type', across=3, down=2, total=6)
+        freezer = Freezer.objects.create(name='freezer_1')
+        self.shelf = Shelf.objects.create(freezer=freezer, name='shelf_1')
+        self.other_shelf = Shelf.objects.create(
+            freezer=Freezer.objects.create(name='freezer_2'), name='shelf_9')
+        self.rack = Rack.objects.create(shelf=self.shelf, name='rack_1')
+        self.other_rack = Rack.objects.create(shelf=self.shelf, name='rack_2')
+        self.boxes = []
+        for n in range(0, 3):
+            box = Box.objects.create(
+                box_type=box_type, rack=self.rack, rack_position=n + 1)
+            box.place([f'{n}{position}' for position in range(1, 5)])
+            self.boxes.append(box)
+        self.identifiers = [f'{n}{position}' for n in range(0, 3)
+                            for position in range(1, 5)]
+        self.locator = StorageLocator()
+
+    def test_locate(self):
+        location = self.locator.locate_one('24')
+        self.assertEqual(location.freezer, 'freezer_1')
+        self.assertEqual(location.shelf, 'shelf_1')
+        self.assertEqual(location.rack, 'rack_1')
+        self.assertEqual(location.rack_position, 3)
+        self.assertEqual(location.box_identifier, self.boxes[2].box_identifier)
+        self.assertEqual(location.position, 4)
+        self.assertEqual((location.row, location.column), (2, 1))
+
+    def test_locate_one_query(self):
+        with self.assertNumQueries(1):
+            locations = self.locator.locate(self.identifiers + ['not_boxed'])
+        self.assertEqual(sorted(locations), sorted(self.identifiers))
+
+    def test_locate_not_stored(self):
+        self.locator.move_boxes(boxes=self.boxes[0:1], rack=None)
+        location = self.locator.locate_one('01')
+        self.assertIsNone(location.freezer)
+        self.assertIsNone(location.rack_position)
+        self.assertEqual(location.position, 1)
+
+    def test_move_rack(self):
+        with self.assertNumQueries(1):
+            self.locator.move_rack(rack=self.rack, shelf=self.other_shelf)
+        for location in self.locator.locate(self.identifiers).values():
+            self.assertEqual(location.freezer, 'freezer_2')
+            self.assertEqual(location.shelf, 'shelf_9')
+
+    def test_move_rack_boxes(self):
+        history_count = Box.history.count()
+        moved = self.locator.move_rack_boxes(
+            from_rack=self.rack, to_rack=self.other_rack)
+        self.assertEqual(moved, 3)
+        self.assertEqual(Box.history.count(), history_count + 3)
+        for location in self.locator.locate(self.identifiers).values():
+            self.assertEqual(location.rack, 'rack_2')
+        self.assertEqual(
+            sorted(Box.objects.filter(rack=self.other_rack).values_list(
+                'rack_position', flat=True)), [1, 2, 3])
+
+    def test_locate_ignores_shipped_boxes(self):
+        Box.objects.filter(pk=self.boxes[0].pk).update(status=SHIPPED)
+        box = Box.objects.create(box_type=self.box_type)
+        BoxItem.objects.create(box=box, identifier='01', position=1)
+        location = self.locator.locate_one('01')
+        self.assertEqual(location.box_identifier, box.box_identifier)
+        self.assertIsNone(location.rack)
+
+    def test_move_boxes_position_taken(self):
+        box = Box.objects.create(
+            box_type=self.box_type, rack=self.other_rack, rack_position=2)
+        self.assertRaises(
+            StorageLocationError,
+            self.locator.move_rack_boxes, from_rack=self.rack, to_rack=self.other_rack)
+        self.assertEqual(Box.objects.filter(rack=self.other_rack).get(), box)
+
+    def test_move_boxes_same_position(self):
+        box = Box.objects.create(
+            box_type=self.box_type, rack=self.other_rack, rack_position=1)
+        self.assertRaises(
+            StorageLocationError,
+            self.locator.move_boxes, boxes=[self.boxes[0], box], rack=Rack.objects.create(
+                shelf=self.shelf, name='rack_3'))
@@ -0,0 +1,82 @@
+from django.conf.urls import url
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase, tag, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from ..models import Box, BoxItem, BoxType
+from ..templatetags.edc_lab_extras import show_box_rows
+
+urlpatterns = [
+    url(r'^verify/(?P<box_identifier>\w+)/(?P<action_name>\w+)/(?P<position>\d+)/$',
+        lambda request, **kwargs: HttpResponse(),
+        name='verify_box_listboard_url'),
+]
+
+
+@tag('templatetags')
+@override_settings(ROOT_URLCONF='edc_lab.tests.test_templatetags')
+class TestShowBoxRows(TestCase):
+
+    def setUp(self):
+        cache.clear()
+
+    def get_box(self, across=None, down=None, items=None):
+        box_type = BoxType.objects.create(
+            name=f'box_type_{across}', across=across, down=down, total=across * down)
+        box = Box.objects.create(box_type=box_type)
+        box.place([f'{across}{down}-{position}' for position in range(1, items + 1)])
+        return Box.objects.select_related('box_type').get(pk=box.pk)
+
+    def test_rows(self):
+        box = self.get_box(across=3, down=2, items=2)
+        context = show_box_rows(box, 'verify_box_listboard_url', position=2)
+        self.assertEqual(list(context['headers']), [1, 2, 3])
+        self.assertEqual(len(context['rows']), 2)
+        cells = [cell for row in context['rows'] for cell in row['cells']]
+        self.assertEqual([cell['btn_label'] for cell in cells],
+                         ['01', '02', '03', '04', '05', '06'])
+        self.assertEqual(
+            cells[3]['href'], f'/verify/{box.box_identifier}/verify/4/')
+        self.assertEqual([cell['has_focus'] for cell in cells],
+                         [False, True, False, False, False, False])
+        self.assertEqual([bool(cell['box_item_id']) for cell in cells],
+                         [True, True, False, False, False, False])
+        self.assertEqual(cells[2]['btn_title'], 'empty')
+
+    def test_queries_constant(self):
+        small = self.get_box(across=2, down=2, items=2)
+        large = self.get_box(across=10, down=10, items=90)
+        with CaptureQueriesContext(connection) as small_queries:
+            show_box_rows(small, 'verify_box_listboard_url')
+        with CaptureQueriesContext(connection) as large_queries:
+            show_box_rows(large, 'verify_box_listboard_url')
+        self.assertEqual(len(small_queries), len(large_queries))
+        self.assertLessEqual(len(large_queries), 1)
+
+    def test_cached(self):
+        box = self.get_box(across=3, down=2, items=2)
+        show_box_rows(box, 'verify_box_listboard_url')
+        with self.assertNumQueries(0):
+            show_box_rows(box, 'verify_box_listboard_url')
+
+    def test_cache_expires_on_change(self):
+        box = self.get_box(across=3, down=2, items=2)
+        show_box_rows(box, 'verify_box_listboard_url')
+        box_item = BoxItem.objects.get(box=box, position=1)
+        box_item.verified = 1
+        box_item.save()
+        box = Box.objects.select_related('box_type').get(pk=box.pk)
+        context = show_box_rows(box, 'verify_box_listboard_url')
+        self.assertEqual(
+            context['rows'][0]['cells'][0]['btn_style'], 'btn-success')
+
+    def test_cache_expires_on_queryset_delete(self):
+        box = self.get_box(across=3, down=2, items=3)
+        show_box_rows(box, 'verify_box_listboard_url')
+        BoxItem.objects.filter(box=box, position=3).delete()
+        box = Box.objects.select_related('box_type').get(pk=box.pk)
+        context = show_box_rows(box, 'verify_box_listboard_url')
+        self.assertEqual(context['rows'][0]['cells'][2]['btn_title'], 'empty')
+        self.assertIsNone(context['rows'][0]['cells'][2]['box_item_id'])